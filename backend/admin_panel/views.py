@@ -1,13 +1,20 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.contrib.auth.models import User
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from search.fuzzy import fuzzy_search
 from django.contrib import messages
 from .forms import UserForm  # We will create this form later
 from django.http import HttpResponseForbidden
 
+User = get_user_model()
+
+USERS_PER_PAGE = 50
+
 def user_list(request):
     query = request.GET.get('q', '')
-    users = User.objects.filter(username__icontains=query)
-    return render(request, 'admin/user_list.html', {'users': users, 'query': query})
+    users = fuzzy_search(User.objects.all(), 'username', query) if query else User.objects.order_by('username', 'id')
+    page = Paginator(users.only('id', 'username'), USERS_PER_PAGE).get_page(request.GET.get('page'))
+    return render(request, 'admin/user_list.html', {'users': page, 'page': page, 'query': query})
 
 def user_detail(request, user_id):
     user = get_object_or_404(User, id=user_id)
@@ -0,0 +1,76 @@
+# api/authentication.py
+import logging
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import cache
+from .models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+# Seconds a resolved user row may be served from cache; saves invalidate it earlier
+USER_CACHE_TTL = getattr(settings, 'AUTH_USER_CACHE_TTL', 60)
+
+# Secrets never leave the database; they are loaded on demand if something reads them
+UNCACHED_FIELDS = {'password', 'otp_secret'}
+
+CACHED_FIELDS = [
+    field.attname for field in CustomUser._meta.concrete_fields if field.attname not in UNCACHED_FIELDS
+]
+
+
+def _load_user_row(user_id):
+    return CustomUser.objects.filter(pk=user_id).values_list(*CACHED_FIELDS).first()
+
+
+def get_cached_user(user_id):
+    """
+    Resolve a user id to a CustomUser through the 'auth_users' cache.
+
+    Only the column values are cached; a fresh instance is built per call with
+    Model.from_db, so requests never share a mutable user object. The password
+    hash and OTP secret stay deferred. api.models invalidates the entry on
+    every save (profile edits, password changes, deactivation) and delete.
+    """
+    row = cache.get_or_set('auth_users', user_id, lambda: _load_user_row(user_id), USER_CACHE_TTL)
+    if row is None:
+        return None
+    return CustomUser.from_db('default', CACHED_FIELDS, row)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves the token's user through get_cached_user()."""
+
+    def get_user(self, validated_token):
+        if getattr(api_settings, 'CHECK_REVOKE_TOKEN', False):
+            # Revocation compares against the password hash, which is not cached
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+
+def authenticate_token(raw_token):
+    """
+    Validate a raw access token and return its user, or AnonymousUser.
+    Used once per WebSocket connection by JWTWebsocketMiddleware.
+    """
+    auth = CachedJWTAuthentication()
+    try:
+        return auth.get_user(auth.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed) as e:
+        logger.warning(f"JWT authentication failed: {str(e)}")
+        return AnonymousUser()
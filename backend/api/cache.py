@@ -0,0 +1,321 @@
+# api/cache.py
+import functools
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpRequest
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = 'cache-invalidation'
+
+# Local copies live at most this long, which bounds staleness if an invalidation broadcast is missed
+L1_TTL = getattr(settings, 'CACHE_L1_TTL', 30)
+L1_MAX_ENTRIES = getattr(settings, 'CACHE_L1_MAX_ENTRIES', 1024)
+
+# How long a recomputation may hold the cross-worker lock, and how often waiters poll for its result
+LOCK_TIMEOUT = 10
+LOCK_POLL_INTERVAL = 0.05
+
+_MISSING = object()
+
+
+class LocalLRU:
+    """Thread-safe in-process LRU with per-entry expiry, keyed by (namespace, key)."""
+
+    def __init__(self, max_entries=L1_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, namespace, key):
+        with self._lock:
+            entry = self._data.get((namespace, key))
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[(namespace, key)]
+                return _MISSING
+            self._data.move_to_end((namespace, key))
+            return value
+
+    def set(self, namespace, key, value, ttl):
+        with self._lock:
+            self._data[(namespace, key)] = (time.monotonic() + ttl, value)
+            self._data.move_to_end((namespace, key))
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, namespace, key=None):
+        """Drop one entry, or the whole namespace when `key` is None."""
+        with self._lock:
+            if key is not None:
+                self._data.pop((namespace, key), None)
+                return
+            for entry_key in [entry_key for entry_key in self._data if entry_key[0] == namespace]:
+                del self._data[entry_key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class TwoTierCache:
+    """
+    Read-through cache with an in-process LRU (L1) in front of Redis (L2).
+
+    Values are grouped in namespaces. `invalidate(namespace)` bumps the
+    namespace version stored in Redis, which orphans every L2 entry of that
+    namespace at once, and broadcasts on a pub/sub channel so every worker
+    drops its L1 copies; `invalidate(namespace, key)` does the same for one
+    entry. `get_or_set` recomputes a missing value once: threads of the same
+    process wait on a local lock, and other workers wait on a short-lived
+    lock in Redis and pick up the value it produces instead of stampeding
+    the database.
+
+    Redis failures are logged and treated as misses, so the cache degrades to
+    L1 only (tests, local development) rather than failing requests.
+    """
+
+    def __init__(self, alias='default', l1_ttl=L1_TTL):
+        self.alias = alias
+        self.l1_ttl = l1_ttl
+        self.local = LocalLRU()
+        self._flight_locks = {}
+        self._flight_guard = threading.Lock()
+        self._client = None
+        self._listener = None
+        self._listener_guard = threading.Lock()
+
+    @property
+    def remote(self):
+        return caches[self.alias]
+
+    # -- Redis access ------------------------------------------------------
+
+    def _remote_call(self, method, *args, default=None, **kwargs):
+        try:
+            return getattr(self.remote, method)(*args, **kwargs)
+        except Exception as e:
+            logger.warning(f"L2 cache {method} failed: {str(e)}")
+            return default
+
+    def _version_key(self, namespace):
+        return f"cachever:{namespace}"
+
+    def version(self, namespace):
+        """Current version of a namespace; changes whenever the namespace is invalidated."""
+        self.ensure_listener()
+        version = self.local.get('__versions__', namespace)
+        if version is _MISSING:
+            version = self._remote_call('get_or_set', self._version_key(namespace), 1, None, default=1)
+            self.local.set('__versions__', namespace, version, self.l1_ttl)
+        return version
+
+    def _remote_key(self, namespace, key):
+        return f"{namespace}:v{self.version(namespace)}:{key}"
+
+    # -- Reads ---------------------------------------------------------------
+
+    def get(self, namespace, key, default=None):
+        self.ensure_listener()
+        value = self.local.get(namespace, key)
+        if value is not _MISSING:
+            return value
+        value = self._remote_call('get', self._remote_key(namespace, key), _MISSING, default=_MISSING)
+        if value is _MISSING:
+            return default
+        self.local.set(namespace, key, value, self.l1_ttl)
+        return value
+
+    def set(self, namespace, key, value, ttl):
+        self._remote_call('set', self._remote_key(namespace, key), value, ttl)
+        self.local.set(namespace, key, value, min(ttl, self.l1_ttl))
+
+    def get_or_set(self, namespace, key, compute, ttl):
+        """Return the cached value, computing and storing it once on a miss."""
+        value = self.get(namespace, key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._flight_lock(namespace, key):
+            # Another thread may have filled it while we waited
+            value = self.local.get(namespace, key)
+            if value is not _MISSING:
+                return value
+
+            remote_key = self._remote_key(namespace, key)
+            lock_key = f"{remote_key}:lock"
+            token = uuid.uuid4().hex
+            if self._remote_call('add', lock_key, token, LOCK_TIMEOUT, default=True):
+                try:
+                    value = compute()
+                    self.set(namespace, key, value, ttl)
+                finally:
+                    if self._remote_call('get', lock_key) == token:
+                        self._remote_call('delete', lock_key)
+                return value
+
+            # Another worker is computing it; wait for its result rather than duplicating the work
+            deadline = time.monotonic() + LOCK_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(LOCK_POLL_INTERVAL)
+                value = self._remote_call('get', remote_key, _MISSING, default=_MISSING)
+                if value is not _MISSING:
+                    self.local.set(namespace, key, value, min(ttl, self.l1_ttl))
+                    return value
+                if not self._remote_call('get', lock_key):
+                    break
+            logger.warning(f"Gave up waiting for {namespace}:{key}; recomputing")
+            value = compute()
+            self.set(namespace, key, value, ttl)
+            return value
+
+    def _flight_lock(self, namespace, key):
+        with self._flight_guard:
+            lock = self._flight_locks.get((namespace, key))
+            if lock is None:
+                # Bounded like L1 so one-off keys do not accumulate
+                if len(self._flight_locks) > L1_MAX_ENTRIES:
+                    self._flight_locks = {k: v for k, v in self._flight_locks.items() if v.locked()}
+                lock = self._flight_locks[(namespace, key)] = threading.Lock()
+            return lock
+
+    # -- Invalidation ----------------------------------------------------------
+
+    def invalidate(self, namespace, key=None):
+        """Drop one entry (or a whole namespace) here, in Redis and in every other worker."""
+        if key is None:
+            version_key = self._version_key(namespace)
+            if self._remote_call('incr', version_key, default=_MISSING) is _MISSING:
+                self._remote_call('set', version_key, int(time.time()), None)
+            self.local.delete('__versions__', namespace)
+        else:
+            self._remote_call('delete', self._remote_key(namespace, key))
+        self.local.delete(namespace, key)
+        self._publish({'namespace': namespace, 'key': key})
+
+    def invalidate_on_commit(self, namespace, key=None):
+        """Invalidate once the surrounding transaction commits (immediately outside one)."""
+        transaction.on_commit(lambda: self.invalidate(namespace, key))
+
+    def _apply_remote_invalidation(self, message):
+        namespace, key = message['namespace'], message.get('key')
+        if key is None:
+            self.local.delete('__versions__', namespace)
+        self.local.delete(namespace, key)
+
+    # -- Pub/sub -------------------------------------------------------------
+
+    def _redis_client(self):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(settings.REDIS_URL)
+        return self._client
+
+    def _publish(self, message):
+        try:
+            self._redis_client().publish(INVALIDATION_CHANNEL, json.dumps(message))
+        except Exception as e:
+            logger.warning(f"Failed to broadcast cache invalidation {message}: {str(e)}")
+
+    def ensure_listener(self):
+        """Start the background subscriber that applies other workers' invalidations."""
+        if self._listener is not None and self._listener.is_alive():
+            return
+        with self._listener_guard:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(target=self._listen, name='cache-invalidation', daemon=True)
+            self._listener.start()
+
+    def _listen(self):
+        backoff = 1
+        while True:
+            try:
+                pubsub = self._redis_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Anything published while we were disconnected was missed
+                self.local.clear()
+                backoff = 1
+                for message in pubsub.listen():
+                    try:
+                        self._apply_remote_invalidation(json.loads(message['data']))
+                    except (ValueError, KeyError, TypeError) as e:
+                        logger.warning(f"Ignoring malformed cache invalidation: {str(e)}")
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener disconnected: {str(e)}; retrying in {backoff}s")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+
+
+cache = TwoTierCache()
+
+
+def cached(namespace, ttl, key=None):
+    """
+    Cache a function's return value. `key` builds the cache key from the call
+    arguments (default: repr of the arguments).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs) if key else repr((args, sorted(kwargs.items())))
+            return cache.get_or_set(namespace, cache_key, lambda: func(*args, **kwargs), ttl)
+        wrapper.invalidate = lambda *args, **kwargs: cache.invalidate(
+            namespace, key(*args, **kwargs) if key else repr((args, sorted(kwargs.items())))
+        )
+        return wrapper
+    return decorator
+
+
+def cache_response(namespace, ttl, key=None):
+    """
+    Cache successful GET responses of a DRF view function or view method.
+
+    The key is `key(request)` when given (e.g. the user id, so one entry can
+    be invalidated), otherwise the full path with its query string. Only
+    `response.data` and the status are stored; the Response is rebuilt on a
+    hit so renderers and outer decorators (CSRF cookies, CORS) run as usual.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            request = next(arg for arg in args if isinstance(arg, (Request, HttpRequest)))
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+            cache_key = key(request) if key else request.get_full_path()
+
+            produced = {}
+
+            def compute():
+                response = view(*args, **kwargs)
+                produced['response'] = response
+                if response.status_code != 200:
+                    # Errors are returned as-is and never cached
+                    raise _Uncacheable
+                return {'status': response.status_code, 'data': response.data}
+
+            try:
+                result = cache.get_or_set(namespace, cache_key, compute, ttl)
+            except _Uncacheable:
+                return produced['response']
+            if 'response' in produced:
+                return produced['response']
+            return Response(result['data'], status=result['status'])
+        return wrapper
+    return decorator
+
+
+class _Uncacheable(Exception):
+    pass
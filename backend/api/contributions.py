@@ -0,0 +1,101 @@
+# api/contributions.py
+import base64
+import heapq
+import json
+from itertools import islice
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import replace_query_param
+
+from .pagination import CursorEncoder
+
+INVALID_CURSOR_MESSAGE = 'Invalid cursor'
+
+
+class ContributionSource:
+    """
+    One kind of content a user authors. `queryset(user)` returns the user's
+    rows (with a `created_at` field) and `serialize(row)` turns a row into
+    a feed item carrying its `type`.
+    """
+
+    def __init__(self, type, queryset, serialize):
+        self.type = type
+        self.queryset = queryset
+        self.serialize = serialize
+
+
+_sources = {}
+
+
+def register_contribution_source(type, queryset, serialize):
+    _sources[type] = ContributionSource(type, queryset, serialize)
+    return _sources[type]
+
+
+def _seek(source, cursor):
+    """Rows of `source` strictly after the cursor in (created_at, type, id) descending order."""
+    created_at, type, pk = cursor
+    if source.type > type:
+        return Q(created_at__lt=created_at)
+    if source.type < type:
+        return Q(created_at__lte=created_at)
+    return Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+
+
+def _rows(source, user, cursor, limit):
+    queryset = source.queryset(user).order_by('-created_at', '-pk')
+    if cursor:
+        queryset = queryset.filter(_seek(source, cursor))
+    for row in queryset[:limit]:
+        yield (row.created_at, source.type, row.pk), source, row
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(list(key), cls=CursorEncoder).encode()).decode()
+
+
+def decode_cursor(token):
+    try:
+        created_at, type, pk = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+        created_at = parse_datetime(created_at)
+        if created_at is None or type not in _sources:
+            raise ValueError(token)
+        return created_at, type, int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise NotFound(INVALID_CURSOR_MESSAGE)
+
+
+def contributions_page(user, page_size, token=None, base_url=None):
+    """
+    One page of everything `user` authored, newest first, across every
+    registered source.
+
+    Each source is read with its own keyset query limited to page_size + 1
+    rows after the shared cursor (created_at, type, id), and heapq.merge
+    interleaves those already ordered streams, so a page costs one indexed
+    query per source however many contributions the user has. Per-type
+    totals are counted with one aggregate query per source and returned
+    with the first page only. The `next` link is `base_url` with the
+    cursor of the following page.
+    """
+    cursor = decode_cursor(token) if token else None
+
+    merged = heapq.merge(
+        *[_rows(source, user, cursor, page_size + 1) for source in _sources.values()],
+        key=lambda entry: entry[0],
+        reverse=True,
+    )
+    page = list(islice(merged, page_size + 1))
+    has_more = len(page) > page_size
+    page = page[:page_size]
+
+    data = {
+        'next': replace_query_param(base_url, 'cursor', encode_cursor(page[-1][0])) if has_more else None,
+        'results': [source.serialize(row) for _, source, row in page],
+    }
+    if cursor is None:
+        data['counts'] = {type: source.queryset(user).count() for type, source in _sources.items()}
+    return data
@@ -0,0 +1,139 @@
+# api/dashboard.py
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.http import HttpResponseNotAllowed, JsonResponse
+from django.urls import reverse
+from rest_framework.exceptions import APIException
+from rest_framework.utils.encoders import JSONEncoder
+
+from credits.models import CreditTransaction
+from credits.serializers import CreditTransactionSerializer
+from projects.models import HelpRequest
+from projects.views import active_chat_list
+from skills.models import Mentorship
+from skills.serializers import MentorshipSerializer
+from .authentication import CachedJWTAuthentication
+from .contributions import contributions_page
+from .views import auth_user_data, help_request_item
+
+logger = logging.getLogger(__name__)
+
+# Items returned per list section; each section has its own endpoint for the rest
+SECTION_LIMIT = getattr(settings, 'DASHBOARD_SECTION_LIMIT', 10)
+
+# Run sections on separate connections in parallel; off, they run one after another
+CONCURRENT_SECTIONS = getattr(settings, 'DASHBOARD_CONCURRENT_SECTIONS', True)
+
+
+def user_section(request, user, credit):
+    return auth_user_data(user, credit)
+
+
+def credits_section(request, user, credit):
+    transactions = CreditTransaction.objects.filter(user=user).order_by('-timestamp', '-id')[:SECTION_LIMIT]
+    return {
+        'balance': credit.balance,
+        'transactions': CreditTransactionSerializer(transactions, many=True).data,
+    }
+
+
+def contributions_section(request, user, credit):
+    return contributions_page(user, SECTION_LIMIT, base_url=request.build_absolute_uri(reverse('user-contributions')))
+
+
+def help_requests_section(request, user, credit):
+    help_requests = HelpRequest.objects.filter(created_by=user).select_related('category').order_by('-created_at')
+    return [help_request_item(help_request) for help_request in help_requests[:SECTION_LIMIT]]
+
+
+def active_chats_section(request, user, credit):
+    return active_chat_list(user, limit=SECTION_LIMIT)
+
+
+def mentorships_section(request, user, credit):
+    mentorships = (
+        Mentorship.objects.filter(Q(mentor=user) | Q(learner=user))
+        .select_related('mentor', 'learner', 'skill', 'skill__category')
+        .order_by('-created_at')[:SECTION_LIMIT]
+    )
+    return MentorshipSerializer(mentorships, many=True, context={'request': request}).data
+
+
+# name -> (builder, most queries it may issue)
+SECTIONS = {
+    'user': (user_section, 0),
+    'credits': (credits_section, 1),
+    'contributions': (contributions_section, 4),
+    'help_requests': (help_requests_section, 1),
+    'active_chats': (active_chats_section, 1),
+    'mentorships': (mentorships_section, 1),
+}
+
+
+def _authenticate(request):
+    """The JWT (through the user cache) or session user, and their Credit row; (None, None) if anonymous."""
+    result = CachedJWTAuthentication().authenticate(request)
+    user = result[0] if result else request.user
+    if not user.is_authenticated:
+        return None, None
+    return user, user.get_credits()
+
+
+def _run_section(build, request, user, credit):
+    try:
+        return build(request, user, credit)
+    finally:
+        if CONCURRENT_SECTIONS:
+            # Sections run on throwaway worker threads; do not leave their connections open
+            connection.close()
+
+
+async def dashboard(request):
+    """
+    Everything the profile page shows, in one request.
+
+    `?include=user,credits,...` picks sections (all of them by default; see
+    SECTIONS). The user and their Credit row are resolved once and shared,
+    every list is capped at DASHBOARD_SECTION_LIMIT items, and each section
+    has a fixed query budget, so the response costs at most one query for
+    the user, one for the balance and the sum of the selected sections'
+    budgets, however much history the user has. Sections run concurrently
+    on worker threads, each with its own database connection.
+    """
+    # require_GET cannot wrap a coroutine view in Django 4.2
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        user, credit = await sync_to_async(_authenticate)(request)
+    except APIException as e:
+        return JsonResponse({'detail': str(e.detail)}, status=e.status_code)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    include = request.GET.get('include')
+    names = [name.strip() for name in include.split(',') if name.strip()] if include else list(SECTIONS)
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
+        return JsonResponse({'detail': f"Unknown sections: {', '.join(unknown)}"}, status=400)
+
+    calls = [
+        sync_to_async(_run_section, thread_sensitive=not CONCURRENT_SECTIONS)(SECTIONS[name][0], request, user, credit)
+        for name in names
+    ]
+    results = await asyncio.gather(*calls, return_exceptions=True)
+
+    data, errors = {}, {}
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            logger.error(f"Dashboard section {name} failed for user {user.username}: {str(result)}", exc_info=result)
+            errors[name] = 'Failed to load'
+        else:
+            data[name] = result
+    if errors:
+        data['errors'] = errors
+    return JsonResponse(data, encoder=JSONEncoder)
@@ -0,0 +1,157 @@
+# api/images.py
+import logging
+import os
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+RENDITION_DIR = 'renditions'
+
+# WebP where the Pillow build supports it, JPEG otherwise
+RENDITION_FORMAT = getattr(settings, 'IMAGE_RENDITION_FORMAT', 'WEBP' if features.check('webp') else 'JPEG')
+RENDITION_QUALITY = getattr(settings, 'IMAGE_RENDITION_QUALITY', 80)
+RENDITION_EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+
+
+class ImageKind:
+    """
+    An image field with its renditions: name -> (width, height, crop). Cropped
+    renditions fill the box exactly (avatars); the others fit inside it.
+
+    Generated file names are stored in the model's JSON `renditions_field`
+    together with the source file name they were made from, so a replaced
+    image is detected without touching storage.
+    """
+
+    def __init__(self, name, model_label, field, renditions_field, renditions, on_complete=None):
+        self.name = name
+        self.model_label = model_label
+        self.field = field
+        self.renditions_field = renditions_field
+        self.renditions = renditions
+        self.on_complete = on_complete
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def is_stale(self, instance):
+        field_file = getattr(instance, self.field)
+        renditions = getattr(instance, self.renditions_field) or {}
+        return bool(field_file) and renditions.get('source') != field_file.name
+
+
+_kinds = {}
+
+
+def register_image_kind(name, model_label, field, renditions_field, renditions, on_complete=None):
+    _kinds[name] = ImageKind(name, model_label, field, renditions_field, renditions, on_complete)
+    return _kinds[name]
+
+
+def get_image_kind(name):
+    return _kinds[name]
+
+
+def rendition_path(source_name, rendition):
+    stem = os.path.splitext(source_name)[0]
+    return f"{RENDITION_DIR}/{stem}_{rendition}.{RENDITION_EXTENSIONS[RENDITION_FORMAT]}"
+
+
+def render(source, width, height, crop):
+    """Encode one rendition of an open image. Nothing but pixels is copied, so EXIF and GPS data are dropped."""
+    image = ImageOps.exif_transpose(source)
+    if RENDITION_FORMAT == 'WEBP' and (image.mode in ('RGBA', 'LA') or 'transparency' in image.info):
+        image = image.convert('RGBA')
+    else:
+        image = image.convert('RGB')
+    if crop:
+        image = ImageOps.fit(image, (width, height), Image.LANCZOS)
+    else:
+        image.thumbnail((width, height), Image.LANCZOS)
+    output = BytesIO()
+    image.save(output, RENDITION_FORMAT, quality=RENDITION_QUALITY)
+    return output.getvalue()
+
+
+def generate_renditions(name, pk):
+    """
+    Render every rendition of one row's image and attach them to the row.
+    Returns True when renditions were written.
+    """
+    kind = _kinds[name]
+    instance = kind.model.objects.filter(pk=pk).first()
+    if instance is None or not kind.is_stale(instance):
+        return False
+
+    field_file = getattr(instance, kind.field)
+    storage = field_file.storage
+    previous = getattr(instance, kind.renditions_field) or {}
+    renditions = {'source': field_file.name}
+    with storage.open(field_file.name, 'rb') as f, Image.open(f) as source:
+        # Let JPEG decode at a reduced scale when even the largest rendition is much smaller
+        largest = max(max(width, height) for width, height, _ in kind.renditions.values())
+        source.draft('RGB', (largest, largest))
+        for rendition, (width, height, crop) in kind.renditions.items():
+            path = rendition_path(field_file.name, rendition)
+            if storage.exists(path):
+                storage.delete(path)
+            renditions[rendition] = storage.save(path, ContentFile(render(source, width, height, crop)))
+
+    # The image may have been replaced while we rendered; its own job will handle the new file
+    current = kind.model.objects.filter(pk=pk).values_list(kind.field, flat=True).first()
+    if current != field_file.name:
+        for rendition in kind.renditions:
+            storage.delete(renditions[rendition])
+        return False
+
+    setattr(instance, kind.renditions_field, renditions)
+    instance.save(update_fields=[kind.renditions_field])
+    for rendition, path in previous.items():
+        if rendition != 'source' and path not in renditions.values():
+            storage.delete(path)
+    logger.info(f"Generated {len(kind.renditions)} {name} renditions for {kind.model_label} {pk}")
+    if kind.on_complete:
+        kind.on_complete(instance)
+    return True
+
+
+def schedule_renditions(name, instance, update_fields=None):
+    """
+    Queue rendition generation for a saved row whose image changed. The job
+    is written in the same transaction as the row and runs in a job worker,
+    never in the request.
+    """
+    from .tasks import generate_image_renditions
+
+    kind = _kinds[name]
+    if update_fields is not None and kind.field not in update_fields:
+        return
+    if not kind.is_stale(instance):
+        return
+    generate_image_renditions.enqueue(name=name, pk=instance.pk)
+
+
+def rendition_urls(instance, name, request=None):
+    """
+    URLs of an image's renditions. Until they exist (or for images that could
+    not be processed) every entry points at the original file.
+    """
+    kind = _kinds[name]
+    field_file = getattr(instance, kind.field)
+    if not field_file:
+        return {rendition: None for rendition in kind.renditions}
+    renditions = getattr(instance, kind.renditions_field) or {}
+    if renditions.get('source') != field_file.name:
+        renditions = {}
+    urls = {}
+    for rendition in kind.renditions:
+        path = renditions.get(rendition)
+        url = field_file.storage.url(path) if path else field_file.url
+        urls[rendition] = request.build_absolute_uri(url) if request else url
+    return urls
@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.images import generate_renditions, get_image_kind
+
+KINDS = ['profile_image', 'chat_image']
+
+
+class Command(BaseCommand):
+    help = "Generate missing renditions for existing profile images (media/profile_images) and chat images (media/chat_images)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=KINDS, help="Only process one image kind")
+        parser.add_argument('--workers', type=int, default=4, help="Images rendered in parallel")
+
+    def handle(self, *args, **options):
+        kinds = [options['kind']] if options['kind'] else KINDS
+        for name in kinds:
+            kind = get_image_kind(name)
+            candidates = (
+                kind.model.objects.exclude(**{kind.field: ''}).exclude(**{f'{kind.field}__isnull': True})
+                .values_list('pk', kind.field, kind.renditions_field)
+            )
+            # Only rows whose renditions are missing or were made from a different file
+            pks = [pk for pk, source, renditions in candidates.iterator() if (renditions or {}).get('source') != source]
+            with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                results = list(executor.map(lambda pk: self.process(name, pk), pks))
+            self.stdout.write(self.style.SUCCESS(
+                f"{name}: processed {results.count(True)}, failed {results.count(None)}, skipped {results.count(False)}"
+            ))
+
+    def process(self, name, pk):
+        close_old_connections()
+        try:
+            return generate_renditions(name, pk)
+        except Exception as e:
+            self.stderr.write(f"{name} {pk}: {str(e)}")
+            return None
+        finally:
+            close_old_connections()
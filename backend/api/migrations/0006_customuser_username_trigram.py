@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:00
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+import django.db.models.functions.text
+
+import search.operations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_alter_customuser_is_active"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        search.operations.PostgresOnlyAddIndex(
+            model_name="customuser",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("username"),
+                    name="gin_trgm_ops",
+                ),
+                name="api_user_username_trgm",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_customuser_username_trigram"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="profile_image_renditions",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
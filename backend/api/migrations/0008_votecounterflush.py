@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_customuser_profile_image_renditions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VoteCounterFlush",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("batch", models.CharField(max_length=32, unique=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
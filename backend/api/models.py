@@ -1,7 +1,11 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 import pyotp
+from .cache import cache
+from .images import register_image_kind, schedule_renditions
 import time
 import logging
 
@@ -10,10 +14,13 @@ logger = logging.getLogger(__name__)
 class CustomUser(AbstractUser):
     email = models.EmailField(unique=True)
     profile_image = models.ImageField(upload_to="profile_images/", blank=True, null=True)
+    profile_image_renditions = models.JSONField(default=dict, blank=True)  # Filled by api.images
     otp_secret = models.CharField(max_length=32, blank=True, null=True)
     otp_verified = models.BooleanField(default=False)
     otp_created_at = models.DateTimeField(null=True, blank=True)
     is_active = models.BooleanField(default=False)  # Override the default to False
+    # Fuzzy username search (search.fuzzy) uses the trigram index api_user_username_trgm, created
+    # by migration 0006 on PostgreSQL only; see search.operations.PostgresOnlyAddIndex
 
     def get_credits(self):
         from credits.models import Credit
@@ -49,6 +56,12 @@ class CustomUser(AbstractUser):
             logger.info(f"OTP verified for user {self.username}")  # Log successful verification
         return is_valid
 
+# Square crops for avatars in lists and headers
+register_image_kind('profile_image', 'api.CustomUser', 'profile_image', 'profile_image_renditions', {
+    'avatar': (256, 256, True),
+    'thumbnail': (64, 64, True),
+})
+
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
 
@@ -57,4 +70,36 @@ class Category(models.Model):
         verbose_name_plural = "Categories"
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+class VoteCounterFlush(models.Model):
+    # A batch of buffered vote counter changes already written to the database (see api.votes)
+    batch = models.CharField(max_length=32, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.batch
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_user_caches(sender, instance, update_fields=None, **kwargs):
+    # Covers profile edits, password changes and (de)activation alike
+    cache.invalidate_on_commit('auth_users', instance.id)
+    cache.invalidate_on_commit('auth_status', instance.id)
+    # Skill profile listings embed the username
+    if not update_fields or 'username' in update_fields:
+        cache.invalidate_on_commit('skill_profiles')
+
+@receiver(post_save, sender=CustomUser)
+def process_profile_image(sender, instance, update_fields=None, **kwargs):
+    schedule_renditions('profile_image', instance, update_fields)
+
+@receiver(post_delete, sender=CustomUser)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    cache.invalidate_on_commit('auth_users', instance.id)
+    cache.invalidate_on_commit('auth_status', instance.id)
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_caches(sender, instance, **kwargs):
+    from .registry import invalidate_categories
+    invalidate_categories()
+    cache.invalidate_on_commit('skill_profiles')
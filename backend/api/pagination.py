@@ -0,0 +1,214 @@
+# api/pagination.py
+import base64
+import datetime
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.exceptions import FieldError
+from django.db.models import FloatField, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder truncates datetimes to milliseconds; seeks need the exact value."""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Project-wide cursor pagination that seeks instead of using OFFSET.
+
+    The page is ordered by the queryset's own ordering (the view's `ordering`
+    after OrderingFilter, a search rank, or `-created_at` by default) with the
+    primary key appended as a tiebreaker. A cursor is an opaque token holding
+    the sort values of the row at the page boundary, and the next page is
+    fetched with `WHERE (created_at, id) < (:created_at, :id)`. With an index
+    on the sort columns every page costs one index range scan of
+    `page_size + 1` rows, however deep the client goes. No total count is
+    returned because counting is exactly the cost this avoids.
+
+    Ordering fields must be non-null and readable off the result instances
+    (model fields or annotations); expression orderings fall back to the
+    default ordering. Float sort keys (a search rank, a trigram similarity)
+    cannot be seeked on: the value round-tripped through the cursor need not
+    compare equal to the stored one, so rows tied at the boundary would be
+    skipped or repeated. Ranked results are paged by offset instead, behind
+    the same opaque cursor; relevance lists are rarely read deeply.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    default_ordering = ('-created_at',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(queryset, view)
+        self.by_offset = self.is_ranked(queryset, self.ordering)
+
+        cursor = self.decode_cursor(request)
+        self.had_cursor = cursor is not None
+        if self.by_offset:
+            return self.paginate_by_offset(queryset, cursor['p'] if cursor else 0)
+        reverse = cursor['r'] if cursor else False
+
+        ordering = [self._flip(field) for field in self.ordering] if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if cursor:
+            queryset = queryset.filter(self.seek_filter(ordering, cursor['v']))
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+        self.reverse = reverse
+        self.page = results
+        return results
+
+    def paginate_by_offset(self, queryset, offset):
+        results = list(queryset.order_by(*self.ordering)[offset:offset + self.page_size + 1])
+        self.has_more = len(results) > self.page_size
+        self.offset = offset
+        self.reverse = False
+        self.page = results[:self.page_size]
+        return self.page
+
+    @staticmethod
+    def is_ranked(queryset, ordering):
+        """Whether any sort key is a float annotation, which only offset paging handles exactly."""
+        for field in ordering:
+            annotation = queryset.query.annotations.get(field.lstrip('-'))
+            if annotation is None:
+                continue
+            try:
+                if isinstance(annotation.output_field, FloatField):
+                    return True
+            except FieldError:
+                return True
+        return False
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', None) or queryset.query.order_by or queryset.model._meta.ordering
+        if not ordering or not all(isinstance(field, str) and field != '?' for field in ordering):
+            ordering = self.default_ordering if hasattr(queryset.model, 'created_at') else ('-pk',)
+        ordering = [field for field in ordering if field.lstrip('-') not in ('pk', 'id')] + [
+            next((field for field in ordering if field.lstrip('-') in ('pk', 'id')), None)
+        ]
+        if ordering[-1] is None:
+            # Tiebreak on the primary key in the same direction as the last sort key
+            ordering[-1] = '-pk' if len(ordering) > 1 and ordering[-2].startswith('-') else 'pk'
+        return ordering
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def _value(instance, field):
+        return reduce(getattr, field.lstrip('-').split('__'), instance)
+
+    @staticmethod
+    def seek_filter(ordering, values):
+        """(a, b, c) after (x, y, z) as a | (a = x & b) | (a = x & b = y & c) with per-field direction."""
+        clauses = []
+        for position, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {ordering[i].lstrip('-'): values[i] for i in range(position)}
+            clauses.append(Q(**equal, **{f'{name}__{lookup}': values[position]}))
+        return reduce(or_, clauses)
+
+    def encode_cursor(self, instance, reverse):
+        return self._link({
+            'o': self.ordering,
+            'v': [self._value(instance, field) for field in self.ordering],
+            'r': reverse,
+        })
+
+    def encode_offset(self, offset):
+        if offset <= 0:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self._link({'o': self.ordering, 'p': offset})
+
+    def _link(self, payload):
+        token = base64.urlsafe_b64encode(json.dumps(payload, cls=CursorEncoder).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            ordering = payload['o']
+            if self.by_offset:
+                cursor = {'p': int(payload['p'])}
+                valid = cursor['p'] >= 0
+            else:
+                cursor = {'v': payload['v'], 'r': bool(payload['r'])}
+                valid = len(cursor['v']) == len(ordering)
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        # A cursor only makes sense for the ordering it was issued under
+        if ordering != self.ordering or not valid:
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def get_next_link(self):
+        if self.by_offset:
+            return self.encode_offset(self.offset + self.page_size) if self.has_more else None
+        if self.reverse:
+            # Walking backwards from a cursor: the cursor row itself is still ahead
+            return self.encode_cursor(self.page[-1], False) if self.page else None
+        if not self.has_more:
+            return None
+        return self.encode_cursor(self.page[-1], False)
+
+    def get_previous_link(self):
+        if not self.had_cursor:
+            return None
+        if self.by_offset:
+            return self.encode_offset(self.offset - self.page_size) if self.offset else None
+        if self.reverse and not self.has_more:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        if not self.page:
+            return None
+        return self.encode_cursor(self.page[0], True)
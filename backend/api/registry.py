@@ -0,0 +1,103 @@
+# api/registry.py
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from .cache import cache
+from .models import Category
+
+logger = logging.getLogger(__name__)
+
+# An unknown id or name reloads the table at most this often per process
+MISS_RELOAD_INTERVAL = getattr(settings, 'CATEGORY_MISS_RELOAD_INTERVAL', 5)
+
+
+class _Snapshot:
+    def __init__(self, version, categories):
+        self.version = version
+        self.by_id = {category.id: category for category in categories}
+        self.by_name = {category.name: category for category in categories}
+        self.payload = [{'id': category.id, 'name': category.name} for category in categories]
+        digest = hashlib.sha256(json.dumps(self.payload, sort_keys=True).encode()).hexdigest()
+        self.etag = f'"{digest[:32]}"'
+
+
+class CategoryRegistry:
+    """
+    Process-wide, read-only snapshot of every Category.
+
+    The table is loaded once and lookups by id or name are dict hits. The
+    snapshot is tagged with the version of the 'categories' cache namespace,
+    which api.models bumps on every save or delete and broadcasts to all
+    workers, so other processes reload on their next access. An unknown id
+    or name triggers a reload before it is reported missing, which covers a
+    category created by another worker before its broadcast lands; such
+    reloads happen at most once per MISS_RELOAD_INTERVAL seconds, so bad ids
+    in requests cannot turn every lookup into a table scan.
+
+    Returned instances are shared between requests and must not be modified.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._loaded_at = None
+
+    def _current(self):
+        version = cache.version('categories')
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != version:
+            snapshot = self.reload(version)
+        return snapshot
+
+    def reload(self, version=None):
+        with self._lock:
+            version = cache.version('categories') if version is None else version
+            snapshot = _Snapshot(version, list(Category.objects.order_by('id')))
+            self._snapshot = snapshot
+            self._loaded_at = time.monotonic()
+        logger.info(f"Loaded {len(snapshot.by_id)} categories (version {version})")
+        return snapshot
+
+    def invalidate(self):
+        self._snapshot = None
+
+    def _lookup(self, index, key):
+        category = getattr(self._current(), index).get(key)
+        if category is None and time.monotonic() - self._loaded_at >= MISS_RELOAD_INTERVAL:
+            category = getattr(self.reload(), index).get(key)
+        return category
+
+    def get(self, category_id):
+        """Category with this id, or None."""
+        try:
+            return self._lookup('by_id', int(category_id))
+        except (TypeError, ValueError):
+            return None
+
+    def get_by_name(self, name):
+        """Category with this exact name, or None."""
+        return self._lookup('by_name', name)
+
+    def all(self):
+        return list(self._current().by_id.values())
+
+    def payload(self):
+        """(etag, [{'id', 'name'}, ...]) for the list endpoints."""
+        snapshot = self._current()
+        return snapshot.etag, snapshot.payload
+
+
+categories = CategoryRegistry()
+
+
+def invalidate_categories():
+    """Drop the local snapshot now and every worker's once the transaction commits."""
+    categories.invalidate()
+    transaction.on_commit(categories.invalidate)
+    cache.invalidate_on_commit('categories')
@@ -1,20 +1,57 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
-from .models import CustomUser
+from .models import CustomUser, Category
+from .registry import categories
+from .images import rendition_urls
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
-from django.core.mail import send_mail
+from jobs.tasks import queue_email
 from django.conf import settings
 from django.contrib.auth import get_user_model
 
 
 User = get_user_model()
 
+class CategoryPrimaryKeyField(serializers.PrimaryKeyRelatedField):
+    """Category primary key field that validates against the in-memory registry instead of the database."""
+
+    def __init__(self, **kwargs):
+        if not kwargs.get('read_only'):
+            kwargs.setdefault('queryset', Category.objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        category = categories.get(data)
+        if category is None:
+            try:
+                int(data)
+            except (TypeError, ValueError):
+                self.fail('incorrect_type', data_type=type(data).__name__)
+            self.fail('does_not_exist', pk_value=data)
+        return category
+
+class ImageRenditionsField(serializers.Field):
+    """Read-only {rendition: url} map for an image kind registered in api.images."""
+
+    def __init__(self, kind, **kwargs):
+        self.kind = kind
+        kwargs['read_only'] = True
+        kwargs.setdefault('source', '*')
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        return rendition_urls(instance, self.kind, self.context.get('request'))
+
+
 class UserSerializer(serializers.ModelSerializer):
+    profile_image_renditions = ImageRenditionsField('profile_image')
+
     class Meta:
         model = CustomUser
-        fields = ["id", "username", "email", "password", "profile_image", "is_staff"]
+        fields = ["id", "username", "email", "password", "profile_image", "profile_image_renditions", "is_staff"]
         extra_kwargs = {
             "password": {"write_only": True, "required": False},
             "profile_image": {"required": False, "allow_null": True},
@@ -63,9 +100,9 @@ class PasswordResetRequestSerializer(serializers.Serializer):
 
         reset_link = f"https://elevate-hub-theta.vercel.app/reset-password/{uid}/{token}/"
 
-        send_mail(
+        queue_email(
             subject="Password Reset Request",
             message=f"Click the link below to reset your password:\n{reset_link}",
-            from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[email],
+            from_email=settings.DEFAULT_FROM_EMAIL,
         )
\ No newline at end of file
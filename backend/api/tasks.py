@@ -0,0 +1,18 @@
+# api/tasks.py
+from django.conf import settings
+
+from jobs.queue import task
+from jobs.scheduler import periodic
+
+from .images import generate_renditions
+from .votes import flush_vote_counters
+
+
+@task(max_attempts=3)
+def generate_image_renditions(name, pk):
+    generate_renditions(name, pk)
+
+
+@periodic(getattr(settings, 'VOTE_COUNTER_FLUSH_INTERVAL', 10))
+def flush_buffered_vote_counters():
+    return flush_vote_counters()
@@ -1,3 +1,378 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import Value
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+from PIL import Image
+
+from jobs.models import Job
+from jobs.queue import Worker
+
+from discussions.models import Discussion, DiscussionPost
+from projects.models import ChatSession, HelpRequest
+from resources.models import Resource
+from skills.models import Mentorship, SkillProfile
+from .authentication import CachedJWTAuthentication, authenticate_token
+from .cache import LocalLRU, TwoTierCache, _MISSING, cache
+from .dashboard import SECTIONS
+from .images import generate_renditions, rendition_urls
+from .models import Category, CustomUser
+from .pagination import KeysetPagination
+from .registry import MISS_RELOAD_INTERVAL, categories
+
+
+# Sections run on the test thread so they see the test transaction
+@mock.patch('api.dashboard.CONCURRENT_SECTIONS', False)
+class DashboardTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="user", email="user@example.com", password="pass", is_active=True)
+        self.user.get_credits().add_credits(5, "Welcome bonus")
+
+    def create_history(self, count):
+        category = Category.objects.get_or_create(name="Programming")[0]
+        other = CustomUser.objects.create_user(username=f"other{count}", email=f"other{count}@example.com", password="pass", is_active=True)
+        discussion = Discussion.objects.create(title="Discussion", created_by=other, category=category)
+        for i in range(count):
+            self.user.get_credits().add_credits(1, f"Bonus {i}")
+            DiscussionPost.objects.create(discussion=discussion, user=self.user, content=f"Post {i}")
+            Resource.objects.create(title=f"Resource {i}", description="Notes", category=category, uploaded_by=self.user)
+            help_request = HelpRequest.objects.create(title=f"Request {i}", description="Need help", category=category, created_by=self.user)
+            ChatSession.objects.create(help_request=help_request, requester=self.user, helper=other)
+            skill = SkillProfile.objects.create(user=other, skill=f"Skill {count}-{i}", category=category, proficiency="expert", is_mentor=True)
+            Mentorship.objects.create(learner=self.user, mentor=other, skill=skill)
+
+    def section_queries(self, name):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("me-dashboard") + f"?include={name}")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("errors", response.json())
+        return len(queries)
+
+    def test_sections_stay_within_their_query_budget(self):
+        self.client.force_login(self.user)
+        self.create_history(2)
+        # Session, user and Credit row; the "user" section itself adds nothing
+        baseline = self.section_queries("user")
+        self.create_history(12)
+        self.assertEqual(self.section_queries("user"), baseline)
+        for name, (_, budget) in SECTIONS.items():
+            with self.subTest(section=name):
+                self.assertLessEqual(self.section_queries(name), baseline + budget)
+
+    def test_rejects_other_methods(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse("me-dashboard"))
+        self.assertEqual(response.status_code, 405)
+
+    def test_requires_authentication(self):
+        response = self.client.get(reverse("me-dashboard"))
+        self.assertEqual(response.status_code, 401)
+
+    def test_returns_every_section_by_default(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("me-dashboard"))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            set(data), {"user", "credits", "contributions", "help_requests", "active_chats", "mentorships"}
+        )
+        self.assertEqual(data["user"]["credits"], data["credits"]["balance"])
+        self.assertEqual(data["contributions"]["results"], [])
+
+    def test_include_selects_sections(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("me-dashboard") + "?include=credits")
+        self.assertEqual(list(response.json()), ["credits"])
+
+        response = self.client.get(reverse("me-dashboard") + "?include=credits,secrets")
+        self.assertEqual(response.status_code, 400)
+
+
+class KeysetPaginationTests(TestCase):
+    def test_float_orderings_are_paged_by_offset(self):
+        # The trigram similarity fuzzy search orders by on PostgreSQL
+        ranked = CustomUser.objects.annotate(similarity=TrigramSimilarity("username", Value("user")))
+        self.assertTrue(KeysetPagination.is_ranked(ranked, ["-similarity", "username", "pk"]))
+        self.assertFalse(KeysetPagination.is_ranked(ranked, ["username", "pk"]))
+        self.assertFalse(KeysetPagination.is_ranked(CustomUser.objects.all(), ["-date_joined", "-pk"]))
+
+
+class CategoryRegistryTests(TestCase):
+    def setUp(self):
+        categories.invalidate()
+        self.category = Category.objects.create(name="Programming")
+
+    def test_unchanged_list_revalidates_with_304(self):
+        response = self.client.get(reverse("category_list"))
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertIn({"id": self.category.id, "name": "Programming"}, response.json())
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("category_list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+        # Saving a category invalidates the snapshot, so the old ETag no longer matches
+        Category.objects.create(name="Design")
+        response = self.client.get(reverse("category_list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("Design", [category["name"] for category in response.json()])
+        self.assertEqual(categories.get_by_name("Design").name, "Design")
+
+    def test_unknown_ids_reload_at_most_once_per_interval(self):
+        self.assertEqual(categories.get(self.category.id), self.category)
+        with self.assertNumQueries(0):
+            for _ in range(5):
+                self.assertIsNone(categories.get(self.category.id + 100))
+                self.assertIsNone(categories.get_by_name("Missing"))
+
+        # Created elsewhere, without this process seeing the invalidation
+        [other] = Category.objects.bulk_create([Category(name="Writing")])
+        self.assertIsNone(categories.get_by_name("Writing"))
+        later = categories._loaded_at + MISS_RELOAD_INTERVAL
+        with mock.patch("api.registry.time.monotonic", return_value=later):
+            with self.assertNumQueries(1):
+                self.assertEqual(categories.get_by_name("Writing"), other)
+            with self.assertNumQueries(0):
+                self.assertIsNone(categories.get_by_name("Missing"))
+
+
+def isolate_cache(test):
+    """
+    Start `test` with empty L1 and (local memory) L2 caches and no Redis
+    pub/sub; returns the list broadcasts are captured in.
+    """
+    published = []
+    for target, side_effect in (("_publish", published.append), ("ensure_listener", None)):
+        patcher = mock.patch.object(TwoTierCache, target, side_effect=side_effect)
+        patcher.start()
+        test.addCleanup(patcher.stop)
+    # Local memory caches outlive the test, and rolled back ids are reused
+    caches["default"].clear()
+    cache.local.clear()
+    test.addCleanup(cache.local.clear)
+    return published
+
+
+# Local memory stands in for the shared Redis L2; pub/sub is captured instead of sent
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class TwoTierCacheTests(TestCase):
+    def setUp(self):
+        self.published = isolate_cache(self)
+        self.workers = [TwoTierCache(), TwoTierCache()]
+        self.computed = []
+
+    def compute(self, value):
+        def compute():
+            self.computed.append(value)
+            return value
+        return compute
+
+    def deliver(self):
+        # What every worker's listener does with the broadcasts
+        for message in self.published:
+            for worker in self.workers:
+                worker._apply_remote_invalidation(message)
+        self.published.clear()
+
+    def test_lru_evicts_the_least_recently_used_entry_and_expires(self):
+        lru = LocalLRU(max_entries=2)
+        lru.set("ns", "a", 1, ttl=10)
+        lru.set("ns", "b", 2, ttl=10)
+        lru.get("ns", "a")
+        lru.set("ns", "c", 3, ttl=10)
+        self.assertIs(lru.get("ns", "b"), _MISSING)
+        self.assertEqual((lru.get("ns", "a"), lru.get("ns", "c")), (1, 3))
+
+        with mock.patch("api.cache.time.monotonic", return_value=10 ** 9):
+            self.assertIs(lru.get("ns", "a"), _MISSING)
+
+    def test_value_is_computed_once_across_workers(self):
+        first, second = self.workers
+        self.assertEqual(first.get_or_set("ns", "key", self.compute("value"), 60), "value")
+        self.assertEqual(first.get_or_set("ns", "key", self.compute("again"), 60), "value")
+        self.assertEqual(second.get_or_set("ns", "key", self.compute("again"), 60), "value")
+        self.assertEqual(self.computed, ["value"])
+
+    def test_key_invalidation_reaches_every_worker(self):
+        first, second = self.workers
+        for worker in self.workers:
+            worker.get_or_set("ns", "key", self.compute("old"), 60)
+            worker.get_or_set("ns", "other", self.compute("other"), 60)
+
+        first.invalidate("ns", "key")
+        self.assertEqual(self.published, [{"namespace": "ns", "key": "key"}])
+        self.deliver()
+        self.assertEqual(second.get_or_set("ns", "key", self.compute("new"), 60), "new")
+        self.assertEqual(first.get_or_set("ns", "key", self.compute("newer"), 60), "new")
+        self.assertEqual(second.get_or_set("ns", "other", self.compute("stale"), 60), "other")
+
+    def test_namespace_invalidation_orphans_every_entry(self):
+        first, second = self.workers
+        for key in ("a", "b"):
+            first.get_or_set("ns", key, self.compute("old"), 60)
+            second.get_or_set("ns", key, self.compute("old"), 60)
+        first.get_or_set("other", "a", self.compute("kept"), 60)
+
+        first.invalidate("ns")
+        self.deliver()
+        self.computed.clear()
+        for key in ("a", "b"):
+            self.assertEqual(second.get_or_set("ns", key, self.compute("new"), 60), "new")
+        self.assertEqual(first.get_or_set("other", "a", self.compute("stale"), 60), "kept")
+        self.assertEqual(self.computed, ["new", "new"])
+
+    def test_invalidation_waits_for_the_commit(self):
+        cache.get_or_set("ns", "key", self.compute("old"), 60)
+        with self.captureOnCommitCallbacks(execute=True):
+            cache.invalidate_on_commit("ns", "key")
+            self.assertEqual(cache.get("ns", "key"), "old")
+        self.assertIsNone(cache.get("ns", "key"))
+
+    def test_auth_status_is_cached_until_the_balance_changes(self):
+        user = CustomUser.objects.create_user(username="user", email="user@example.com", password="pass", is_active=True)
+        self.client.force_login(user)
+        balance = self.client.get(reverse("auth_status")).json()["user"]["credits"]
+        # Only the session and user lookups; the view body is skipped
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(reverse("auth_status")).json()["user"]["credits"], balance)
+        self.assertFalse([query for query in queries if "credits_credit" in query["sql"]])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user.get_credits().add_credits(5, "Bonus")
+        self.assertEqual(self.client.get(reverse("auth_status")).json()["user"]["credits"], balance + 5)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        isolate_cache(self)
+        self.user = CustomUser.objects.create_user(username="user", email="user@example.com", password="pass", is_active=True)
+        self.token = str(AccessToken.for_user(self.user))
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+    def resolve(self):
+        auth = CachedJWTAuthentication()
+        return auth.get_user(auth.get_validated_token(self.token))
+
+    def test_user_is_resolved_once_then_served_from_cache(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.resolve(), self.user)
+        with self.assertNumQueries(0):
+            user = self.resolve()
+        self.assertEqual(user.username, "user")
+        # Secrets are not cached; reading them loads them from the database
+        self.assertNotIn("password", user.__dict__)
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password("pass"))
+
+        # The user lookup is skipped, only the list itself is queried
+        self.resolve()
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("user-skill-profile-list"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_deactivated_user_is_rejected_once_the_save_commits(self):
+        self.resolve()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.resolve()
+        self.assertEqual(self.client.get(reverse("user-skill-profile-list")).status_code, 401)
+        self.assertIsInstance(authenticate_token(self.token), AnonymousUser)
+
+    def test_websocket_token_resolves_to_the_user_or_anonymous(self):
+        self.assertEqual(authenticate_token(self.token), self.user)
+        self.assertIsInstance(authenticate_token("garbage"), AnonymousUser)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertIsInstance(authenticate_token(self.token), AnonymousUser)
+
+
+def jpeg_upload(name, size, color="red"):
+    image = Image.new("RGB", size, color)
+    exif = Image.Exif()
+    exif[0x010F] = "Camera maker"
+    output = io.BytesIO()
+    image.save(output, "JPEG", exif=exif)
+    return SimpleUploadedFile(name, output.getvalue(), content_type="image/jpeg")
+
+
+class ImageRenditionTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.user = CustomUser.objects.create_user(username="user", email="user@example.com", password="pass", is_active=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, upload):
+        response = self.client.put(reverse("upload-profile", args=[self.user.id]), {"profile_image": upload}, format="multipart")
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+
+    def test_upload_queues_renditions_that_replace_the_original_in_urls(self):
+        self.upload(jpeg_upload("photo.jpg", (600, 400)))
+        # The request only queues the work; until it runs every URL is the original
+        self.assertEqual(self.user.profile_image_renditions, {})
+        self.assertEqual(set(rendition_urls(self.user, "profile_image").values()), {self.user.profile_image.url})
+        self.assertEqual(Job.objects.filter(status=Job.QUEUED).count(), 1)
+
+        self.assertEqual(Worker().run_burst(), 1)
+        self.user.refresh_from_db()
+        renditions = self.user.profile_image_renditions
+        self.assertEqual(renditions["source"], self.user.profile_image.name)
+        for name, size in (("avatar", (256, 256)), ("thumbnail", (64, 64))):
+            with Image.open(os.path.join(self.media_root, renditions[name])) as rendition:
+                self.assertEqual(rendition.size, size)
+                self.assertFalse(rendition.getexif())
+        self.assertTrue(rendition_urls(self.user, "profile_image")["avatar"].endswith(renditions["avatar"]))
+
+        # Nothing left to do for an up to date row
+        self.assertFalse(generate_renditions("profile_image", self.user.pk))
+
+    def test_replaced_image_gets_fresh_renditions_and_old_ones_are_removed(self):
+        self.upload(jpeg_upload("first.jpg", (300, 300)))
+        Worker().run_burst()
+        self.user.refresh_from_db()
+        old = self.user.profile_image_renditions
+
+        self.upload(jpeg_upload("second.jpg", (300, 300), "blue"))
+        # Still describing the first image, so the original is served meanwhile
+        self.assertEqual(rendition_urls(self.user, "profile_image")["avatar"], self.user.profile_image.url)
+        Worker().run_burst()
+        self.user.refresh_from_db()
+        new = self.user.profile_image_renditions
+        self.assertEqual(new["source"], self.user.profile_image.name)
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, new["avatar"])))
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, old["avatar"])))
+
+    def test_unrelated_saves_do_not_queue_work(self):
+        self.upload(jpeg_upload("photo.jpg", (300, 300)))
+        Worker().run_burst()
+        self.user.refresh_from_db()
+        self.user.first_name = "Renamed"
+        self.user.save()
+        self.assertFalse(Job.objects.filter(status=Job.QUEUED).exists())
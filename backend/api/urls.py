@@ -1,12 +1,14 @@
 from django.urls import path, include
 from .views import (
     CreateUserView, CustomTokenObtainPairView, UserListView, UserDeleteView,
-    ProfileImageUploadView, UserListCreateView, UserRetrieveUpdateDestroyView,
+    ProfileImageUploadView, UserListCreateView, UserRetrieveUpdateDestroyView, UserAutocompleteView,
     PasswordResetRequestView, PasswordResetConfirmView, auth_status, LogoutView,
     GenerateOTPView, VerifyOTPView, UserUpdateView, create_session, get_csrf,
     user_contributions, edit_contribution, delete_contribution, logout_session,
-    user_help_requests, edit_help_request, delete_help_request, ChangePasswordView
+    user_help_requests, edit_help_request, delete_help_request, ChangePasswordView,
+    CategoryListView
 )
+from .dashboard import dashboard
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.conf import settings
 from django.conf.urls.static import static
@@ -17,6 +19,8 @@ urlpatterns = [
     path("token/refresh/", TokenRefreshView.as_view(), name="refresh"),
     path("api-auth/", include("rest_framework.urls")),
     path("users/", UserListCreateView.as_view(), name="user_list_create"),
+    path("users/autocomplete/", UserAutocompleteView.as_view(), name="user_autocomplete"),
+    path("categories/", CategoryListView.as_view(), name="category_list"),
     path("users/<int:pk>/", UserRetrieveUpdateDestroyView.as_view(), name="user_detail"),
     path("users/<int:user_id>/upload-profile/", ProfileImageUploadView.as_view(), name="upload-profile"),
     path("reset-password/", PasswordResetRequestView.as_view(), name="password_reset_request"),
@@ -35,6 +39,7 @@ urlpatterns = [
     path('contributions/<str:contribution_type>/<int:contribution_id>/edit/', edit_contribution, name='edit-contribution'),
     path('contributions/<str:contribution_type>/<int:contribution_id>/delete/', delete_contribution, name='delete-contribution'),
     path('user/help-requests/', user_help_requests, name='user_help_requests'),
+    path('me/dashboard/', dashboard, name='me-dashboard'),
     path('help-requests/<int:help_request_id>/edit/', edit_help_request, name='edit_help_request'),
     path('help-requests/<int:help_request_id>/delete/', delete_help_request, name='delete_help_request'),
     path('change-password/', ChangePasswordView.as_view(), name='change-password'),
@@ -12,6 +12,12 @@ from rest_framework import status
 from django.contrib.auth import login
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from .models import CustomUser
+from .cache import cache_response
+from .registry import categories
+from .images import rendition_urls
+from .contributions import contributions_page
+from .pagination import KeysetPagination
+from search.fuzzy import fuzzy_search
 from discussions.models import DiscussionPost
 from resources.models import Resource
 from projects.models import HelpRequest
@@ -23,7 +29,7 @@ from django.contrib.auth import get_user_model, logout
 from django.http import JsonResponse
 from credits.models import Credit
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.core.mail import send_mail
+from jobs.tasks import queue_email
 from django.conf import settings
 import os
 from django.views.decorators.csrf import ensure_csrf_cookie, csrf_exempt
@@ -87,6 +93,13 @@ class CreateUserView(generics.CreateAPIView):
         user = serializer.save()
         logger.info(f"User created: {user.username}")  # Log user creation
 
+def search_users(queryset, query):
+    """Typo-tolerant username search ranked exact > prefix > substring > similar."""
+    if query:
+        return fuzzy_search(queryset, "username", query)
+    return queryset.order_by("username", "id")
+
+
 class UserListView(generics.ListAPIView):
     queryset = CustomUser.objects.all()
     serializer_class = UserSerializer
@@ -94,7 +107,7 @@ class UserListView(generics.ListAPIView):
 
     def get_queryset(self):
         query = self.request.query_params.get("q", "")
-        return self.queryset.filter(username__icontains=query)
+        return search_users(self.queryset, query)
 
 class UserDeleteView(generics.DestroyAPIView):
     queryset = CustomUser.objects.all()
@@ -170,7 +183,34 @@ class UserListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         query = self.request.query_params.get("q", "")
-        return self.queryset.filter(username__icontains=query)
+        return search_users(self.queryset, query)
+
+class UserAutocompleteView(APIView):
+    """
+    Lightweight username suggestions for search boxes: at most `limit`
+    (default 10, max 20) matches with only id, username and avatar.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response([])
+        try:
+            limit = min(int(request.query_params.get("limit", 10)), 20)
+        except ValueError:
+            limit = 10
+        users = search_users(
+            CustomUser.objects.filter(is_active=True).only("id", "username", "profile_image", "profile_image_renditions"), query
+        )[:limit]
+        return Response([
+            {
+                "id": user.id,
+                "username": user.username,
+                "avatar": rendition_urls(user, "profile_image", request)["thumbnail"],
+            }
+            for user in users
+        ])
 
 class UserRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = CustomUser.objects.all()
@@ -214,19 +254,40 @@ def get_csrf(request):
     response.set_cookie('csrftoken', csrf_token, samesite='Lax')  # Ensure cookie is set
     return response
 
+class CategoryListView(APIView):
+    """
+    All categories, served from the in-memory registry with a strong ETag.
+    Clients revalidating with If-None-Match get a bodiless 304 while nothing
+    has changed.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        etag, payload = categories.payload()
+        if etag in [tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")]:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(payload)
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        return response
+
+def auth_user_data(user, credit):
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'profile_image': user.profile_image.url if user.profile_image else None,
+        'credits': credit.balance,
+    }
+
 @api_view(['GET'])
 @ensure_csrf_cookie
+@cache_response('auth_status', ttl=5 * 60, key=lambda request: request.user.id or 'anon')
 def auth_status(request):
     if request.user.is_authenticated:
         credit = request.user.get_credits()
-        user_data = {
-            'id': request.user.id,
-            'username': request.user.username,
-            'email': request.user.email,
-            'profile_image': request.user.profile_image.url if request.user.profile_image else None,
-            'credits': credit.balance,
-        }
-        return Response({'is_authenticated': True, 'user': user_data})
+        return Response({'is_authenticated': True, 'user': auth_user_data(request.user, credit)})
     return Response({'is_authenticated': False})
 
 @csrf_exempt
@@ -280,13 +341,12 @@ class GenerateOTPView(APIView):
         try:
             otp_code = user.generate_otp()
             
-            # Send OTP via email
-            send_mail(
+            # Sent by a job worker so the response does not wait on SMTP
+            queue_email(
                 'Your OTP Code',
                 f'Your OTP code is: {otp_code}',
-                settings.EMAIL_HOST_USER,
                 [email],
-                fail_silently=False,
+                from_email=settings.EMAIL_HOST_USER,
             )
             
             return Response({'message': 'OTP sent successfully'}, 
@@ -362,37 +422,14 @@ class UserUpdateView(APIView):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def user_contributions(request):
-    user = request.user
-    
-    # Get discussion posts
-    discussion_posts = DiscussionPost.objects.filter(user=user).select_related('discussion').order_by('-created_at')
-    discussion_data = [{
-        'id': post.discussion.id,
-        'post_id': post.id,
-        'type': 'discussion',
-        'title': post.discussion.title,
-        'content': post.content,
-        'upvotes': post.upvotes,
-        'created_at': post.created_at.isoformat()
-    } for post in discussion_posts]
-    
-    # Get resources
-    resources = Resource.objects.filter(uploaded_by=user).order_by('-created_at')
-    resource_data = [{
-        'id': resource.id,
-        'type': 'resource',
-        'title': resource.title,
-        'description': resource.description,
-        'upvotes': resource.upvotes,
-        'download_count': resource.download_count,
-        'created_at': resource.created_at.isoformat()
-    } for resource in resources]
-    
-    # Combine and sort by creation date
-    contributions = discussion_data + resource_data
-    contributions.sort(key=lambda x: x['created_at'], reverse=True)
-    
-    return Response(contributions)
+    """
+    The user's discussion posts and resources, newest first, one page at a
+    time: {'next', 'results', 'counts'} with per-type totals on the first page.
+    """
+    page_size = KeysetPagination().get_page_size(request)
+    return Response(contributions_page(
+        request.user, page_size, request.query_params.get('cursor'), request.build_absolute_uri()
+    ))
 
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
@@ -407,15 +444,7 @@ def edit_contribution(request, contribution_type, contribution_id):
                 return Response({"error": "You can only edit your own contributions"}, status=status.HTTP_403_FORBIDDEN)
             post.content = request.data.get('content', post.content)
             post.save()
-            return Response({
-                'id': post.discussion.id,
-                'post_id': post.id,
-                'type': 'discussion',
-                'title': post.discussion.title,
-                'content': post.content,
-                'upvotes': post.upvotes,
-                'created_at': post.created_at.isoformat()
-            })
+            return Response(post.as_contribution())
         elif contribution_type == 'resource':
             resource = Resource.objects.get(id=contribution_id)
             if resource.uploaded_by != user:
@@ -423,15 +452,7 @@ def edit_contribution(request, contribution_type, contribution_id):
             resource.title = request.data.get('title', resource.title)
             resource.description = request.data.get('description', resource.description)
             resource.save()
-            return Response({
-                'id': resource.id,
-                'type': 'resource',
-                'title': resource.title,
-                'description': resource.description,
-                'upvotes': resource.upvotes,
-                'download_count': resource.download_count,
-                'created_at': resource.created_at.isoformat()
-            })
+            return Response(resource.as_contribution())
         else:
             return Response({"error": "Invalid contribution type"}, status=status.HTTP_400_BAD_REQUEST)
     except (DiscussionPost.DoesNotExist, Resource.DoesNotExist):
@@ -461,14 +482,8 @@ def delete_contribution(request, contribution_type, contribution_id):
         return Response({"error": "Contribution not found"}, status=status.HTTP_404_NOT_FOUND)
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def user_help_requests(request):
-    user = request.user
-    
-    # Get help requests
-    help_requests = HelpRequest.objects.filter(created_by=user).select_related('category').order_by('-created_at')
-    help_request_data = [{
+def help_request_item(help_request):
+    return {
         'id': help_request.id,
         'type': 'help_request',
         'title': help_request.title,
@@ -478,9 +493,16 @@ def user_help_requests(request):
         'credit_offer_chat': help_request.credit_offer_chat,
         'credit_offer_video': help_request.credit_offer_video,
         'created_at': help_request.created_at.isoformat()
-    } for help_request in help_requests]
+    }
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def user_help_requests(request):
+    user = request.user
     
-    return Response(help_request_data)
+    # Get help requests
+    help_requests = HelpRequest.objects.filter(created_by=user).select_related('category').order_by('-created_at')
+    return Response([help_request_item(help_request) for help_request in help_requests])
 
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
@@ -499,11 +521,10 @@ def edit_help_request(request, help_request_id):
         help_request.credit_offer_video = request.data.get('credit_offer_video', help_request.credit_offer_video)
         # Update category if provided
         if 'category' in request.data:
-            try:
-                category = Category.objects.get(name=request.data['category'])
-                help_request.category = category
-            except Category.DoesNotExist:
+            category = categories.get_by_name(request.data['category'])
+            if category is None:
                 return Response({"error": "Invalid category"}, status=status.HTTP_400_BAD_REQUEST)
+            help_request.category = category
         
         help_request.save()
         return Response({
@@ -0,0 +1,227 @@
+# api/votes.py
+import logging
+import uuid
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Kinds whose counters are accumulated in Redis and written back by flush_vote_counters()
+BUFFERED_KINDS = set(getattr(settings, 'VOTE_COUNTER_BUFFERED_KINDS', ()))
+
+# Targets updated per UPDATE statement when a buffer is flushed
+FLUSH_BATCH_SIZE = 500
+
+# A flush holds this lock (seconds) so two schedulers never apply the same deltas
+FLUSH_LOCK_TIMEOUT = 60
+
+# Applied batch ids are kept this long to recognise a batch a failed flush left behind
+FLUSH_RECORD_RETENTION = timedelta(days=1)
+
+
+class VoteKind:
+    """
+    A vote table (one row per user and target, unique together) and the
+    denormalized counter on the target it maintains.
+    """
+
+    def __init__(self, name, vote_label, target_field, counter_field='upvotes'):
+        self.name = name
+        self.vote_label = vote_label
+        self.target_field = target_field
+        self.counter_field = counter_field
+
+    @property
+    def vote_model(self):
+        return apps.get_model(self.vote_label)
+
+    @property
+    def target_model(self):
+        return self.vote_model._meta.get_field(self.target_field).related_model
+
+    @property
+    def buffered(self):
+        return self.name in BUFFERED_KINDS
+
+    @property
+    def buffer_key(self):
+        return f"votes:pending:{self.name}"
+
+
+_kinds = {}
+_client = None
+
+
+def register_vote_kind(name, vote_label, target_field, counter_field='upvotes'):
+    _kinds[name] = VoteKind(name, vote_label, target_field, counter_field)
+    return _kinds[name]
+
+
+def get_vote_kind(name):
+    return _kinds[name]
+
+
+def _redis():
+    global _client
+    if _client is None:
+        import redis
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def _apply_delta(kind, target_id, delta, **scope):
+    """Adjust one counter in the database; returns the new value, or None if the target does not exist."""
+    targets = kind.target_model.objects.filter(pk=target_id, **scope)
+    if not targets.update(**{kind.counter_field: F(kind.counter_field) + delta}):
+        return None
+    # The row stays locked by the UPDATE until commit, so this is the committed value
+    return targets.values_list(kind.counter_field, flat=True).get()
+
+
+def _buffer_delta(kind, target_id, delta):
+    try:
+        _redis().hincrby(kind.buffer_key, target_id, delta)
+    except Exception as e:
+        logger.warning(f"Vote buffer for {kind.name} unavailable, writing {target_id} directly: {str(e)}")
+        _apply_delta(kind, target_id, delta)
+
+
+def _pending_delta(kind, target_id):
+    try:
+        pipe = _redis().pipeline()
+        pipe.hget(kind.buffer_key, target_id)
+        pipe.hget(f"{kind.buffer_key}:flushing", target_id)
+        return sum(int(value) for value in pipe.execute() if value)
+    except Exception as e:
+        logger.warning(f"Could not read pending votes for {kind.name} {target_id}: {str(e)}")
+        return 0
+
+
+def toggle_vote(name, user, target_id, **scope):
+    """
+    Add `user`'s vote on a target, or remove it if it exists. Returns
+    (added, count).
+
+    The vote row is flipped and the counter adjusted with a single
+    `UPDATE ... SET upvotes = upvotes ± 1` in one transaction, so concurrent
+    toggles never lose counts; the returned count is read under the row lock
+    the UPDATE took. Extra `scope` lookups must match the target as well
+    (e.g. the help request a comment belongs to). Raises the target model's
+    DoesNotExist when there is no such target.
+
+    For kinds listed in VOTE_COUNTER_BUFFERED_KINDS the counter change is
+    added to a Redis hash once the vote commits instead, and written back
+    in batches by flush_vote_counters(), so a viral target does not
+    serialize every voter on its row lock. Counts read from the database
+    then lag by up to one flush interval; the count returned here includes
+    the pending changes.
+    """
+    kind = _kinds[name]
+    votes = kind.vote_model.objects.filter(user=user, **{f"{kind.target_field}_id": target_id})
+    with transaction.atomic():
+        if kind.buffered and not kind.target_model.objects.filter(pk=target_id, **scope).exists():
+            raise kind.target_model.DoesNotExist
+        deleted, _ = votes.delete()
+        added = not deleted
+        if added:
+            try:
+                with transaction.atomic():
+                    # create() so post_save receivers (credit awards) still run
+                    kind.vote_model.objects.create(user=user, **{f"{kind.target_field}_id": target_id})
+            except IntegrityError:
+                # A concurrent request added the same vote first; it already counted it
+                logger.info(f"Duplicate {name} vote by {user.username} on {target_id} ignored")
+                count = kind.target_model.objects.filter(pk=target_id).values_list(kind.counter_field, flat=True).first()
+                return True, (count or 0) + (_pending_delta(kind, target_id) if kind.buffered else 0)
+        delta = 1 if added else -1
+
+        if kind.buffered:
+            count = kind.target_model.objects.filter(pk=target_id).values_list(kind.counter_field, flat=True).get()
+            transaction.on_commit(lambda: _buffer_delta(kind, target_id, delta))
+            return added, count + _pending_delta(kind, target_id) + delta
+
+        count = _apply_delta(kind, target_id, delta, **scope)
+        if count is None:
+            # Rolls the vote back too; the deferred foreign key is never checked
+            raise kind.target_model.DoesNotExist
+        return added, count
+
+
+def flush_vote_counter(name):
+    """
+    Write one kind's buffered counter changes to the database; returns how
+    many targets were updated.
+
+    The pending hash is renamed aside, together with a fresh batch id, before
+    it is read, so votes cast during the flush go to a fresh hash. The batch
+    id is recorded in the same transaction as the counter UPDATEs, so a hash
+    left aside by a flush that died after committing is dropped on the next
+    run instead of being applied twice; one that died before committing is
+    applied then. The lock is released only by the flush that holds it.
+    """
+    from redis.exceptions import LockError
+
+    from .models import VoteCounterFlush
+
+    kind = _kinds[name]
+    client = _redis()
+    flushing = f"{kind.buffer_key}:flushing"
+    batch_key = f"{flushing}:batch"
+    lock = client.lock(f"{kind.buffer_key}:lock", timeout=FLUSH_LOCK_TIMEOUT, blocking=False)
+    if not lock.acquire():
+        return 0
+    try:
+        if not client.exists(flushing):
+            if not client.exists(kind.buffer_key):
+                return 0
+            pipe = client.pipeline()
+            pipe.rename(kind.buffer_key, flushing)
+            pipe.set(batch_key, uuid.uuid4().hex)
+            pipe.execute()
+        # Set with the rename; only a hash left aside before batch ids existed lacks one
+        client.set(batch_key, uuid.uuid4().hex, nx=True)
+        batch = client.get(batch_key).decode()
+        deltas = {int(target_id): int(delta) for target_id, delta in client.hgetall(flushing).items() if int(delta)}
+        target_ids = sorted(deltas)
+        with transaction.atomic():
+            _, new_batch = VoteCounterFlush.objects.get_or_create(batch=batch)
+            if not new_batch:
+                logger.warning(f"Dropping {name} vote batch {batch}, which was already applied")
+                deltas = {}
+                target_ids = []
+            for start in range(0, len(target_ids), FLUSH_BATCH_SIZE):
+                batch_ids = target_ids[start:start + FLUSH_BATCH_SIZE]
+                # One UPDATE per batch, rows locked in id order
+                kind.target_model.objects.filter(pk__in=batch_ids).update(**{
+                    kind.counter_field: F(kind.counter_field) + Case(
+                        *[When(pk=target_id, then=Value(deltas[target_id])) for target_id in batch_ids],
+                        default=Value(0),
+                        output_field=IntegerField(),
+                    )
+                })
+        client.delete(flushing, batch_key)
+        if deltas:
+            logger.info(f"Flushed {len(deltas)} buffered {name} vote counters")
+        return len(deltas)
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            logger.warning(f"Vote flush lock for {name} expired before the flush finished")
+
+
+def flush_vote_counters():
+    from .models import VoteCounterFlush
+
+    names = [name for name in _kinds if _kinds[name].buffered]
+    if not names:
+        return 0
+    flushed = sum(flush_vote_counter(name) for name in names)
+    # Batch ids only need to outlive a retry of the flush that recorded them
+    VoteCounterFlush.objects.filter(created_at__lt=timezone.now() - FLUSH_RECORD_RETENTION).delete()
+    return flushed
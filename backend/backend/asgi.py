@@ -12,6 +12,7 @@ from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.security.websocket import AllowedHostsOriginValidator
 from channels.middleware import BaseMiddleware
 from django.contrib.auth.models import AnonymousUser
+from urllib.parse import parse_qsl
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,30 +20,26 @@ logger = logging.getLogger(__name__)
 class JWTWebsocketMiddleware(BaseMiddleware):
     """
     Custom middleware that handles JWT authentication for WebSocket connections.
-    The database operations are properly wrapped in database_sync_to_async.
+    The token is decoded and its user resolved (through the cached user lookup)
+    exactly once per connection; consumers read scope['user'] and the parsed
+    scope['query_params'] instead of re-authenticating.
     Allows token-less connections if user is already authenticated in scope.
     """
     async def __call__(self, scope, receive, send):
         # Delay JWT imports until they're actually needed
-        from rest_framework_simplejwt.authentication import JWTAuthentication
+        from api.authentication import authenticate_token
         from channels.db import database_sync_to_async
 
         query_string = scope.get("query_string", b"").decode("utf-8")
-        query_params = dict(
-            param.split("=") for param in query_string.split("&") if "=" in param
-        )
+        query_params = dict(parse_qsl(query_string))
+        scope["query_params"] = query_params
 
         token = query_params.get("token")
         if token:
-            try:
-                auth = JWTAuthentication()
-                validated_token = await database_sync_to_async(auth.get_validated_token)(token)
-                user = await database_sync_to_async(auth.get_user)(validated_token)
-                scope["user"] = user
+            user = await database_sync_to_async(authenticate_token)(token)
+            scope["user"] = user
+            if user.is_authenticated:
                 logger.info(f"Authenticated WebSocket connection for user: {user.id}")
-            except Exception as e:
-                logger.warning(f"JWT authentication failed: {str(e)}")
-                scope["user"] = AnonymousUser()
         else:
             # Check if user is already authenticated in scope (e.g., from session)
             if "user" in scope and scope["user"].is_authenticated:
@@ -34,6 +34,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "api",
     "rest_framework",
     'rest_framework_simplejwt.token_blacklist',
@@ -45,6 +46,8 @@ INSTALLED_APPS = [
     'resources',
     'projects',
     'skills',
+    'search',
+    'jobs',
     "django.contrib.sites",  # Required by allauth
     "allauth",
     "allauth.account",
@@ -64,12 +67,15 @@ ALLOWED_HOSTS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.CachedJWTAuthentication",
         'rest_framework.authentication.SessionAuthentication',
     ),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
+    # Keyset pagination on (sort key, id); see api/pagination.py
+    "DEFAULT_PAGINATION_CLASS": "api.pagination.KeysetPagination",
+    "PAGE_SIZE": 20,
 }
 
 SIMPLE_JWT = {
@@ -141,6 +147,9 @@ DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", EMAIL_HOST_USER)
 MEDIA_URL = 'https://elevatehub-proxy.mijuzz007.workers.dev/api/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Disk budget for cached resource ZIP bundles under MEDIA_ROOT/resource_bundles
+RESOURCE_BUNDLE_CACHE_MAX_BYTES = int(os.getenv("RESOURCE_BUNDLE_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
@@ -185,6 +194,45 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Shared cache (L2 of api.cache.TwoTierCache); database 1 keeps it apart from the channel layer
+REDIS_URL = os.getenv('REDIS_URL', 'redis://127.0.0.1:6379')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f"{REDIS_URL}/1",
+        'KEY_PREFIX': 'elevatehub',
+        'TIMEOUT': 300,
+    },
+}
+
+# In-process L1 cache: entry lifetime (seconds) and size
+CACHE_L1_TTL = 30
+CACHE_L1_MAX_ENTRIES = 1024
+
+# Chat write-behind (PostgreSQL only): messages are broadcast first and inserted in
+# batches of CHAT_FLUSH_BATCH_SIZE or every CHAT_FLUSH_INTERVAL_MS, whichever comes first
+CHAT_WRITE_BEHIND = os.getenv("CHAT_WRITE_BEHIND", "False") == "True"
+CHAT_FLUSH_BATCH_SIZE = 100
+CHAT_FLUSH_INTERVAL_MS = 250
+
+# Vote kinds (help_comment, discussion_post, resource) whose upvote counters are
+# accumulated in Redis and written back every VOTE_COUNTER_FLUSH_INTERVAL seconds
+VOTE_COUNTER_BUFFERED_KINDS = [kind for kind in os.getenv("VOTE_COUNTER_BUFFERED_KINDS", "").split(",") if kind]
+VOTE_COUNTER_FLUSH_INTERVAL = 10
+
+# Resource download/view events: inserted in batches of RESOURCE_EVENT_BATCH_SIZE or every
+# RESOURCE_EVENT_FLUSH_INTERVAL seconds, rolled into daily stats every RESOURCE_EVENT_AGGREGATION_INTERVAL
+RESOURCE_EVENT_BATCH_SIZE = 200
+RESOURCE_EVENT_FLUSH_INTERVAL = 2.0
+RESOURCE_EVENT_AGGREGATION_INTERVAL = 60
+RESOURCE_EVENT_RETENTION_DAYS = 90
+
+# /api/me/dashboard/: items per list section, and whether sections run in parallel
+# (one database connection each) or one after another
+DASHBOARD_SECTION_LIMIT = 10
+DASHBOARD_CONCURRENT_SECTIONS = True
+
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
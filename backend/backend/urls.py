@@ -35,6 +35,7 @@ urlpatterns = [
     path('api/', include('resources.urls')),
     path('api/', include('projects.urls')),
     path('api/', include('skills.urls')),
+    path('api/', include('search.urls')),
     path("accounts/", include("allauth.urls")),
     path("accounts/logout/", csrf_exempt(LogoutView.as_view()), name="account_logout"),  # Override with CSRF exemption
     path("api/get-csrf/", get_csrf, name="get_csrf"),
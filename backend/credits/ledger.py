@@ -0,0 +1,163 @@
+# credits/ledger.py
+from django.db import IntegrityError, transaction
+from projects.models import Notification
+from projects.notifications import create_notifications
+from api.cache import cache
+from .models import Credit, CreditTransaction
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class InsufficientCredits(Exception):
+    """Raised when an entry would take a user's balance below zero."""
+
+    def __init__(self, user, balance, amount):
+        self.user = user
+        self.balance = balance
+        self.amount = amount
+        super().__init__(f"User {user.username} has {balance} credits, {amount} required")
+
+
+def _lock_accounts(user_ids):
+    return {
+        credit.user_id: credit
+        for credit in Credit.objects.select_for_update().filter(user_id__in=user_ids).order_by('user_id')
+    }
+
+
+def record(entries, notify=True):
+    """
+    Apply a set of credit movements atomically.
+
+    `entries` is a list of (user, amount, description) tuples; negative amounts
+    are debits. An entry may carry a fourth element, a reward key from
+    reward_key(), which the unique reward index lets through only once.
+    The affected Credit rows are locked in user id order (so two
+    concurrent transfers between the same pair cannot deadlock), every debit is
+    checked against the locked balance, the balances are written with one
+    UPDATE and the CreditTransaction rows with one INSERT. Notifications are
+    bulk created and pushed when the transaction commits.
+
+    Returns the created transactions in entry order; each carries the user's
+    resulting balance as `balance_after`. Raises InsufficientCredits and
+    leaves every balance untouched if any debit cannot be covered.
+    """
+    users = {user.id: user for user, *_ in entries}
+    user_ids = sorted(users)
+
+    with transaction.atomic():
+        accounts = _lock_accounts(user_ids)
+        missing = [user_id for user_id in user_ids if user_id not in accounts]
+        if missing:
+            Credit.objects.bulk_create([Credit(user_id=user_id) for user_id in missing], ignore_conflicts=True)
+            accounts = _lock_accounts(user_ids)
+
+        for user, amount, description, *_ in entries:
+            account = accounts[user.id]
+            if amount < 0 and account.balance + amount < 0:
+                logger.warning(f"Failed to spend {-amount} credits from user {user.username}: Insufficient balance")
+                raise InsufficientCredits(user, account.balance, -amount)
+            account.balance += amount
+
+        Credit.objects.bulk_update(list(accounts.values()), ['balance'])
+        transactions = CreditTransaction.objects.bulk_create([
+            CreditTransaction(user=user, amount=amount, description=description, **(reward[0] if reward else {}))
+            for user, amount, description, *reward in entries
+        ])
+        for credit_transaction in transactions:
+            credit_transaction.balance_after = accounts[credit_transaction.user_id].balance
+            logger.info(f"Recorded {credit_transaction.amount} credits for user {credit_transaction.user.username}: {credit_transaction.description}")
+        # auth_status reports the balance
+        for user_id in user_ids:
+            cache.invalidate_on_commit('auth_status', user_id)
+
+        if notify:
+            create_notifications([
+                Notification(
+                    user=credit_transaction.user,
+                    message=f"{'Earned' if credit_transaction.amount > 0 else 'Spent'} {abs(credit_transaction.amount)} credits: {credit_transaction.description}",
+                    notification_type='credit_added' if credit_transaction.amount > 0 else 'credit_spent'
+                )
+                for credit_transaction in transactions
+                if credit_transaction.amount
+            ])
+    return transactions
+
+
+def settle(payments, notify=True):
+    """
+    Apply many payer -> payee transfers as one ledger entry, skipping the ones
+    a payer cannot cover instead of failing the whole set.
+
+    `payments` is a list of (payer, payee, amount, debit_description,
+    credit_description) tuples. Balances are locked once and checked in
+    order, so a payer with several payments is charged for as many as the
+    balance allows. Returns the amount actually paid for each payment
+    (0 when skipped).
+    """
+    user_ids = sorted({payer.id for payer, *_ in payments} | {payee.id for _, payee, *_ in payments})
+    entries = []
+    paid = []
+    with transaction.atomic():
+        balances = {user_id: account.balance for user_id, account in _lock_accounts(user_ids).items()}
+        for payer, payee, amount, debit_description, credit_description in payments:
+            if amount <= 0:
+                paid.append(0)
+                continue
+            if balances.get(payer.id, 0) < amount:
+                logger.warning(f"Skipping payment of {amount} credits from {payer.username} to {payee.username}: Insufficient balance")
+                paid.append(0)
+                continue
+            balances[payer.id] -= amount
+            balances[payee.id] = balances.get(payee.id, 0) + amount
+            entries += [(payer, -amount, debit_description), (payee, amount, credit_description)]
+            paid.append(amount)
+        if entries:
+            record(entries, notify=notify)
+    return paid
+
+
+def reward_key(event, target):
+    """Structured key of a one-off reward, e.g. reward_key('first_download', resource)."""
+    return {'reward_event': event, 'reward_model': target._meta.label_lower, 'reward_object_id': target.pk}
+
+
+def award_once(user, amount, description, event, target, notify=True):
+    """
+    Pay a one-off reward for `event` on `target` unless it was already paid.
+
+    The check is a single probe of the unique reward index, made while the
+    user's balance row is locked; if a concurrent award still gets there
+    first, the unique index rejects the second insert and nothing is paid.
+    Returns the transaction, or None when the reward had been paid before.
+    """
+    reward = reward_key(event, target)
+    try:
+        with transaction.atomic():
+            _lock_accounts([user.id])
+            if CreditTransaction.objects.filter(**reward).exists():
+                return None
+            return record([(user, amount, description, reward)], notify=notify)[0]
+    except IntegrityError:
+        logger.info(f"Reward {event} for {reward['reward_model']} {target.pk} was paid concurrently")
+        return None
+
+
+def award(user, amount, description="Earned credits", notify=True):
+    """Credit `amount` to `user`."""
+    return record([(user, amount, description)], notify=notify)[0]
+
+
+def charge(user, amount, description="Spent credits", notify=True):
+    """Debit `amount` from `user`, raising InsufficientCredits if the balance is too low."""
+    return record([(user, -amount, description)], notify=notify)[0]
+
+
+def transfer(payer, payee, amount, debit_description, credit_description, notify=True):
+    """Move `amount` from `payer` to `payee`; returns the (debit, credit) transactions."""
+    debit, credit = record([
+        (payer, -amount, debit_description),
+        (payee, amount, credit_description),
+    ], notify=notify)
+    return debit, credit
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("credits", "0002_alter_credit_balance"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="credittransaction",
+            index=models.Index(
+                fields=["user", "timestamp", "id"],
+                name="credits_cre_user_id_f39c9d_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("credits", "0003_credittransaction_keyset_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="credittransaction",
+            name="reward_event",
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name="credittransaction",
+            name="reward_model",
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name="credittransaction",
+            name="reward_object_id",
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+    ]
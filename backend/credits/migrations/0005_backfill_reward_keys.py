@@ -0,0 +1,84 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:01
+
+import logging
+import re
+from collections import defaultdict
+
+from django.db import migrations
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_PREFIX = "Earned 5 credits for first download of "
+UPVOTE_PREFIX = "Earned 1 credit for first upvote on "
+POST_UPVOTE = re.compile(r"^Earned 1 credit for first upvote on post (\d+)$")
+
+
+def backfill_reward_keys(apps, schema_editor):
+    """
+    Key the rewards paid before keys existed by parsing their descriptions.
+    Only the earliest row per reward is keyed; rows that cannot be matched
+    (e.g. the resource was renamed since) are left unkeyed. Resource rewards
+    name the resource by title, so when one uploader has several resources
+    with the same title the reward cannot be attributed and is left unkeyed
+    and logged rather than credited to the first of them.
+    """
+    CreditTransaction = apps.get_model("credits", "CreditTransaction")
+    Resource = apps.get_model("resources", "Resource")
+    DiscussionPost = apps.get_model("discussions", "DiscussionPost")
+
+    titled = defaultdict(list)
+    for resource_id, user_id, title in Resource.objects.values_list("id", "uploaded_by_id", "title"):
+        titled[(user_id, title)].append(resource_id)
+    resources = {key: ids[0] for key, ids in titled.items() if len(ids) == 1}
+    ambiguous = 0
+    post_owners = dict(DiscussionPost.objects.values_list("id", "user_id"))
+
+    keyed = set()
+    updates = []
+    candidates = CreditTransaction.objects.filter(
+        reward_event__isnull=True, description__startswith="Earned "
+    ).order_by("id")
+    for row in candidates.iterator(chunk_size=2000):
+        key = None
+        post_match = POST_UPVOTE.match(row.description)
+        if post_match and post_owners.get(int(post_match.group(1))) == row.user_id:
+            key = ("first_upvote", "discussions.discussionpost", int(post_match.group(1)))
+        else:
+            for prefix, event in ((DOWNLOAD_PREFIX, "first_download"), (UPVOTE_PREFIX, "first_upvote")):
+                if not row.description.startswith(prefix):
+                    continue
+                title = row.description[len(prefix):]
+                resource_id = resources.get((row.user_id, title))
+                if resource_id:
+                    key = (event, "resources.resource", resource_id)
+                elif len(titled.get((row.user_id, title), ())) > 1:
+                    ambiguous += 1
+                    logger.warning(
+                        f"Leaving credit transaction {row.id} unkeyed: user {row.user_id} has "
+                        f"{len(titled[(row.user_id, title)])} resources titled {title!r}"
+                    )
+                break
+        if key is None or key in keyed:
+            continue
+        keyed.add(key)
+        row.reward_event, row.reward_model, row.reward_object_id = key
+        updates.append(row)
+
+    CreditTransaction.objects.bulk_update(
+        updates, ["reward_event", "reward_model", "reward_object_id"], batch_size=1000
+    )
+    if ambiguous:
+        logger.warning(f"Left {ambiguous} rewards on same-titled resources unkeyed")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("credits", "0004_credittransaction_reward_key"),
+        ("resources", "0004_alter_resource_created_at_and_more"),
+        ("discussions", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_reward_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("credits", "0005_backfill_reward_keys"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="credittransaction",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("reward_event__isnull", False)),
+                fields=("reward_event", "reward_model", "reward_object_id"),
+                name="unique_credit_reward",
+            ),
+        ),
+    ]
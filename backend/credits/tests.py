@@ -1,3 +1,152 @@
-from django.test import TestCase
+from importlib import import_module
 
-# Create your tests here.
+from django.apps import apps
+from django.db import connection
+from django.test import TestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.models import Category, CustomUser
+from discussions.models import Discussion, DiscussionPost
+from projects.models import ChatSession, HelpRequest
+from resources.models import Resource
+from .ledger import InsufficientCredits, award_once, charge, record, settle, transfer
+from .models import Credit, CreditTransaction
+
+backfill = import_module("credits.migrations.0005_backfill_reward_keys")
+
+
+class LedgerTests(TestCase):
+    def setUp(self):
+        self.payer = CustomUser.objects.create_user(username="payer", email="payer@example.com", password="pass", is_active=True)
+        self.payee = CustomUser.objects.create_user(username="payee", email="payee@example.com", password="pass", is_active=True)
+        Credit.objects.create(user=self.payer, balance=10)
+        Credit.objects.create(user=self.payee, balance=0)
+
+    def balances(self):
+        return dict(Credit.objects.values_list("user__username", "balance"))
+
+    def test_transfer_moves_credits_and_reports_balances(self):
+        debit, credit = transfer(self.payer, self.payee, 4, "Paid", "Earned", notify=False)
+        self.assertEqual((debit.amount, debit.balance_after), (-4, 6))
+        self.assertEqual((credit.amount, credit.balance_after), (4, 4))
+        self.assertEqual(self.balances(), {"payer": 6, "payee": 4})
+
+    def test_uncovered_debit_leaves_every_balance_untouched(self):
+        with self.assertRaises(InsufficientCredits) as raised:
+            record([
+                (self.payee, 5, "Earned"),
+                (self.payer, -11, "Paid"),
+            ], notify=False)
+        self.assertEqual((raised.exception.balance, raised.exception.amount), (10, 11))
+        self.assertEqual(self.balances(), {"payer": 10, "payee": 0})
+        self.assertFalse(CreditTransaction.objects.exists())
+
+        self.assertFalse(self.payer.credits.spend_credits(11))
+        self.assertEqual(self.payer.credits.balance, 10)
+        self.assertRaises(InsufficientCredits, charge, self.payee, 1, notify=False)
+
+    def test_missing_account_is_created_with_the_default_balance(self):
+        user = CustomUser.objects.create_user(username="new", email="new@example.com", password="pass", is_active=True)
+        self.assertEqual(charge(user, 5, notify=False).balance_after, 45)
+
+    def test_settle_skips_payments_the_payer_cannot_cover(self):
+        paid = settle([
+            (self.payer, self.payee, 6, "Paid", "Earned"),
+            (self.payer, self.payee, 6, "Paid", "Earned"),
+            (self.payer, self.payee, 4, "Paid", "Earned"),
+        ], notify=False)
+        self.assertEqual(paid, [6, 0, 4])
+        self.assertEqual(self.balances(), {"payer": 0, "payee": 10})
+        self.assertEqual(CreditTransaction.objects.count(), 4)
+
+    @skipUnlessDBFeature("has_select_for_update")
+    def test_accounts_are_locked_in_user_id_order(self):
+        with CaptureQueriesContext(connection) as queries:
+            transfer(self.payee, self.payer, 0, "Paid", "Earned", notify=False)
+        locks = [query["sql"] for query in queries if "FOR UPDATE" in query["sql"]]
+        self.assertEqual(len(locks), 1)
+        self.assertIn("ORDER BY", locks[0])
+
+    def test_end_chat_without_funds_ends_the_chat_unpaid(self):
+        help_request = HelpRequest.objects.create(
+            title="Request", description="Need help", created_by=self.payer, credit_offer_chat=20
+        )
+        chat = ChatSession.objects.create(help_request=help_request, requester=self.payer, helper=self.payee)
+        client = APIClient()
+        client.force_authenticate(self.payee)
+
+        response = client.post(reverse("end-chat", args=[chat.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data["credits_transferred"])
+        self.assertEqual(self.balances(), {"payer": 10, "payee": 0})
+        chat.refresh_from_db()
+        self.assertFalse(chat.is_active)
+
+        help_request.credit_offer_chat = 10
+        help_request.save()
+        chat = ChatSession.objects.create(help_request=help_request, requester=self.payer, helper=self.payee)
+        response = client.post(reverse("end-chat", args=[chat.id]))
+        self.assertTrue(response.data["credits_transferred"])
+        self.assertEqual(self.balances(), {"payer": 0, "payee": 10})
+
+
+class AwardOnceTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="user", email="user@example.com", password="pass", is_active=True)
+        self.resource = Resource.objects.create(
+            title="Notes", description="Lecture notes", category=Category.objects.create(name="Programming"), uploaded_by=self.user
+        )
+
+    def test_reward_is_paid_once(self):
+        balance = self.user.get_credits().balance
+        first = award_once(self.user, 5, "First download", "first_download", self.resource, notify=False)
+        self.assertIsNotNone(first)
+        self.assertEqual(first.balance_after, balance + 5)
+        self.assertIsNone(award_once(self.user, 5, "First download", "first_download", self.resource, notify=False))
+
+        self.assertEqual(CreditTransaction.objects.filter(reward_event="first_download").count(), 1)
+        self.user.credits.refresh_from_db()
+        self.assertEqual(self.user.credits.balance, balance + 5)
+
+        # A different event on the same target is a separate reward
+        self.assertIsNotNone(award_once(self.user, 1, "First upvote", "first_upvote", self.resource, notify=False))
+
+
+class BackfillRewardKeysTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="user", email="user@example.com", password="pass", is_active=True)
+        category = Category.objects.create(name="Programming")
+        self.notes = [
+            Resource.objects.create(title="Notes", description="Notes", category=category, uploaded_by=self.user)
+            for _ in range(2)
+        ]
+        self.guide = Resource.objects.create(title="Guide", description="Guide", category=category, uploaded_by=self.user)
+        discussion = Discussion.objects.create(title="Discussion", created_by=self.user, category=category)
+        self.post = DiscussionPost.objects.create(discussion=discussion, user=self.user, content="Post")
+
+    def legacy(self, description):
+        return CreditTransaction.objects.create(user=self.user, amount=1, description=description)
+
+    def test_only_unambiguous_rewards_are_keyed(self):
+        notes_download = self.legacy(f"{backfill.DOWNLOAD_PREFIX}Notes")
+        guide_upvote = self.legacy(f"{backfill.UPVOTE_PREFIX}Guide")
+        repeated_upvote = self.legacy(f"{backfill.UPVOTE_PREFIX}Guide")
+        post_upvote = self.legacy(f"Earned 1 credit for first upvote on post {self.post.id}")
+        renamed = self.legacy(f"{backfill.DOWNLOAD_PREFIX}Old title")
+
+        with self.assertLogs(backfill.__name__, "WARNING"):
+            backfill.backfill_reward_keys(apps, None)
+
+        keys = {
+            row.id: (row.reward_event, row.reward_model, row.reward_object_id)
+            for row in CreditTransaction.objects.all()
+        }
+        self.assertEqual(keys[guide_upvote.id], ("first_upvote", "resources.resource", self.guide.id))
+        self.assertEqual(keys[post_upvote.id], ("first_upvote", "discussions.discussionpost", self.post.id))
+        # Two resources share the title, so neither gets the reward pinned on it
+        self.assertEqual(keys[notes_download.id], (None, None, None))
+        # Only the earliest row of a reward is keyed
+        self.assertEqual(keys[repeated_upvote.id], (None, None, None))
+        self.assertEqual(keys[renamed.id], (None, None, None))
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("discussions", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="discussionpost",
+            index=models.Index(
+                fields=["user", "created_at"],
+                name="discussions_user_id_f689a4_idx",
+            ),
+        ),
+    ]
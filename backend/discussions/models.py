@@ -2,8 +2,10 @@ from django.db import models
 from django.conf import settings
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from credits.models import CreditTransaction
+from credits.ledger import award_once
 from api.models import Category
+from api.votes import register_vote_kind
+from api.contributions import register_contribution_source
 import logging
 
 logger = logging.getLogger(__name__)
@@ -25,9 +27,31 @@ class DiscussionPost(models.Model):
     upvotes = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at']),  # A user's contributions feed
+        ]
+
     def __str__(self):
         return f"Post by {self.user.username} in {self.discussion.title}"
 
+    def as_contribution(self):
+        return {
+            'id': self.discussion.id,
+            'post_id': self.id,
+            'type': 'discussion',
+            'title': self.discussion.title,
+            'content': self.content,
+            'upvotes': self.upvotes,
+            'created_at': self.created_at.isoformat()
+        }
+
+register_contribution_source(
+    'discussion',
+    lambda user: DiscussionPost.objects.filter(user=user).select_related('discussion'),
+    DiscussionPost.as_contribution,
+)
+
 class DiscussionPostUpvote(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     post = models.ForeignKey("DiscussionPost", on_delete=models.CASCADE, related_name="post_upvotes")
@@ -37,23 +61,15 @@ class DiscussionPostUpvote(models.Model):
             models.UniqueConstraint(fields=['user', 'post'], name='unique_upvote'),
         ]
 
+register_vote_kind('discussion_post', 'discussions.DiscussionPostUpvote', 'post')
+
 @receiver(post_save, sender=DiscussionPostUpvote)
 def award_credit_on_upvote(sender, instance, created, **kwargs):
     if created:  # Only on new upvotes
         post = instance.post
         user = post.user
         logger.info(f"Processing upvote on discussion post {post.id} by user {instance.user.username}")
-        
-        post.upvotes += 1
-        post.save(update_fields=['upvotes'])
-
-        has_earned_credits = CreditTransaction.objects.filter(
-            user=user,
-            amount=1,
-            description__contains=f"upvote on post {post.id}"
-        ).exists()
-
-        if not has_earned_credits and post.upvotes == 1:
-            logger.info(f"Awarding 1 credit to {user.username} for first upvote on post {post.id}")
-            credits = user.get_credits()
-            credits.add_credits(1, description=f"Earned 1 credit for first upvote on post {post.id}")
\ No newline at end of file
+
+        # The upvotes counter is maintained by api.votes.toggle_vote
+        if award_once(user, 1, f"Earned 1 credit for first upvote on post {post.id}", 'first_upvote', post):
+            logger.info(f"Awarded 1 credit to {user.username} for first upvote on post {post.id}")
\ No newline at end of file
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from api.models import Category
+from api.images import rendition_urls
 from .models import Discussion, DiscussionPost
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -15,11 +16,13 @@ class DiscussionSerializer(serializers.ModelSerializer):
     created_at_formatted = serializers.SerializerMethodField()
 
     def get_created_by_profile(self, obj):
-        return (
-            obj.created_by.profile_image.url if obj.created_by.profile_image else None
-        )
+        return rendition_urls(obj.created_by, "profile_image")["avatar"]
 
     def get_posts_count(self, obj):
+        # List querysets annotate the count; fall back to a query for single objects
+        annotated = getattr(obj, "posts_count", None)
+        if annotated is not None:
+            return annotated
         return obj.posts.count()
 
     def get_created_at_formatted(self, obj):
@@ -61,9 +64,12 @@ class DiscussionPostSerializer(serializers.ModelSerializer):
         read_only_fields = ["user", "discussion", "created_at"]
 
     def get_user_profile(self, obj):
-        return obj.user.profile_image.url if obj.user.profile_image else None
+        return rendition_urls(obj.user, "profile_image")["avatar"]
 
     def get_has_upvoted(self, obj):
+        annotated = getattr(obj, "user_has_upvoted", None)
+        if annotated is not None:
+            return annotated
         user = self.context.get("request").user
         if user and user.is_authenticated:
             return obj.post_upvotes.filter(user=user).exists()
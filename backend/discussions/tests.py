@@ -1,3 +1,61 @@
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from api.models import Category, CustomUser
+from .models import Discussion, DiscussionPost, DiscussionPostUpvote
+
+
+class DiscussionListQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Programming")
+        self.users = [
+            CustomUser.objects.create_user(username=f"user{i}", email=f"user{i}@example.com", password="pass", is_active=True)
+            for i in range(3)
+        ]
+
+    def create_discussions(self, count):
+        discussions = []
+        for i in range(count):
+            discussion = Discussion.objects.create(title=f"Discussion {i}", category=self.category, created_by=self.users[0])
+            for user in self.users[: i % len(self.users) + 1]:
+                post = DiscussionPost.objects.create(discussion=discussion, user=user, content="Reply", upvotes=i)
+                DiscussionPostUpvote.objects.create(user=self.users[0], post=post)
+            discussions.append(discussion)
+        return discussions
+
+    def test_list_query_count_does_not_grow_with_rows(self):
+        self.create_discussions(2)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("discussion-list"))
+        self.assertEqual(response.status_code, 200)
+
+        self.create_discussions(10)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("discussion-list"))
+        self.assertEqual(len(response.data["results"]), 12)
+
+    def test_list_orders_by_post_count(self):
+        discussions = self.create_discussions(3)
+        response = self.client.get(reverse("discussion-list") + "?ordering=-posts")
+        self.assertEqual(
+            [(item["id"], item["posts_count"]) for item in response.data["results"]],
+            [(discussions[2].id, 3), (discussions[1].id, 2), (discussions[0].id, 1)],
+        )
+
+    def test_post_list_query_count_does_not_grow_with_rows(self):
+        discussion = self.create_discussions(1)[0]
+        for extra in (0, 10):
+            for _ in range(extra):
+                DiscussionPost.objects.create(discussion=discussion, user=self.users[1], content="Another reply")
+            self.client.force_authenticate(self.users[0])
+            with self.assertNumQueries(1):
+                response = self.client.get(reverse("discussion-post-list", args=[discussion.id]))
+            self.assertEqual(len(response.data["results"]), 1 + extra)
+
+        upvoted = {item["id"]: item["has_upvoted"] for item in response.data["results"]}
+        self.assertEqual(sum(upvoted.values()), 1)
+        self.client.force_authenticate(self.users[1])
+        response = self.client.get(reverse("discussion-post-list", args=[discussion.id]))
+        self.assertFalse(any(item["has_upvoted"] for item in response.data["results"]))
@@ -1,11 +1,10 @@
 from django.urls import path
 from .views import (
     DiscussionListCreateView, DiscussionDetailView,
-    DiscussionPostListCreateView, DiscussionPostDetailView, toggle_upvote, CategoryListView,
+    DiscussionPostListCreateView, DiscussionPostDetailView, toggle_upvote,
 )
 
 urlpatterns = [
-    path('categories/', CategoryListView.as_view(), name='category_list'),
     path('discussions/', DiscussionListCreateView.as_view(), name='discussion-list'),
     path('discussions/<int:pk>/', DiscussionDetailView.as_view(), name='discussion-detail'),
     path('discussions/<int:discussion_id>/posts/', DiscussionPostListCreateView.as_view(), name='discussion-post-list'),
@@ -4,28 +4,52 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
-from .models import Discussion, DiscussionPost, DiscussionPostUpvote, Category
-from .serializers import DiscussionSerializer, DiscussionPostSerializer, CategorySerializer
-from rest_framework.filters import SearchFilter, OrderingFilter
+from .models import Discussion, DiscussionPost, DiscussionPostUpvote
+from .serializers import DiscussionSerializer, DiscussionPostSerializer
+from rest_framework.filters import OrderingFilter
+from search.filters import FullTextSearchFilter
+from api.votes import toggle_vote
+from django.db.models import Count, Sum, Exists, OuterRef, Value, BooleanField
+from django.db.models.functions import Coalesce
 import logging
 
 logger = logging.getLogger(__name__)
 
-class CategoryListView(generics.ListAPIView):
-    queryset = Category.objects.all()
-    serializer_class = CategorySerializer
-    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+def annotate_post_upvotes(queryset, user):
+    """Annotate `user_has_upvoted` on a DiscussionPost queryset with an EXISTS subquery."""
+    if not user.is_authenticated:
+        return queryset.annotate(user_has_upvoted=Value(False, output_field=BooleanField()))
+    return queryset.annotate(
+        user_has_upvoted=Exists(DiscussionPostUpvote.objects.filter(post=OuterRef('pk'), user=user))
+    )
+
+
+class DiscussionOrderingFilter(OrderingFilter):
+    """OrderingFilter that maps the public `posts` ordering onto the `posts_count` annotation."""
+    aliases = {'posts': 'posts_count'}
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        fields = [
+            ('-' if field.startswith('-') else '') + self.aliases.get(field.lstrip('-'), field.lstrip('-'))
+            for field in fields
+        ]
+        return super().remove_invalid_fields(queryset, fields, view, request)
 
 class DiscussionListCreateView(generics.ListCreateAPIView):
     serializer_class = DiscussionSerializer
-    filter_backends = [SearchFilter, OrderingFilter]
-    search_fields = ['title', 'description']
-    ordering_fields = ['created_at', 'upvotes', 'posts']
+    filter_backends = [DiscussionOrderingFilter, FullTextSearchFilter]
+    search_kind = 'discussion'
+    # `upvotes` (total across posts) and `posts_count` are queryset annotations
+    ordering_fields = ['created_at', 'upvotes', 'posts_count']
     ordering = ['-created_at']
 
     def get_queryset(self):
         logger.info(f"Retrieving discussions with category filter: {self.request.query_params.get('category')}")
-        queryset = Discussion.objects.all()
+        queryset = Discussion.objects.select_related('created_by', 'category').annotate(
+            posts_count=Count('posts'),
+            upvotes=Coalesce(Sum('posts__upvotes'), 0),
+        )
         category_id = self.request.query_params.get('category')
         if category_id:
             queryset = queryset.filter(category__id=category_id)
@@ -47,7 +71,8 @@ class DiscussionPostListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         discussion_id = self.kwargs.get('discussion_id')
         logger.info(f"Retrieving posts for discussion {discussion_id}")
-        return DiscussionPost.objects.filter(discussion_id=discussion_id).order_by('-created_at')
+        queryset = DiscussionPost.objects.filter(discussion_id=discussion_id).select_related('user')
+        return annotate_post_upvotes(queryset, self.request.user).order_by('-created_at')
 
     def perform_create(self, serializer):
         discussion_id = self.kwargs.get("discussion_id")
@@ -63,17 +88,10 @@ class DiscussionPostDetailView(generics.RetrieveUpdateDestroyAPIView):
 @api_view(['POST'])
 def toggle_upvote(request, post_id):
     try:
-        post = DiscussionPost.objects.get(id=post_id)
         logger.info(f"User {request.user.username} toggling upvote on post {post_id}")
-        upvote, created = DiscussionPostUpvote.objects.get_or_create(user=request.user, post=post)
-        if not created:
-            upvote.delete()
-            post.upvotes -= 1
-            post.save()
-            message = "Upvote removed"
-        else:
-            message = "Upvote added"
-        return Response({"message": message, "upvotes": post.upvotes}, status=status.HTTP_200_OK)
+        added, upvotes = toggle_vote('discussion_post', request.user, post_id)
+        message = "Upvote added" if added else "Upvote removed"
+        return Response({"message": message, "upvotes": upvotes}, status=status.HTTP_200_OK)
     except DiscussionPost.DoesNotExist:
         logger.warning(f"Attempted to upvote non-existent post {post_id}")
         return Response({"error": "Post not found"}, status=status.HTTP_404_NOT_FOUND)
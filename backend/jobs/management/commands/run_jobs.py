@@ -0,0 +1,34 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from jobs.queue import POLL_INTERVAL, Worker
+from jobs.tasks import close_worker_connection
+
+
+class Command(BaseCommand):
+    help = "Run a background job worker. Start several for more throughput; they never run the same job twice."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--burst', action='store_true', help="Exit once no job is due instead of polling")
+        parser.add_argument('--batch-size', type=int, default=10, help="Jobs claimed per round trip")
+        parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL, help="Seconds to sleep when idle")
+
+    def handle(self, *args, **options):
+        worker = Worker(batch_size=options['batch_size'], poll_interval=options['poll_interval'])
+
+        def stop(signum, frame):
+            # Finish the job in hand, then exit
+            worker.stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        try:
+            if options['burst']:
+                count = worker.run_burst()
+                self.stdout.write(self.style.SUCCESS(f"Ran {count} jobs"))
+            else:
+                worker.run_forever()
+        finally:
+            close_worker_connection()
@@ -0,0 +1,36 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from jobs.scheduler import Scheduler
+
+
+class Command(BaseCommand):
+    help = (
+        "Run periodic sweeps (mentorship auto-completion, abandoned chat and call reaping) "
+        "and report rows processed and time taken"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run every sweep once and exit (for cron)")
+
+    def handle(self, *args, **options):
+        scheduler = Scheduler()
+
+        def stop(signum, frame):
+            scheduler.stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        if options['once']:
+            for report in scheduler.run_due(force=True):
+                self.report(*report)
+        else:
+            scheduler.run_forever(on_report=self.report)
+
+    def report(self, name, processed, elapsed):
+        if processed is None:
+            self.stderr.write(self.style.ERROR(f"{name}: failed after {elapsed * 1000:.0f}ms"))
+        else:
+            self.stdout.write(f"{name}: {processed} rows in {elapsed * 1000:.0f}ms")
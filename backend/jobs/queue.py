@@ -0,0 +1,171 @@
+# jobs/queue.py
+import logging
+import os
+import random
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 5
+
+# Retry n waits BACKOFF_BASE * 2**(n-1) seconds (plus jitter), capped at BACKOFF_MAX
+BACKOFF_BASE = getattr(settings, 'JOBS_BACKOFF_BASE', 10)
+BACKOFF_MAX = getattr(settings, 'JOBS_BACKOFF_MAX', 60 * 60)
+
+# Idle workers look for new jobs this often (seconds)
+POLL_INTERVAL = getattr(settings, 'JOBS_POLL_INTERVAL', 1.0)
+
+# A job still "running" after this long belonged to a worker that died; it is queued again
+STALE_AFTER = timedelta(seconds=getattr(settings, 'JOBS_STALE_AFTER', 15 * 60))
+
+# Finished jobs are kept this long for inspection in the admin
+RETENTION = timedelta(days=getattr(settings, 'JOBS_RETENTION_DAYS', 7))
+
+TASKS = {}
+
+
+def task(func=None, *, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Register a function as a background task. Call `func.enqueue(**kwargs)`
+    to run it in a worker; keyword arguments must be JSON serializable.
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__name__}"
+        TASKS[name] = func
+        func.task_name = name
+        func.enqueue = lambda **kwargs: enqueue(name, kwargs, max_attempts=max_attempts)
+        return func
+    return decorator(func) if func else decorator
+
+
+def enqueue(name, payload=None, *, max_attempts=DEFAULT_MAX_ATTEMPTS, run_at=None):
+    """
+    Queue a job. The row is written in the caller's transaction, so a job
+    enqueued by a request that rolls back never runs, and a committed one
+    is never lost.
+    """
+    job = Job.objects.create(
+        name=name,
+        payload=payload or {},
+        max_attempts=max_attempts,
+        run_at=run_at or timezone.now(),
+    )
+    logger.info(f"Queued job {job.id} ({name})")
+    return job
+
+
+def backoff(attempt):
+    delay = min(BACKOFF_BASE * 2 ** (attempt - 1), BACKOFF_MAX)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+class Worker:
+    """
+    Runs queued jobs one at a time. Several workers (processes or hosts) can
+    share the table: claiming uses SELECT ... FOR UPDATE SKIP LOCKED, so each
+    job is handed to exactly one of them. A failing job is retried with
+    exponential backoff until max_attempts, then left as 'failed'.
+    """
+
+    def __init__(self, batch_size=10, poll_interval=POLL_INTERVAL):
+        self.id = f"{socket.gethostname()}:{os.getpid()}"
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.stopping = False
+        self._last_maintenance = 0
+
+    def claim(self):
+        now = timezone.now()
+        with transaction.atomic():
+            jobs = list(
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(status=Job.QUEUED, run_at__lte=now)
+                .order_by('run_at', 'id')[:self.batch_size]
+            )
+            if jobs:
+                Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+                    status=Job.RUNNING, locked_by=self.id, locked_at=now, attempts=F('attempts') + 1
+                )
+        for job in jobs:
+            job.attempts += 1
+        return jobs
+
+    def run_job(self, job):
+        func = TASKS.get(job.name)
+        started = time.monotonic()
+        try:
+            if func is None:
+                raise LookupError(f"Unknown task {job.name}")
+            func(**job.payload)
+        except Exception as e:
+            failed = job.attempts >= job.max_attempts
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.FAILED if failed else Job.QUEUED,
+                run_at=timezone.now() + backoff(job.attempts),
+                finished_at=timezone.now() if failed else None,
+                locked_by='',
+                locked_at=None,
+                last_error=traceback.format_exc(),
+            )
+            if failed:
+                logger.error(f"Job {job.id} ({job.name}) failed permanently after {job.attempts} attempts: {str(e)}")
+            else:
+                logger.warning(f"Job {job.id} ({job.name}) failed on attempt {job.attempts}, will retry: {str(e)}")
+            return False
+        Job.objects.filter(pk=job.pk).update(status=Job.DONE, finished_at=timezone.now(), locked_by='', locked_at=None)
+        logger.info(f"Job {job.id} ({job.name}) done in {(time.monotonic() - started) * 1000:.0f}ms")
+        return True
+
+    def run_pending(self):
+        """Claim and run one batch; returns how many jobs ran."""
+        close_old_connections()
+        jobs = self.claim()
+        for position, job in enumerate(jobs):
+            if self.stopping:
+                # Hand the rest of the batch back rather than leaving it to the stale-job sweep
+                Job.objects.filter(pk__in=[job.pk for job in jobs[position:]]).update(
+                    status=Job.QUEUED, locked_by='', locked_at=None, attempts=F('attempts') - 1
+                )
+                return position
+            self.run_job(job)
+        return len(jobs)
+
+    def maintain(self):
+        """Requeue jobs abandoned by dead workers and purge old finished ones."""
+        now = timezone.now()
+        requeued = Job.objects.filter(status=Job.RUNNING, locked_at__lt=now - STALE_AFTER).update(
+            status=Job.QUEUED, locked_by='', locked_at=None
+        )
+        if requeued:
+            logger.warning(f"Requeued {requeued} stale jobs")
+        Job.objects.filter(status__in=[Job.DONE, Job.FAILED], finished_at__lt=now - RETENTION).delete()
+
+    def run_burst(self):
+        """Run until nothing is due, then return (tests, cron-style invocations)."""
+        total = 0
+        while not self.stopping:
+            ran = self.run_pending()
+            if not ran:
+                break
+            total += ran
+        return total
+
+    def run_forever(self):
+        logger.info(f"Job worker {self.id} started with {len(TASKS)} registered tasks")
+        while not self.stopping:
+            if time.monotonic() - self._last_maintenance > 60:
+                self.maintain()
+                self._last_maintenance = time.monotonic()
+            if not self.run_pending():
+                time.sleep(self.poll_interval)
+        logger.info(f"Job worker {self.id} stopped")
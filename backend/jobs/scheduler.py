@@ -0,0 +1,75 @@
+# jobs/scheduler.py
+import logging
+import time
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+# Rows handled per transaction by a sweep, and transactions per run; whatever is
+# left over waits for the next run so one run never holds locks for long
+SWEEP_BATCH_SIZE = 500
+SWEEP_MAX_BATCHES = 20
+
+PERIODIC = {}
+
+
+def periodic(seconds):
+    """
+    Run the decorated function every `seconds` under `manage.py run_scheduler`.
+    It should return the number of rows it processed.
+    """
+    def decorator(func):
+        PERIODIC[f"{func.__module__}.{func.__name__}"] = (seconds, func)
+        return func
+    return decorator
+
+
+def run_batches(process_batch, batch_size=SWEEP_BATCH_SIZE, max_batches=SWEEP_MAX_BATCHES):
+    """Call `process_batch(batch_size)` until it comes back short; returns the total processed."""
+    total = 0
+    for _ in range(max_batches):
+        processed = process_batch(batch_size)
+        total += processed
+        if processed < batch_size:
+            break
+    return total
+
+
+class Scheduler:
+    """Runs every registered periodic sweep when it is due, one at a time."""
+
+    def __init__(self):
+        self.next_run = {}
+        self.stopping = False
+
+    def run_due(self, force=False):
+        """Run the sweeps that are due (all of them with `force`); returns (name, processed, seconds) reports."""
+        reports = []
+        for name, (interval, func) in PERIODIC.items():
+            if self.stopping:
+                break
+            if not force and time.monotonic() < self.next_run.get(name, 0):
+                continue
+            close_old_connections()
+            started = time.monotonic()
+            try:
+                processed = func()
+            except Exception as e:
+                logger.error(f"Periodic task {name} failed: {str(e)}", exc_info=True)
+                processed = None
+            elapsed = time.monotonic() - started
+            self.next_run[name] = time.monotonic() + interval
+            logger.info(f"Periodic task {name} processed {processed} rows in {elapsed * 1000:.0f}ms")
+            reports.append((name, processed, elapsed))
+        return reports
+
+    def run_forever(self, on_report=None):
+        logger.info(f"Scheduler started with {len(PERIODIC)} periodic tasks")
+        while not self.stopping:
+            for report in self.run_due():
+                if on_report:
+                    on_report(*report)
+            next_due = min(self.next_run.values(), default=time.monotonic() + 1)
+            time.sleep(min(max(next_due - time.monotonic(), 0.1), 1.0))
+        logger.info("Scheduler stopped")
@@ -0,0 +1,62 @@
+# jobs/tasks.py
+import logging
+from smtplib import SMTPServerDisconnected
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+from .queue import task
+
+logger = logging.getLogger(__name__)
+
+_connection = None
+
+
+def worker_connection():
+    """
+    The worker's mail connection, opened once and reused for every email it
+    sends instead of paying the SMTP handshake (and TLS) per message.
+    """
+    global _connection
+    if _connection is None:
+        _connection = get_connection()
+        _connection.open()
+    return _connection
+
+
+def close_worker_connection():
+    global _connection
+    if _connection is not None:
+        try:
+            _connection.close()
+        finally:
+            _connection = None
+
+
+@task(max_attempts=5)
+def send_email(subject, message, recipient_list, from_email=None, html_message=None):
+    email = EmailMultiAlternatives(
+        subject, message, from_email or settings.DEFAULT_FROM_EMAIL, recipient_list, connection=worker_connection()
+    )
+    if html_message:
+        email.attach_alternative(html_message, 'text/html')
+    try:
+        email.send()
+    except SMTPServerDisconnected:
+        # Servers drop idle connections; reconnect once before counting it as a failed attempt
+        logger.info("SMTP connection was closed by the server; reconnecting")
+        close_worker_connection()
+        email.connection = worker_connection()
+        email.send()
+    logger.info(f"Sent email '{subject}' to {len(recipient_list)} recipients")
+
+
+def queue_email(subject, message, recipient_list, from_email=None, html_message=None):
+    """Send an email from a job worker instead of blocking the request on SMTP."""
+    return send_email.enqueue(
+        subject=subject,
+        message=message,
+        recipient_list=list(recipient_list),
+        from_email=from_email,
+        html_message=html_message,
+    )
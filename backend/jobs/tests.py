@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Job
+from .queue import Worker, task
+from .tasks import close_worker_connection, queue_email
+
+attempts = []
+
+
+@task(max_attempts=2)
+def always_fails():
+    attempts.append(1)
+    raise RuntimeError("boom")
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class EmailJobTests(TestCase):
+    def tearDown(self):
+        close_worker_connection()
+
+    def test_email_is_sent_by_the_worker_not_the_caller(self):
+        queue_email("Subject", "Body", ["someone@example.com"])
+        self.assertEqual(len(mail.outbox), 0)
+
+        Worker().run_burst()
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["someone@example.com"])
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+
+    def test_generate_otp_queues_the_email(self):
+        response = APIClient().post(
+            reverse("generate_otp"),
+            {"email": "new@example.com", "username": "newuser", "password": "pass12345"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+
+        Worker().run_burst()
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("Your OTP code is", mail.outbox[0].body)
+
+
+class RetryTests(TestCase):
+    def setUp(self):
+        attempts.clear()
+
+    def test_failed_job_backs_off_then_gives_up(self):
+        job = always_fails.enqueue()
+        worker = Worker()
+
+        worker.run_burst()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.run_at, timezone.now())
+
+        # Not due yet, so nothing runs
+        self.assertEqual(worker.run_burst(), 0)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now() - timedelta(seconds=1))
+        worker.run_burst()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(len(attempts), 2)
+        self.assertIn("RuntimeError", job.last_error)
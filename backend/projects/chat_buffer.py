@@ -0,0 +1,187 @@
+# projects/chat_buffer.py
+import asyncio
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+
+from .models import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND = getattr(settings, 'CHAT_WRITE_BEHIND', False)
+FLUSH_BATCH_SIZE = getattr(settings, 'CHAT_FLUSH_BATCH_SIZE', 100)
+FLUSH_INTERVAL_MS = getattr(settings, 'CHAT_FLUSH_INTERVAL_MS', 250)
+
+# Message ids reserved from the table's sequence per round trip
+ID_BLOCK_SIZE = getattr(settings, 'CHAT_ID_BLOCK_SIZE', 100)
+
+# Flushes whose oldest message waited longer than this are logged as warnings
+LAG_WARNING_MS = getattr(settings, 'CHAT_PERSISTENCE_LAG_WARNING_MS', 5000)
+
+
+class ChatWriteBuffer:
+    """
+    Per-process write-behind queue for chat messages.
+
+    `add()` gives an unsaved ChatMessage its primary key straight from the
+    table's sequence (reserved ID_BLOCK_SIZE at a time), so the consumer can
+    broadcast the final id and timestamp before the row exists. Ids come from
+    the same sequence as ordinary inserts, so they double as the message
+    sequence number. Queued rows are written with one bulk_create every
+    FLUSH_BATCH_SIZE messages or FLUSH_INTERVAL_MS, whichever comes first.
+    Consumers flush on disconnect and before replaying history, and an atexit
+    hook flushes whatever is left when the process shuts down.
+
+    A failed flush keeps its rows queued and is retried by the next one;
+    inserts use ON CONFLICT DO NOTHING on the preassigned keys, so a retry
+    never duplicates a message. Rows that can no longer be inserted (their
+    chat was deleted meanwhile) are dropped individually and logged.
+
+    Reserving ids needs a database sequence, so write-behind only engages on
+    PostgreSQL; elsewhere `enabled` is False and callers insert directly.
+    """
+
+    def __init__(self):
+        self._ids = deque()
+        self._pending = []  # (monotonic enqueue time, ChatMessage)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._refill_lock = None
+        self._flusher = None
+        self._tasks = set()
+        self.flushed = 0
+        self.failed_flushes = 0
+        self.last_flush_ms = None
+        self.last_lag_ms = None
+        self.max_lag_ms = 0.0
+
+    @property
+    def enabled(self):
+        return WRITE_BEHIND and connection.vendor == 'postgresql'
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    # -- Queueing ------------------------------------------------------------
+
+    async def add(self, message):
+        """Assign an id to an unsaved ChatMessage, queue its INSERT and return it."""
+        message.id = await self._next_id()
+        with self._lock:
+            self._pending.append((time.monotonic(), message))
+            full = len(self._pending) >= FLUSH_BATCH_SIZE
+        if full:
+            # Flush in the background so the message that filled the batch is not delayed by it
+            task = asyncio.ensure_future(self.flush())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.ensure_future(self._run_flusher())
+        return message
+
+    async def _next_id(self):
+        if not self._ids:
+            if self._refill_lock is None:
+                self._refill_lock = asyncio.Lock()
+            async with self._refill_lock:
+                if not self._ids:
+                    self._ids.extend(await sync_to_async(self._reserve_ids)(ID_BLOCK_SIZE))
+        return self._ids.popleft()
+
+    @staticmethod
+    def _reserve_ids(count):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+                [ChatMessage._meta.db_table, count]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    async def _run_flusher(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL_MS / 1000)
+            if not self._pending:
+                # Restarted by the next add()
+                return
+            await self.flush()
+
+    # -- Flushing ------------------------------------------------------------
+
+    async def flush(self):
+        return await sync_to_async(self.flush_sync)()
+
+    def flush_sync(self):
+        """Insert everything queued so far; returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+
+            started = time.monotonic()
+            try:
+                self._write([message for _, message in batch])
+            except Exception as e:
+                with self._lock:
+                    self._pending = batch + self._pending
+                    self.failed_flushes += 1
+                logger.error(f"Failed to persist {len(batch)} chat messages, keeping them queued: {str(e)}")
+                return 0
+
+            finished = time.monotonic()
+            lag_ms = (finished - batch[0][0]) * 1000
+            with self._lock:
+                self.flushed += len(batch)
+                self.last_flush_ms = (finished - started) * 1000
+                self.last_lag_ms = lag_ms
+                self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            if lag_ms > LAG_WARNING_MS:
+                logger.warning(f"Persisted {len(batch)} chat messages {lag_ms:.0f}ms after the oldest was sent")
+            else:
+                logger.info(f"Persisted {len(batch)} chat messages in {self.last_flush_ms:.1f}ms")
+            return len(batch)
+
+    @staticmethod
+    def _write(messages):
+        try:
+            with transaction.atomic():
+                ChatMessage.objects.bulk_create(messages, ignore_conflicts=True)
+        except IntegrityError:
+            # One bad row (usually a chat deleted while its messages were queued) must not sink the batch
+            for message in messages:
+                try:
+                    with transaction.atomic():
+                        ChatMessage.objects.bulk_create([message], ignore_conflicts=True)
+                except IntegrityError as e:
+                    logger.error(f"Dropping chat message {message.id}: {str(e)}")
+
+    # -- Metrics -------------------------------------------------------------
+
+    def stats(self):
+        """Persistence metrics for this process."""
+        with self._lock:
+            oldest = self._pending[0][0] if self._pending else None
+            return {
+                'enabled': self.enabled,
+                'pending': len(self._pending),
+                'persistence_lag_ms': round((time.monotonic() - oldest) * 1000, 1) if oldest else 0.0,
+                'last_flush_lag_ms': round(self.last_lag_ms, 1) if self.last_lag_ms is not None else None,
+                'max_flush_lag_ms': round(self.max_lag_ms, 1),
+                'last_flush_duration_ms': round(self.last_flush_ms, 1) if self.last_flush_ms is not None else None,
+                'flushed': self.flushed,
+                'failed_flushes': self.failed_flushes,
+                'reserved_ids': len(self._ids),
+            }
+
+
+chat_buffer = ChatWriteBuffer()
+
+# Durability on shutdown: the event loop is gone by now, so flush synchronously
+atexit.register(chat_buffer.flush_sync)
@@ -0,0 +1,93 @@
+# projects/chat_images.py
+import base64
+import binascii
+import io
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from PIL import Image
+
+# Largest image accepted over the chat socket, in bytes
+MAX_IMAGE_BYTES = getattr(settings, 'CHAT_IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+
+# Uploads are kept in memory up to this size and spill to a temporary file beyond it
+SPOOL_BYTES = 1024 * 1024
+
+# Formats accepted in chat and the extension they are stored under
+FORMAT_EXTENSIONS = {
+    'JPEG': 'jpg',
+    'PNG': 'png',
+    'GIF': 'gif',
+    'WEBP': 'webp',
+}
+
+
+class InvalidImage(Exception):
+    pass
+
+
+class ImageUpload:
+    """
+    An image arriving as binary WebSocket frames. The client announces the
+    size up front, so oversized uploads are refused before any byte is
+    buffered and a sender cannot stream more than it declared.
+    """
+
+    def __init__(self, size):
+        if not isinstance(size, int) or size <= 0:
+            raise InvalidImage("A positive image 'size' is required")
+        if size > MAX_IMAGE_BYTES:
+            raise InvalidImage(f"Images are limited to {MAX_IMAGE_BYTES // (1024 * 1024)} MB")
+        self.size = size
+        self.received = 0
+        self.file = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+
+    def write(self, chunk):
+        self.received += len(chunk)
+        if self.received > self.size:
+            raise InvalidImage("Image is larger than its declared size")
+        self.file.write(chunk)
+
+    @property
+    def complete(self):
+        return self.received == self.size
+
+    def close(self):
+        self.file.close()
+
+
+def decode_base64_image(data):
+    """Decode a legacy base64 image payload, enforcing the size cap before decoding."""
+    if len(data) * 3 // 4 > MAX_IMAGE_BYTES:
+        raise InvalidImage(f"Images are limited to {MAX_IMAGE_BYTES // (1024 * 1024)} MB")
+    try:
+        return io.BytesIO(base64.b64decode(data, validate=True))
+    except (binascii.Error, ValueError):
+        raise InvalidImage("Invalid base64 image data")
+
+
+def sniff_extension(fileobj):
+    """
+    Identify the image from its content (not its name or the client's claim)
+    and return the extension to store it under. Leaves the file rewound.
+    """
+    fileobj.seek(0)
+    try:
+        with Image.open(fileobj) as image:
+            image_format = image.format
+            image.verify()
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        raise InvalidImage("File is not a readable image")
+    finally:
+        fileobj.seek(0)
+    if image_format not in FORMAT_EXTENSIONS:
+        raise InvalidImage(f"Unsupported image format {image_format}")
+    return FORMAT_EXTENSIONS[image_format]
+
+
+def chat_image_file(fileobj, prefix):
+    """Wrap a sniffed upload as a File whose name carries the real extension; storage copies it in chunks."""
+    extension = sniff_extension(fileobj)
+    return File(fileobj, name=f"{prefix}_{uuid.uuid4().hex}.{extension}")
@@ -1,20 +1,26 @@
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from rest_framework_simplejwt.tokens import AccessToken
 from api.models import CustomUser
 from projects.models import ChatSession, ChatMessage, Notification, VideoCall
 from skills.models import Mentorship
 from api.serializers import UserSerializer
-from django.contrib.auth import get_user_model
+from projects.chat_buffer import chat_buffer
+from api.images import rendition_urls
+from projects.chat_images import ImageUpload, InvalidImage, chat_image_file, decode_base64_image
 import json
 import logging
-import base64
-from django.core.files.base import ContentFile
 from django.conf import settings
+from django.db.models import Count, OuterRef, Q, Subquery
 import uuid
 
 logger = logging.getLogger(__name__)
 
+# Number of messages replayed on connect and returned per `load_history` request
+CHAT_HISTORY_PAGE_SIZE = getattr(settings, 'CHAT_HISTORY_PAGE_SIZE', 50)
+
+# Upper bound on notifications replayed to a (re)connecting client
+NOTIFICATION_BACKLOG_LIMIT = getattr(settings, 'NOTIFICATION_BACKLOG_LIMIT', 50)
+
 class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.chat_id = self.scope['url_route']['kwargs']['chat_id']
@@ -27,65 +33,143 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return
 
         try:
-            # Try ChatSession (integer ID)
-            try:
-                self.chat_session = await database_sync_to_async(ChatSession.objects.get)(id=int(self.chat_id), is_active=True)
-                helper_id = await database_sync_to_async(lambda: self.chat_session.helper.id)()
-                requester_id = await database_sync_to_async(lambda: self.chat_session.requester.id)()
-                if user.id not in [helper_id, requester_id]:
-                    logger.warning(f"Unauthorized user {user.id} ({user.username}) attempted to join chat {self.chat_id}")
-                    await self.close(code=4003, reason="Unauthorized access")
-                    return
-                self.is_mentorship = False
-            except (ChatSession.DoesNotExist, ValueError):
-                # Try Mentorship (UUID)
-                try:
-                    mentorship = await database_sync_to_async(Mentorship.objects.get)(chat_session_id=self.chat_id, status='active')
-                    learner_id = await database_sync_to_async(lambda: mentorship.learner.id)()
-                    mentor_id = await database_sync_to_async(lambda: mentorship.mentor.id)()
-                    if user.id not in [learner_id, mentor_id]:
-                        logger.warning(f"Unauthorized user {user.id} ({user.username}) attempted to join mentorship chat {self.chat_id}")
-                        await self.close(code=4003, reason="Unauthorized access")
-                        return
-                    self.chat_session = None
-                    self.is_mentorship = True
-                except Mentorship.DoesNotExist:
-                    logger.error(f"Chat session or mentorship {self.chat_id} not found")
-                    await self.close(code=4000, reason="Chat session or mentorship not found")
-                    return
+            participants = await self.get_participants()
+            if participants is None:
+                logger.error(f"Chat session or mentorship {self.chat_id} not found")
+                await self.close(code=4000, reason="Chat session or mentorship not found")
+                return
+            if user.id not in participants:
+                logger.warning(f"Unauthorized user {user.id} ({user.username}) attempted to join chat {self.chat_id}")
+                await self.close(code=4003, reason="Unauthorized access")
+                return
+            # The sender block is identical for every message this connection sends
+            self.sender_data = UserSerializer(user).data
 
             await self.channel_layer.group_add(self.chat_group_name, self.channel_name)
             await self.accept()
             await self.send(text_data=json.dumps({"message": "Connected to chat"}))
-            messages = await self.get_chat_history()
-            for msg in messages:
-                await self.send(text_data=json.dumps(msg))
+            await self.send_chat_history()
         except Exception as e:
             logger.error(f"Connect error: {str(e)}")
             await self.close(code=1011, reason="Server error")
 
+    async def get_participants(self):
+        """
+        Resolve the chat and return the ids allowed to join it, or None.
+        Integer ids are help-request chat sessions, UUIDs mentorship chats;
+        either way it is a single query reading only the participant columns.
+        """
+        try:
+            chat_session_id = int(self.chat_id)
+        except ValueError:
+            chat_session_id = None
+        if chat_session_id is not None:
+            row = await ChatSession.objects.filter(id=chat_session_id, is_active=True).values_list(
+                'helper_id', 'requester_id'
+            ).afirst()
+            if row is not None:
+                self.chat_session_id = chat_session_id
+                self.is_mentorship = False
+                return row
+
+        try:
+            uuid.UUID(str(self.chat_id))
+        except ValueError:
+            return None
+        row = await Mentorship.objects.filter(chat_session_id=self.chat_id, status='active').values_list(
+            'learner_id', 'mentor_id'
+        ).afirst()
+        if row is not None:
+            self.chat_session_id = None
+            self.is_mentorship = True
+        return row
+
+    async def send_chat_history(self, before=None):
+        """Send one page of history, newest page first, as a single batched frame."""
+        if chat_buffer.pending:
+            # Messages still in the write-behind buffer must be part of the replay
+            await chat_buffer.flush()
+        messages, has_more = await self.get_chat_history(before)
+        await self.send(text_data=json.dumps({
+            'type': 'chat_history',
+            'messages': messages,
+            'has_more': has_more,
+            'before': messages[0]['id'] if messages else None
+        }))
+
     @database_sync_to_async
-    def get_chat_history(self):
+    def get_chat_history(self, before=None):
+        """
+        Return up to CHAT_HISTORY_PAGE_SIZE messages older than the `before`
+        message id (or the latest ones), in chronological order, plus whether
+        older messages remain. Senders are resolved with one bulk query.
+        """
         if self.is_mentorship:
-            messages = ChatMessage.objects.filter(mentorship_chat_session_id=self.chat_id).order_by('timestamp')
+            messages = ChatMessage.objects.filter(mentorship_chat_session_id=self.chat_id)
         else:
-            messages = ChatMessage.objects.filter(chat_session=self.chat_session).order_by('timestamp')
+            messages = ChatMessage.objects.filter(chat_session_id=self.chat_session_id)
+
+        if before is not None:
+            # Seek on the (timestamp, id) index instead of offsetting through the chat
+            before_timestamp = Subquery(ChatMessage.objects.filter(pk=before).values('timestamp')[:1])
+            messages = messages.filter(
+                Q(timestamp__lt=before_timestamp) | Q(timestamp=before_timestamp, id__lt=before)
+            )
+
+        page = list(
+            messages.only('id', 'sender_id', 'content', 'image', 'image_renditions', 'timestamp')
+            .order_by('-timestamp', '-id')[:CHAT_HISTORY_PAGE_SIZE + 1]
+        )
+        has_more = len(page) > CHAT_HISTORY_PAGE_SIZE
+        page = page[:CHAT_HISTORY_PAGE_SIZE]
+        page.reverse()
+
+        senders = CustomUser.objects.in_bulk({msg.sender_id for msg in page})
+        sender_data = {sender_id: UserSerializer(sender).data for sender_id, sender in senders.items()}
         return [{
             'id': msg.id,
-            'sender': UserSerializer(msg.sender).data,
+            'sender': sender_data.get(msg.sender_id),
             'content': msg.content,
             'image_url': msg.image.url if msg.image else None,
+            'image_renditions': rendition_urls(msg, 'chat_image') if msg.image else None,
             'timestamp': msg.timestamp.isoformat()
-        } for msg in messages]
+        } for msg in page], has_more
 
     async def disconnect(self, close_code):
         logger.info(f"Disconnected from {self.chat_group_name}, code: {close_code}")
         await self.channel_layer.group_discard(self.chat_group_name, self.channel_name)
+        self.discard_image_upload()
+        if chat_buffer.pending:
+            await chat_buffer.flush()
 
-    async def receive(self, text_data):
+    async def receive(self, text_data=None, bytes_data=None):
         try:
+            if bytes_data is not None:
+                await self.receive_image_chunk(bytes_data)
+                return
+
             data = json.loads(text_data)
-            logger.info(f"Received data: {data}")
+            message_type = data.get('type')
+            # Never log the payload itself: legacy image frames carry the whole file
+            logger.info(f"Received {message_type or 'message'} frame from user {self.scope['user'].id} in chat {self.chat_id}")
+
+            if message_type == 'load_history':
+                try:
+                    before = int(data['before'])
+                except (KeyError, TypeError, ValueError):
+                    await self.send(text_data=json.dumps({"error": "A numeric 'before' message id is required"}))
+                    return
+                await self.send_chat_history(before=before)
+                return
+
+            if message_type == 'image_start':
+                await self.start_image_upload(data.get('size'))
+                return
+
+            if message_type == 'image_end':
+                await self.finish_image_upload()
+                return
+
             message = data.get('message', '')
             image_base64 = data.get('image', '')
             sender = self.scope['user']
@@ -94,64 +178,33 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 logger.warning("Empty message received")
                 return
 
-            message_data = None
-
             if message:
-                logger.info("Processing text message")
-                chat_message = await database_sync_to_async(ChatMessage.objects.create)(
-                    chat_session=self.chat_session if not self.is_mentorship else None,
+                chat_message = ChatMessage(
+                    chat_session_id=self.chat_session_id,
                     mentorship_chat_session_id=self.chat_id if self.is_mentorship else None,
                     sender=sender,
                     content=message
                 )
+                if chat_buffer.enabled:
+                    # Id assigned now, row inserted by the next batched flush
+                    await chat_buffer.add(chat_message)
+                else:
+                    await chat_message.asave()
                 logger.info(f"Created text chat_message with ID: {chat_message.id}")
-                message_data = {
+                await self.broadcast_message({
                     'id': chat_message.id,
-                    'sender': UserSerializer(sender).data,
+                    'sender': self.sender_data,
                     'content': message,
                     'timestamp': chat_message.timestamp.isoformat()
-                }
-
-            elif image_base64:
-                logger.info("Processing image message")
-                chat_message = await database_sync_to_async(ChatMessage.objects.create)(
-                    chat_session=self.chat_session if not self.is_mentorship else None,
-                    mentorship_chat_session_id=self.chat_id if self.is_mentorship else None,
-                    sender=sender
-                )
-                logger.info(f"Created image chat_message with ID: {chat_message.id}")
+                })
+            else:
+                # Legacy base64 JSON frame; decoding happens off the event loop
                 try:
-                    image_data = base64.b64decode(image_base64)
-                    image_file = ContentFile(image_data, name=f'chat_{self.chat_id}_{sender.id}_{chat_message.id}.jpg')
-                    chat_message.image = image_file
-                    await database_sync_to_async(chat_message.save)()
-                    image_url = chat_message.image.url
-                    logger.info(f"Image saved at: {image_url}")
-                except base64.binascii.Error as e:
-                    logger.error(f"Invalid base64 image data: {str(e)}")
-                    await database_sync_to_async(chat_message.delete)()
+                    chat_message = await self.store_image(image_base64=image_base64)
+                except InvalidImage as e:
+                    await self.send(text_data=json.dumps({"error": str(e)}))
                     return
-
-                message_data = {
-                    'id': chat_message.id,
-                    'sender': UserSerializer(sender).data,
-                    'image_url': image_url,
-                    'timestamp': chat_message.timestamp.isoformat()
-                }
-
-            if message_data:
-                logger.info(f"Sending message_data: {message_data}")
-                await self.channel_layer.group_send(
-                    self.chat_group_name,
-                    {
-                        'type': 'chat_message',
-                        'message': message_data,
-                        'sender_channel': self.channel_name
-                    }
-                )
-                await self.send(text_data=json.dumps(message_data))
-            else:
-                logger.error("No message_data created; skipping send")
+                await self.broadcast_image(chat_message)
 
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON data: {str(e)}")
@@ -160,6 +213,87 @@ class ChatConsumer(AsyncWebsocketConsumer):
             logger.error(f"Receive error: {str(e)}")
             await self.close(code=1011, reason="Server error")
 
+    async def start_image_upload(self, size):
+        """
+        Begin a binary upload: `{"type": "image_start", "size": <bytes>}`, then
+        the file as binary frames, then `{"type": "image_end"}`.
+        """
+        self.discard_image_upload()
+        try:
+            self.upload = ImageUpload(size)
+        except InvalidImage as e:
+            await self.send(text_data=json.dumps({"error": str(e)}))
+
+    async def receive_image_chunk(self, chunk):
+        upload = getattr(self, 'upload', None)
+        if upload is None:
+            await self.send(text_data=json.dumps({"error": "Send image_start before image data"}))
+            return
+        try:
+            upload.write(chunk)
+        except InvalidImage as e:
+            self.discard_image_upload()
+            await self.send(text_data=json.dumps({"error": str(e)}))
+
+    async def finish_image_upload(self):
+        upload = getattr(self, 'upload', None)
+        if upload is None:
+            await self.send(text_data=json.dumps({"error": "No image upload in progress"}))
+            return
+        self.upload = None
+        try:
+            if not upload.complete:
+                raise InvalidImage(f"Image incomplete: received {upload.received} of {upload.size} bytes")
+            chat_message = await self.store_image(fileobj=upload.file)
+        except InvalidImage as e:
+            await self.send(text_data=json.dumps({"error": str(e)}))
+            return
+        finally:
+            upload.close()
+        await self.broadcast_image(chat_message)
+
+    def discard_image_upload(self):
+        upload = getattr(self, 'upload', None)
+        if upload is not None:
+            upload.close()
+            self.upload = None
+
+    @database_sync_to_async
+    def store_image(self, fileobj=None, image_base64=None):
+        """Decode, sniff and store an image in the worker thread, then insert its message."""
+        if fileobj is None:
+            fileobj = decode_base64_image(image_base64)
+        sender = self.scope['user']
+        return ChatMessage.objects.create(
+            chat_session_id=self.chat_session_id,
+            mentorship_chat_session_id=self.chat_id if self.is_mentorship else None,
+            sender=sender,
+            image=chat_image_file(fileobj, f'chat_{self.chat_id}_{sender.id}')
+        )
+
+    async def broadcast_image(self, chat_message):
+        logger.info(f"Created image chat_message with ID: {chat_message.id} at {chat_message.image.name}")
+        await self.broadcast_message({
+            'id': chat_message.id,
+            'sender': self.sender_data,
+            'image_url': chat_message.image.url,
+            # Point at the original until the processing pool pushes chat_image_processed
+            'image_renditions': rendition_urls(chat_message, 'chat_image'),
+            'timestamp': chat_message.timestamp.isoformat()
+        })
+
+    async def broadcast_message(self, message_data):
+        """Fan a stored message out to the other participants and echo it to the sender."""
+        await self.channel_layer.group_send(
+            self.chat_group_name,
+            {
+                'type': 'chat_message',
+                'message': message_data,
+                'sender_channel': self.channel_name
+            }
+        )
+        await self.send(text_data=json.dumps(message_data))
+
     async def chat_message(self, event):
         message_data = event['message']
         sender_channel = event.get('sender_channel')
@@ -167,6 +301,9 @@ class ChatConsumer(AsyncWebsocketConsumer):
             logger.info(f"Broadcasting to {self.channel_name}: {message_data}")
             await self.send(text_data=json.dumps(message_data))
 
+    async def chat_image_processed(self, event):
+        await self.send(text_data=json.dumps({'type': 'image_processed', **event['message']}))
+
     async def chat_ended(self, event):
         await self.send(text_data=json.dumps({
             'type': 'chat_ended',
@@ -176,31 +313,42 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
 class NotificationConsumer(AsyncWebsocketConsumer):
     async def connect(self):
-        query_string = self.scope['query_string'].decode()
-        token = dict(qc.split('=') for qc in query_string.split('&')).get('token', '')
+        # Authenticated once by JWTWebsocketMiddleware
+        self.user = self.scope['user']
+        if not self.user.is_authenticated:
+            logger.warning("NotificationConsumer rejected unauthenticated connection")
+            await self.close(code=4001, reason="Authentication failed")
+            return
+        query_params = self.scope.get('query_params', {})
         try:
-            access_token = AccessToken(token)
-            user_id = access_token['user_id']
-            self.user = await database_sync_to_async(CustomUser.objects.get)(id=user_id)
-            self.group_name = f'notifications_{user_id}'
+            self.group_name = f'notifications_{self.user.id}'
             await self.channel_layer.group_add('notifications', self.channel_name)
             await self.channel_layer.group_add(self.group_name, self.channel_name)
             await self.accept()
             logger.info(f"NotificationConsumer connected for user {self.user.username}")
 
-            notifications = await self.get_notifications()
-            for notification in notifications:
-                await self.send(text_data=json.dumps({
-                    'type': 'notification',
-                    'notification': {
-                        'id': notification['id'],
-                        'message': notification['message'],
-                        'is_read': notification['is_read'],
-                        'created_at': notification['created_at'].isoformat(),
-                        'notification_type': notification['notification_type'],
-                        'link': notification['link'] or None
-                    }
-                }))
+            since = query_params.get('since')
+            try:
+                since = int(since) if since else None
+            except ValueError:
+                logger.warning(f"Ignoring invalid notification cursor: {since}")
+                since = None
+
+            notifications, unread_count, has_more = await self.get_notifications(since)
+            await self.send(text_data=json.dumps({
+                'type': 'notification_backlog',
+                'notifications': [{
+                    'id': notification['id'],
+                    'message': notification['message'],
+                    'is_read': notification['is_read'],
+                    'created_at': notification['created_at'].isoformat(),
+                    'notification_type': notification['notification_type'],
+                    'link': notification['link'] or None
+                } for notification in notifications],
+                'unread_count': unread_count,
+                'has_more': has_more,
+                'since': since
+            }))
         except Exception as e:
             logger.error(f"NotificationConsumer connection failed: {str(e)}")
             await self.close(code=4001, reason="Authentication failed")
@@ -230,15 +378,49 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             }))
 
     @database_sync_to_async
-    def get_notifications(self):
-        return list(Notification.objects.filter(user=self.user).values(
-            'id', 'message', 'is_read', 'created_at', 'notification_type', 'link'
-        ))
+    def get_notifications(self, since=None):
+        """
+        Return the notifications the client has not seen yet, the user's unread
+        count and whether more rows remain beyond the window.
+
+        With a `since` id the oldest rows after it come back in ascending id
+        order, so a client that advances its cursor to the last id it received
+        picks up the rest on the next delta instead of skipping them; when
+        `has_more` is set it should resync over REST. Without one, unread rows
+        come first and the remainder of the capped window is filled with the
+        most recent read ones. The unread count rides along on every row as a
+        scalar subquery so the common case costs a single statement.
+        """
+        unread_count = Subquery(
+            Notification.objects.filter(user=OuterRef('user'), is_read=False)
+            .order_by()
+            .values('user')
+            .annotate(total=Count('id'))
+            .values('total')[:1]
+        )
+        queryset = Notification.objects.filter(user=self.user).annotate(unread_total=unread_count)
+        if since is not None:
+            queryset = queryset.filter(id__gt=since).order_by('id')
+        else:
+            queryset = queryset.order_by('is_read', '-created_at')
+
+        rows = list(queryset.values(
+            'id', 'message', 'is_read', 'created_at', 'notification_type', 'link', 'unread_total'
+        )[:NOTIFICATION_BACKLOG_LIMIT + 1])
+        has_more = len(rows) > NOTIFICATION_BACKLOG_LIMIT
+        rows = rows[:NOTIFICATION_BACKLOG_LIMIT]
+        if rows:
+            unread = rows[0]['unread_total'] or 0
+        else:
+            unread = Notification.objects.filter(user=self.user, is_read=False).count()
+        if since is None:
+            rows.sort(key=lambda row: row['created_at'], reverse=True)
+        return rows, unread, has_more
 
 class VideoCallConsumer(AsyncWebsocketConsumer):
     async def connect(self):
-        token = self.scope['query_string'].decode().split('token=')[1] if 'token=' in self.scope['query_string'].decode() else None
-        if not token or not await self.get_user_from_token(token):
+        # Authenticated once by JWTWebsocketMiddleware
+        if not self.scope['user'].is_authenticated:
             await self.close(code=4001, reason="Invalid token")
             return
 
@@ -250,6 +432,8 @@ class VideoCallConsumer(AsyncWebsocketConsumer):
         logger.info(f"Connected to video call {self.call_id}: {self.channel_name}")
 
     async def disconnect(self, close_code):
+        if not hasattr(self, 'group_name'):
+            return
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
         logger.info(f"Disconnected from video call {self.call_id}: {self.channel_name}")
 
@@ -270,11 +454,3 @@ class VideoCallConsumer(AsyncWebsocketConsumer):
 
     async def call_ended(self, event):
         await self.send(text_data=json.dumps(event['message']))
-
-    @database_sync_to_async
-    def get_user_from_token(self, token):
-        try:
-            access_token = AccessToken(token)
-            return get_user_model().objects.get(id=access_token['user_id'])
-        except Exception:
-            return None
\ No newline at end of file
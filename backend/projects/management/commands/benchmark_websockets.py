@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+from channels.testing import WebsocketCommunicator
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.models import CustomUser
+from projects.chat_buffer import chat_buffer
+from projects.models import ChatMessage
+
+BENCHMARK_PREFIX = '[ws-benchmark]'
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure chat WebSocket throughput in-process: connects/sec (auth, participant "
+        "check, history replay) and messages/sec (persist and broadcast round trip)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chat-id', required=True, help="Existing chat session id or mentorship chat UUID")
+        parser.add_argument('--username', required=True, help="A participant of the chat")
+        parser.add_argument('--connections', type=int, default=200, help="Number of connect/disconnect cycles")
+        parser.add_argument('--messages', type=int, default=1000, help="Number of chat messages to send")
+        parser.add_argument('--concurrency', type=int, default=10, help="Connections opened in parallel")
+        parser.add_argument('--origin', default='http://localhost', help="Origin header accepted by ALLOWED_HOSTS")
+        parser.add_argument('--keep', action='store_true', help="Keep the messages written by the run")
+
+    def handle(self, *args, **options):
+        from backend.asgi import application
+
+        try:
+            user = CustomUser.objects.get(username=options['username'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"User {options['username']} does not exist")
+
+        self.application = application
+        self.path = f"/api/ws/chat/{options['chat_id']}/?token={AccessToken.for_user(user)}"
+        self.headers = [(b'origin', options['origin'].encode())]
+
+        try:
+            connects = asyncio.run(self.bench_connects(options['connections'], options['concurrency']))
+            messages = asyncio.run(self.bench_messages(options['messages']))
+        finally:
+            # With CHAT_WRITE_BEHIND some messages may still be queued; write them
+            # first so the cleanup sees them (the event loop is gone, so flush synchronously)
+            chat_buffer.flush_sync()
+            if not options['keep']:
+                deleted, _ = ChatMessage.objects.filter(sender=user, content__startswith=BENCHMARK_PREFIX).delete()
+                self.stdout.write(f"Removed {deleted} benchmark messages")
+
+        self.stdout.write(self.style.SUCCESS(f"connects/sec: {connects:.1f}"))
+        self.stdout.write(self.style.SUCCESS(f"messages/sec: {messages:.1f}"))
+
+    def communicator(self):
+        return WebsocketCommunicator(self.application, self.path, headers=self.headers)
+
+    async def open(self):
+        """Connect and consume the greeting and history frames the consumer sends on join."""
+        communicator = self.communicator()
+        connected, code = await communicator.connect()
+        if not connected:
+            raise CommandError(f"Connection rejected with code {code}; check --chat-id, --username and --origin")
+        await communicator.receive_json_from()
+        await communicator.receive_json_from()
+        return communicator
+
+    async def bench_connects(self, count, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def cycle():
+            async with semaphore:
+                communicator = await self.open()
+                await communicator.disconnect()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(cycle() for _ in range(count)))
+        return count / (time.perf_counter() - started)
+
+    async def bench_messages(self, count):
+        communicator = await self.open()
+        try:
+            started = time.perf_counter()
+            for i in range(count):
+                # Each message counts once it is stored, fanned out to the group and echoed back
+                await communicator.send_json_to({'message': f"{BENCHMARK_PREFIX} {i}"})
+                await communicator.receive_json_from(timeout=5)
+            elapsed = time.perf_counter() - started
+        finally:
+            await communicator.disconnect()
+        return count / elapsed
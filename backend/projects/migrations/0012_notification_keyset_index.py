@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0011_alter_chatmessage_mentorship_chat_session_id_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "created_at", "id"],
+                name="projects_no_user_id_75c172_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0012_notification_keyset_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chatmessage",
+            name="image_renditions",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
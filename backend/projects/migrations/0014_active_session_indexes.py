@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0013_chatmessage_image_renditions"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chatsession",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["created_at"],
+                name="projects_chat_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="videocall",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["started_at"],
+                name="projects_call_active_idx",
+            ),
+        ),
+    ]
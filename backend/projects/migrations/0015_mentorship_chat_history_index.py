@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0014_active_session_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chatmessage",
+            index=models.Index(
+                fields=["mentorship_chat_session_id", "timestamp"],
+                name="projects_ch_mentors_cb03d3_idx",
+            ),
+        ),
+    ]
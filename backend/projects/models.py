@@ -3,12 +3,11 @@ from django.conf import settings
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from api.models import Category
+from api.images import register_image_kind, schedule_renditions
+from api.votes import register_vote_kind
 from django.utils import timezone
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
 import logging
 from skills.models import Mentorship
-from django.db.models import Q
 
 logger = logging.getLogger(__name__)
 
@@ -55,13 +54,15 @@ class HelpCommentUpvote(models.Model):
             models.UniqueConstraint(fields=['user', 'comment'], name='unique_help_comment_upvote'),
         ]
 
+register_vote_kind('help_comment', 'projects.HelpCommentUpvote', 'comment')
+
+
 @receiver(post_save, sender=HelpCommentUpvote)
 def award_credit_on_comment_upvote(sender, instance, created, **kwargs):
+    # The upvotes counter is maintained by api.votes.toggle_vote
     if created:
         comment = instance.comment
         user = comment.user
-        comment.upvotes += 1
-        comment.save(update_fields=['upvotes'])
         credits = user.get_credits()  # Assuming Credit model has this method
         credits.add_credits(1, description=f"Earned 1 credit for upvote on comment {comment.id}")
 
@@ -77,6 +78,8 @@ class ChatSession(models.Model):
         indexes = [
             models.Index(fields=['requester', 'is_active']),  # For user-specific active sessions
             models.Index(fields=['helper', 'is_active']),    # For helper-specific active sessions
+            # Idle-chat sweep (projects.tasks); only active rows are indexed
+            models.Index(fields=['created_at'], condition=models.Q(is_active=True), name='projects_chat_active_idx'),
         ]
 
     def __str__(self):
@@ -88,16 +91,31 @@ class ChatMessage(models.Model):
     sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     content = models.TextField(blank=True)
     image = models.ImageField(upload_to='chat_images/', null=True, blank=True)
+    image_renditions = models.JSONField(default=dict, blank=True)  # Filled by api.images
     timestamp = models.DateTimeField(default=timezone.now, db_index=True)  # Index for sorting
 
     class Meta:
         indexes = [
             models.Index(fields=['chat_session', 'timestamp']),  # For messages per session
+            models.Index(fields=['mentorship_chat_session_id', 'timestamp']),  # For messages per mentorship chat
         ]
 
     def __str__(self):
         return f"Message by {self.sender.username} at {self.timestamp}"
 
+def notify_chat_image_processed(message):
+    from .notifications import push_chat_image_renditions
+    push_chat_image_renditions(message)
+
+register_image_kind('chat_image', 'projects.ChatMessage', 'image', 'image_renditions', {
+    'thumbnail': (320, 320, False),
+    'display': (1280, 1280, False),
+}, on_complete=notify_chat_image_processed)
+
+@receiver(post_save, sender=ChatMessage)
+def process_chat_image(sender, instance, update_fields=None, **kwargs):
+    schedule_renditions('chat_image', instance, update_fields)
+
 class VideoCall(models.Model):
     help_request = models.ForeignKey('HelpRequest', on_delete=models.CASCADE, related_name="video_calls", null=True, blank=True)
     mentorship = models.ForeignKey(Mentorship, on_delete=models.CASCADE, related_name="video_calls", null=True, blank=True)
@@ -111,14 +129,19 @@ class VideoCall(models.Model):
         indexes = [
             models.Index(fields=['requester', 'is_active']),  # For user-specific active calls
             models.Index(fields=['helper', 'is_active']),    # For helper-specific active calls
+            # Stale-call sweep (projects.tasks); only active rows are indexed
+            models.Index(fields=['started_at'], condition=models.Q(is_active=True), name='projects_call_active_idx'),
         ]
 
     def end_call(self):
         context_title = self.help_request.title if self.help_request else (self.mentorship.skill.skill if self.mentorship else "Unknown Context")
         logger.info(f"Ending video call for {context_title} between {self.requester.username} and {self.helper.username}")
+        ended_at = timezone.now()
+        # Conditional update so only one of several concurrent "end" requests wins
+        ended = VideoCall.objects.filter(pk=self.pk, is_active=True).update(is_active=False, ended_at=ended_at)
         self.is_active = False
-        self.ended_at = timezone.now()
-        self.save(update_fields=['is_active', 'ended_at'])
+        self.ended_at = ended_at
+        return bool(ended)
 
     def __str__(self):
         context_title = self.help_request.title if self.help_request else (self.mentorship.skill.skill if self.mentorship else "Unknown Context")
@@ -136,6 +159,7 @@ class Notification(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['user', 'is_read', 'created_at']),  # For user-specific unread notifications
+            models.Index(fields=['user', 'created_at', 'id']),  # Keyset pagination of a user's notifications
         ]
 
     def __str__(self):
@@ -144,37 +168,6 @@ class Notification(models.Model):
 @receiver(post_save, sender=Notification)
 def send_notification(sender, instance, created, **kwargs):
     if created:
-        logger.info(f"Creating notification for user {instance.user.username}: {instance.message}")
-        channel_layer = get_channel_layer()
-        notification_data = {
-            'id': instance.id,
-            'message': instance.message,
-            'is_read': instance.is_read,
-            'created_at': instance.created_at.isoformat(),
-            'notification_type': instance.notification_type,
-            'link': instance.link
-        }
-
-        if instance.notification_type == 'video_call_started':
-            try:
-                video_call = VideoCall.objects.filter(
-                    Q(requester=instance.user) | Q(helper=instance.user),
-                    is_active=True
-                ).latest('started_at')
-                notification_data['callId'] = video_call.id
-                logger.info(f"Added callId {video_call.id} to notification {instance.id}")
-            except VideoCall.DoesNotExist:
-                logger.warning(f"No active VideoCall found for notification {instance.id}")
-                notification_data['callId'] = None
-
-        logger.info(f"Sending notification to user {instance.user.id}: {notification_data}")
-        
-        async_to_sync(channel_layer.group_send)(
-            f'notifications_{instance.user.id}',
-            {
-                'type': 'notification',
-                'notification': notification_data
-            }
-        )
-        
-        logger.info(f"Notification {instance.id} sent through WebSocket")
\ No newline at end of file
+        from .notifications import push_notification
+        logger.info(f"Queueing notification {instance.id} for user {instance.user_id}")
+        push_notification(instance)
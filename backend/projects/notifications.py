@@ -0,0 +1,186 @@
+# projects/notifications.py
+import asyncio
+import logging
+import threading
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import connection, transaction
+from django.db.models import Q
+
+from api.images import rendition_urls
+
+from .models import Notification, VideoCall
+
+logger = logging.getLogger(__name__)
+
+
+def serialize_notification(notification, extra=None):
+    """Build the payload NotificationConsumer.notification expects."""
+    data = {
+        'id': notification.id,
+        'message': notification.message,
+        'is_read': notification.is_read,
+        'created_at': notification.created_at.isoformat() if notification.created_at else None,
+        'notification_type': notification.notification_type,
+        'link': notification.link
+    }
+    if extra:
+        data.update(extra)
+    return data
+
+
+class _Batch:
+    """Channel-layer messages waiting for the surrounding transaction to commit."""
+
+    def __init__(self, dispatcher):
+        self.dispatcher = dispatcher
+        self.messages = []
+        # Every access to self.flush builds a new bound method; keep the registered one
+        self.callback = self.flush
+
+    def flush(self):
+        self.dispatcher.send_batch(self.messages)
+
+
+class NotificationDispatcher:
+    """
+    Collects WebSocket pushes for the current thread and delivers them once the
+    database transaction that created them commits.
+
+    Inside an atomic block every push is deferred to a single on_commit callback
+    and sent as one concurrent batch, so a view creating several notifications
+    pays for one trip to the channel layer instead of one blocking round-trip per
+    row. Outside a transaction pushes go out immediately.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _current_batch(self):
+        batch = getattr(self._local, 'batch', None)
+        # Callbacks of a rolled back (or already committed) transaction are dropped
+        # by Django, so only reuse the batch while its flush is still registered.
+        if batch is not None and any(entry[1] is batch.callback for entry in connection.run_on_commit):
+            return batch
+        batch = _Batch(self)
+        self._local.batch = batch
+        transaction.on_commit(batch.callback)
+        return batch
+
+    def group_send(self, group, message):
+        """Queue an arbitrary channel-layer message for `group`."""
+        if connection.in_atomic_block:
+            self._current_batch().messages.append((group, message))
+        else:
+            self.send_batch([(group, message)])
+
+    def enqueue(self, notification, extra=None):
+        """Queue the WebSocket push for a saved Notification."""
+        self.group_send(
+            f'notifications_{notification.user_id}',
+            {
+                'type': 'notification',
+                'notification': serialize_notification(notification, extra)
+            }
+        )
+
+    def send_batch(self, messages):
+        if not messages:
+            return
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            logger.warning(f"No channel layer configured; dropping {len(messages)} queued messages")
+            return
+        try:
+            async_to_sync(self._send_all)(channel_layer, messages)
+            logger.info(f"Flushed {len(messages)} channel-layer messages")
+        except Exception as e:
+            logger.error(f"Failed to flush {len(messages)} channel-layer messages: {str(e)}")
+
+    @staticmethod
+    async def _send_all(channel_layer, messages):
+        results = await asyncio.gather(
+            *(channel_layer.group_send(group, message) for group, message in messages),
+            return_exceptions=True
+        )
+        for (group, _), result in zip(messages, results):
+            if isinstance(result, Exception):
+                logger.error(f"group_send to {group} failed: {str(result)}")
+
+
+dispatcher = NotificationDispatcher()
+
+
+def push_chat_image_renditions(message):
+    """Tell an open chat that a message's image renditions are ready."""
+    chat_key = message.mentorship_chat_session_id or message.chat_session_id
+    dispatcher.group_send(
+        f'chat_{chat_key}',
+        {
+            'type': 'chat_image_processed',
+            'message': {'id': message.id, 'image_renditions': rendition_urls(message, 'chat_image')}
+        }
+    )
+
+
+def _resolve_push_extras(notifications):
+    """
+    Fill in the callId of video_call_started notifications that were created
+    without one, with one query for all of them: each user's most recent
+    active call.
+    """
+    pending = [
+        notification for notification in notifications
+        if getattr(notification, 'push_extra', None) is None and notification.notification_type == 'video_call_started'
+    ]
+    if not pending:
+        return
+    user_ids = {notification.user_id for notification in pending}
+    latest = {}
+    video_calls = (
+        VideoCall.objects.filter(Q(requester_id__in=user_ids) | Q(helper_id__in=user_ids), is_active=True)
+        .order_by('started_at', 'id')
+        .values_list('id', 'requester_id', 'helper_id')
+    )
+    for call_id, requester_id, helper_id in video_calls:
+        latest[requester_id] = latest[helper_id] = call_id
+    for notification in pending:
+        call_id = latest.get(notification.user_id)
+        if call_id is None:
+            logger.warning(f"No active VideoCall found for notification {notification.id}")
+        notification.push_extra = {'callId': call_id}
+
+
+def push_notification(notification):
+    """Queue the push for a freshly created notification (used by the post_save signal)."""
+    _resolve_push_extras([notification])
+    dispatcher.enqueue(notification, getattr(notification, 'push_extra', None))
+
+
+def notify(user, message, notification_type='info', link=None, **extra):
+    """
+    Create a notification and queue its push. Extra keyword arguments (e.g.
+    callId) are added to the WebSocket payload only.
+    """
+    notification = Notification(user=user, message=message, notification_type=notification_type, link=link)
+    notification.push_extra = extra or None
+    notification.save()
+    return notification
+
+
+def create_notifications(notifications):
+    """Insert unsaved Notification instances with one query and queue one push per row."""
+    created = Notification.objects.bulk_create(notifications)
+    _resolve_push_extras(created)
+    for notification in created:
+        dispatcher.enqueue(notification, getattr(notification, 'push_extra', None))
+    return created
+
+
+def bulk_notify(users, message, notification_type='info', link=None):
+    """Send the same notification to many users with one INSERT and a single fan-out."""
+    return create_notifications([
+        Notification(user=user, message=message, notification_type=notification_type, link=link)
+        for user in users
+    ])
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from .models import HelpRequest, HelpComment, ChatMessage, ChatSession, Notification
-from api.serializers import UserSerializer
+from api.serializers import UserSerializer, CategoryPrimaryKeyField
 from api.models import Category
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -14,6 +14,10 @@ class HelpCommentSerializer(serializers.ModelSerializer):
     has_upvoted = serializers.SerializerMethodField()
 
     def get_has_upvoted(self, obj):
+        # Querysets built with annotate_comment_upvotes() carry the answer already
+        annotated = getattr(obj, "user_has_upvoted", None)
+        if annotated is not None:
+            return annotated
         user = self.context["request"].user
         return user.is_authenticated and obj.comment_upvotes.filter(user=user).exists()
 
@@ -24,8 +28,7 @@ class HelpCommentSerializer(serializers.ModelSerializer):
 class HelpRequestSerializer(serializers.ModelSerializer):
     created_by = UserSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
-    category_id = serializers.PrimaryKeyRelatedField(
-        queryset=Category.objects.all(),
+    category_id = CategoryPrimaryKeyField(
         source='category',
         write_only=True
     )
@@ -37,6 +40,18 @@ class HelpRequestSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_by', 'created_at', 'status', 'comments']
 
 
+class HelpRequestSummarySerializer(serializers.ModelSerializer):
+    """Compact list representation; expects `comments_count` to be annotated."""
+    created_by = UserSerializer(read_only=True)
+    category = CategorySerializer(read_only=True)
+    comments_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = HelpRequest
+        fields = ['id', 'title', 'description', 'category', 'created_by', 'created_at', 'status', 'credit_offer_chat', 'credit_offer_video', 'comments_count']
+        read_only_fields = fields
+
+
 # project_help/serializers.py
 class ChatMessageSerializer(serializers.ModelSerializer):
     sender = UserSerializer(read_only=True)
@@ -0,0 +1,131 @@
+# projects/tasks.py
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from credits.ledger import settle
+from jobs.scheduler import periodic, run_batches
+from .models import ChatMessage, ChatSession, Notification, VideoCall
+from .notifications import create_notifications, dispatcher
+
+logger = logging.getLogger(__name__)
+
+# An active chat with no message for this long is treated as abandoned
+CHAT_IDLE_TIMEOUT = timedelta(hours=getattr(settings, 'CHAT_IDLE_TIMEOUT_HOURS', 24))
+
+# Calls still marked active this long after they started lost their "end" request
+VIDEO_CALL_MAX_DURATION = timedelta(hours=getattr(settings, 'VIDEO_CALL_MAX_DURATION_HOURS', 4))
+
+
+def close_idle_chat_batch(batch_size):
+    """
+    End one batch of abandoned chats and settle them as an explicit end would:
+    the requester pays the offered chat credits when they can cover them.
+    """
+    cutoff = timezone.now() - CHAT_IDLE_TIMEOUT
+    recent_messages = ChatMessage.objects.filter(chat_session=OuterRef('pk'), timestamp__gte=cutoff)
+    with transaction.atomic():
+        sessions = list(
+            ChatSession.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(is_active=True, created_at__lt=cutoff)
+            .exclude(Exists(recent_messages))
+            .select_related('requester', 'helper', 'help_request')
+            .order_by('created_at')[:batch_size]
+        )
+        if not sessions:
+            return 0
+        ChatSession.objects.filter(pk__in=[session.pk for session in sessions]).update(is_active=False)
+
+        paid = settle([
+            (
+                session.requester,
+                session.helper,
+                session.help_request.credit_offer_chat,
+                f"Chat help for {session.help_request.title}",
+                f"Earned from chat help on {session.help_request.title}",
+            )
+            for session in sessions
+        ], notify=False)
+
+        idle_hours = f"{CHAT_IDLE_TIMEOUT.total_seconds() / 3600:.0f}"
+        notifications = []
+        for session, amount in zip(sessions, paid):
+            title = session.help_request.title
+            link = f"/help-requests/{session.help_request_id}"
+            notifications += [
+                Notification(user=session.requester, message=f"Your chat for '{title}' was closed after {idle_hours} hours of inactivity. You spent {amount} credits.", notification_type='info', link=link),
+                Notification(user=session.helper, message=f"Your chat for '{title}' was closed after {idle_hours} hours of inactivity. You earned {amount} credits.", notification_type='info', link=link),
+            ]
+            dispatcher.group_send(f"chat_{session.id}", {'type': 'chat_ended', 'message': {'status': 'chat_ended'}})
+        create_notifications(notifications)
+    logger.info(f"Closed {len(sessions)} idle chats, {sum(1 for amount in paid if amount)} settled")
+    return len(sessions)
+
+
+def end_stale_call_batch(batch_size):
+    """
+    End one batch of calls nobody ended. Help-request calls are settled like
+    EndVideoCall; mentorship calls carry no payment.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        calls = list(
+            VideoCall.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(is_active=True, started_at__lt=now - VIDEO_CALL_MAX_DURATION)
+            .select_related('requester', 'helper', 'help_request', 'mentorship__skill')
+            .order_by('started_at')[:batch_size]
+        )
+        if not calls:
+            return 0
+        VideoCall.objects.filter(pk__in=[call.pk for call in calls]).update(is_active=False, ended_at=now)
+
+        help_calls = [call for call in calls if call.help_request_id]
+        paid = dict(zip(
+            [call.pk for call in help_calls],
+            settle([
+                (
+                    call.requester,
+                    call.helper,
+                    call.help_request.credit_offer_video,
+                    f"Video call completed for {call.help_request.title}",
+                    f"Helped via video for {call.help_request.title}",
+                )
+                for call in help_calls
+            ], notify=False) if help_calls else []
+        ))
+
+        notifications = []
+        for call in calls:
+            if call.help_request_id:
+                title = call.help_request.title
+                link = f"/help-requests/{call.help_request_id}"
+                amount = paid[call.pk]
+                notifications += [
+                    Notification(user=call.requester, message=f"Video call for '{title}' has ended. You spent {amount} credits.", notification_type='info', link=link),
+                    Notification(user=call.helper, message=f"Video call for '{title}' has ended. You earned {amount} credits.", notification_type='info', link=link),
+                ]
+            elif call.mentorship_id:
+                link = f"/mentorships/{call.mentorship_id}"
+                message = f"Video call for mentorship '{call.mentorship.skill.skill}' has ended."
+                notifications += [
+                    Notification(user=call.requester, message=message, notification_type='info', link=link),
+                    Notification(user=call.helper, message=message, notification_type='info', link=link),
+                ]
+            dispatcher.group_send(f"video_call_{call.id}", {'type': 'call_ended', 'message': {'status': 'call_ended'}})
+        create_notifications(notifications)
+    logger.info(f"Ended {len(calls)} stale video calls")
+    return len(calls)
+
+
+@periodic(seconds=15 * 60)
+def close_idle_chats():
+    return run_batches(close_idle_chat_batch)
+
+
+@periodic(seconds=5 * 60)
+def end_stale_video_calls():
+    return run_batches(end_stale_call_batch)
@@ -1,3 +1,592 @@
-from django.test import TestCase
+import base64
+import io
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from channels.testing import WebsocketCommunicator
+from django.core.files.base import ContentFile
+from django.db import OperationalError, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, Category
+from credits.models import Credit
+from jobs.queue import Worker
+from jobs.scheduler import PERIODIC
+from skills.models import Mentorship, SkillProfile
+from .models import ChatMessage, ChatSession, HelpRequest, HelpComment, HelpCommentUpvote, Notification, VideoCall
+from .chat_buffer import ChatWriteBuffer
+from .consumers import ChatConsumer, NotificationConsumer
+from .notifications import create_notifications, dispatcher, notify
+from .tasks import CHAT_IDLE_TIMEOUT, VIDEO_CALL_MAX_DURATION, close_idle_chats, end_stale_video_calls
+
+
+class HelpRequestListQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Programming")
+        self.users = [
+            CustomUser.objects.create_user(username=f"user{i}", email=f"user{i}@example.com", password="pass", is_active=True)
+            for i in range(3)
+        ]
+
+    def create_help_requests(self, count):
+        for i in range(count):
+            help_request = HelpRequest.objects.create(
+                title=f"Request {i}",
+                description="Need help",
+                category=self.category,
+                created_by=self.users[i % len(self.users)],
+            )
+            for user in self.users:
+                comment = HelpComment.objects.create(help_request=help_request, user=user, content="Try this")
+                HelpCommentUpvote.objects.create(user=self.users[0], comment=comment)
+
+    def test_list_query_count_does_not_grow_with_rows(self):
+        self.create_help_requests(2)
+        # A single keyset-paginated SELECT, no COUNT
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("help-request-list"))
+        self.assertEqual(response.status_code, 200)
+
+        self.create_help_requests(10)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("help-request-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("count", response.data)
+
+    def test_cursor_walks_every_row_once(self):
+        self.create_help_requests(12)
+        seen = []
+        url = reverse("help-request-list") + "?page_size=5"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["results"]), 5)
+            seen.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+        expected = list(HelpRequest.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+        # Stepping back from the second page returns the first page
+        first = self.client.get(reverse("help-request-list") + "?page_size=5")
+        second = self.client.get(first.data["next"])
+        previous = self.client.get(second.data["previous"])
+        self.assertEqual(
+            [item["id"] for item in previous.data["results"]],
+            [item["id"] for item in first.data["results"]],
+        )
+
+    def test_ranked_search_walks_every_row_once(self):
+        # Identical titles tie on rank; ranked pages go by offset, not by seeking on the float
+        self.create_help_requests(12)
+        seen = []
+        url = reverse("help-request-list") + "?search=request&page_size=5"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(len(seen), 12)
+        self.assertEqual(set(seen), set(HelpRequest.objects.values_list("id", flat=True)))
+
+        first = self.client.get(reverse("help-request-list") + "?search=request&page_size=5")
+        second = self.client.get(first.data["next"])
+        previous = self.client.get(second.data["previous"])
+        self.assertEqual(
+            [item["id"] for item in previous.data["results"]],
+            [item["id"] for item in first.data["results"]],
+        )
+
+        # A keyset cursor is not accepted for a ranked ordering
+        keyset_cursor = self.client.get(reverse("help-request-list") + "?page_size=5").data["next"].split("cursor=")[1]
+        response = self.client.get(reverse("help-request-list") + f"?search=request&page_size=5&cursor={keyset_cursor}")
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse("help-request-list") + "?cursor=garbage")
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_returns_compact_summaries(self):
+        self.create_help_requests(1)
+        response = self.client.get(reverse("help-request-list"))
+        item = response.data["results"][0]
+        self.assertEqual(item["comments_count"], 3)
+        self.assertNotIn("comments", item)
+
+    def test_detail_annotates_has_upvoted(self):
+        self.create_help_requests(1)
+        help_request = HelpRequest.objects.get()
+        self.client.force_authenticate(self.users[0])
+        response = self.client.get(reverse("help-request-detail", args=[help_request.id]))
+        self.assertTrue(all(comment["has_upvoted"] for comment in response.data["comments"]))
+
+        self.client.force_authenticate(self.users[1])
+        response = self.client.get(reverse("help-request-detail", args=[help_request.id]))
+        self.assertFalse(any(comment["has_upvoted"] for comment in response.data["comments"]))
+
+    def test_detail_and_comment_list_query_count_does_not_grow_with_comments(self):
+        self.create_help_requests(1)
+        help_request = HelpRequest.objects.get()
+        self.client.force_authenticate(self.users[0])
+        for extra in (0, 10):
+            for _ in range(extra):
+                HelpComment.objects.create(help_request=help_request, user=self.users[1], content="Another idea")
+            # The request with its author and category, then every comment with its author and upvote flag
+            with self.assertNumQueries(2):
+                response = self.client.get(reverse("help-request-detail", args=[help_request.id]))
+            self.assertEqual(len(response.data["comments"]), 3 + extra)
+
+            with self.assertNumQueries(1):
+                response = self.client.get(reverse("help-comment-list", args=[help_request.id]))
+            self.assertEqual(response.status_code, 200)
+
+
+class HelpCommentUpvoteToggleTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        category = Category.objects.create(name="Programming")
+        self.author = CustomUser.objects.create_user(username="author", email="author@example.com", password="pass", is_active=True)
+        self.voter = CustomUser.objects.create_user(username="voter", email="voter@example.com", password="pass", is_active=True)
+        self.help_request = HelpRequest.objects.create(
+            title="Request", description="Need help", category=category, created_by=self.author
+        )
+        self.comment = HelpComment.objects.create(help_request=self.help_request, user=self.author, content="Try this")
+        self.client.force_authenticate(self.voter)
+
+    def toggle(self, request_id=None):
+        return self.client.post(
+            reverse("toggle-upvote", args=[request_id or self.help_request.id, self.comment.id])
+        )
+
+    def test_toggle_adds_then_removes_and_returns_count(self):
+        response = self.toggle()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["upvotes"], 1)
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.upvotes, 1)
+
+        response = self.toggle()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["upvotes"], 0)
+        self.assertFalse(HelpCommentUpvote.objects.filter(comment=self.comment).exists())
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.upvotes, 0)
+
+    def test_comment_of_another_request_is_not_found(self):
+        response = self.toggle(request_id=self.help_request.id + 1)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(HelpCommentUpvote.objects.exists())
+
+
+@mock.patch.object(dispatcher, "send_batch")
+class NotificationDispatcherTests(TestCase):
+    def setUp(self):
+        self.users = [
+            CustomUser.objects.create_user(username=f"user{i}", email=f"user{i}@example.com", password="pass", is_active=True)
+            for i in range(3)
+        ]
+
+    def test_one_batched_send_per_committed_transaction(self, send_batch):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                for user in self.users:
+                    notify(user, "Hello")
+        self.assertEqual(len(callbacks), 1)
+        send_batch.assert_called_once()
+        messages = send_batch.call_args.args[0]
+        self.assertEqual([group for group, _ in messages], [f"notifications_{user.id}" for user in self.users])
+
+    def test_nothing_is_sent_after_a_rollback(self, send_batch):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    for user in self.users:
+                        notify(user, "Hello")
+                    raise RuntimeError("rollback")
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        send_batch.assert_not_called()
+
+        # The next transaction starts a fresh batch instead of joining the discarded one
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            notify(self.users[0], "Hello again")
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(len(send_batch.call_args.args[0]), 1)
+
+    def test_video_call_extras_are_resolved_with_one_query(self, send_batch):
+        calls = [VideoCall.objects.create(requester=self.users[0], helper=user) for user in self.users[1:]]
+        notifications = [
+            Notification(user=user, message="Call started", notification_type="video_call_started") for user in self.users
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            # The INSERT and one SELECT of active calls, however many rows
+            with self.assertNumQueries(2):
+                create_notifications(notifications)
+        payloads = {
+            message["notification"]["id"]: message["notification"]["callId"]
+            for _, message in send_batch.call_args.args[0]
+        }
+        self.assertEqual(payloads, {
+            notifications[0].id: calls[1].id,
+            notifications[1].id: calls[0].id,
+            notifications[2].id: calls[1].id,
+        })
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+@mock.patch("projects.consumers.NOTIFICATION_BACKLOG_LIMIT", 3)
+class NotificationConsumerTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="user", email="user@example.com", password="pass", is_active=True)
+        self.notifications = Notification.objects.bulk_create([
+            Notification(user=self.user, message=f"Notification {i}", is_read=i < 2) for i in range(6)
+        ])
+
+    async def backlog(self, since=None):
+        query_params = {"since": str(since)} if since is not None else {}
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), "/ws/notifications/")
+        communicator.scope.update(user=self.user, query_params=query_params)
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        frame = await communicator.receive_json_from()
+        await communicator.disconnect()
+        self.assertEqual(frame["type"], "notification_backlog")
+        return frame
+
+    async def test_delta_returns_the_oldest_missed_rows_first(self):
+        ids = [notification.id for notification in self.notifications]
+        frame = await self.backlog(since=ids[0])
+        self.assertEqual([row["id"] for row in frame["notifications"]], ids[1:4])
+        self.assertTrue(frame["has_more"])
+
+        # Advancing the cursor to the last id received picks up the rest
+        frame = await self.backlog(since=frame["notifications"][-1]["id"])
+        self.assertEqual([row["id"] for row in frame["notifications"]], ids[4:])
+        self.assertFalse(frame["has_more"])
+
+        frame = await self.backlog(since=ids[-1])
+        self.assertEqual(frame["notifications"], [])
+        self.assertFalse(frame["has_more"])
+
+    async def test_first_connect_sends_unread_rows_and_the_unread_count(self):
+        frame = await self.backlog()
+        self.assertEqual(frame["unread_count"], 4)
+        self.assertTrue(all(not row["is_read"] for row in frame["notifications"]))
+        self.assertEqual(len(frame["notifications"]), 3)
+        self.assertTrue(frame["has_more"])
+
+        # An empty delta still reports the count
+        frame = await self.backlog(since=self.notifications[-1].id)
+        self.assertEqual(frame["unread_count"], 4)
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+@mock.patch("projects.consumers.CHAT_HISTORY_PAGE_SIZE", 3)
+class ChatHistoryTests(TestCase):
+    def setUp(self):
+        self.requester = CustomUser.objects.create_user(username="requester", email="requester@example.com", password="pass", is_active=True)
+        self.helper = CustomUser.objects.create_user(username="helper", email="helper@example.com", password="pass", is_active=True)
+        help_request = HelpRequest.objects.create(title="Request", description="Need help", created_by=self.requester)
+        self.chat = ChatSession.objects.create(help_request=help_request, requester=self.requester, helper=self.helper)
+        # Several messages share a timestamp, so paging has to break ties on id
+        now = timezone.now()
+        self.messages = [
+            ChatMessage.objects.create(
+                chat_session=self.chat,
+                sender=self.requester if i % 2 else self.helper,
+                content=f"Message {i}",
+                timestamp=now + timezone.timedelta(seconds=i // 3),
+            )
+            for i in range(7)
+        ]
+
+    async def connect(self, user):
+        communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), f"/ws/chat/{self.chat.id}/")
+        communicator.scope.update(user=user, url_route={"kwargs": {"chat_id": str(self.chat.id)}})
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        self.assertEqual(await communicator.receive_json_from(), {"message": "Connected to chat"})
+        return communicator
+
+    async def test_history_pages_back_to_the_first_message(self):
+        communicator = await self.connect(self.requester)
+        seen = []
+        frame = await communicator.receive_json_from()
+        while True:
+            self.assertEqual(frame["type"], "chat_history")
+            self.assertLessEqual(len(frame["messages"]), 3)
+            seen = [message["id"] for message in frame["messages"]] + seen
+            if not frame["has_more"]:
+                break
+            await communicator.send_json_to({"type": "load_history", "before": frame["before"]})
+            frame = await communicator.receive_json_from()
+        await communicator.disconnect()
+
+        self.assertEqual(seen, [message.id for message in self.messages])
+        self.assertEqual(frame["messages"][0]["sender"]["username"], "helper")
+
+    async def test_load_history_requires_a_message_id(self):
+        communicator = await self.connect(self.helper)
+        await communicator.receive_json_from()
+        await communicator.send_json_to({"type": "load_history", "before": "latest"})
+        self.assertIn("error", await communicator.receive_json_from())
+        await communicator.disconnect()
+
+    async def test_outsider_is_rejected(self):
+        outsider = await CustomUser.objects.acreate(username="outsider", email="outsider@example.com", is_active=True)
+        communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), f"/ws/chat/{self.chat.id}/")
+        communicator.scope.update(user=outsider, url_route={"kwargs": {"chat_id": str(self.chat.id)}})
+        connected, code = await communicator.connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, 4003)
+
+
+# Ids come from a counter instead of a PostgreSQL sequence; the timed flusher never fires on its own
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+@mock.patch.object(ChatWriteBuffer, "enabled", new_callable=mock.PropertyMock, return_value=True)
+@mock.patch("projects.chat_buffer.FLUSH_INTERVAL_MS", 60 * 1000)
+class ChatWriteBufferTests(TestCase):
+    def setUp(self):
+        self.requester = CustomUser.objects.create_user(username="requester", email="requester@example.com", password="pass", is_active=True)
+        self.helper = CustomUser.objects.create_user(username="helper", email="helper@example.com", password="pass", is_active=True)
+        help_request = HelpRequest.objects.create(title="Request", description="Need help", created_by=self.requester)
+        self.chat = ChatSession.objects.create(help_request=help_request, requester=self.requester, helper=self.helper)
+        self.buffer = ChatWriteBuffer()
+        ids = iter(range(1000, 2000))
+        for patcher in (
+            mock.patch.object(self.buffer, "_reserve_ids", side_effect=lambda count: [next(ids) for _ in range(count)]),
+            mock.patch("projects.consumers.chat_buffer", self.buffer),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        if self.buffer._flusher is not None:
+            self.buffer._flusher.cancel()
+
+    async def connect(self, user):
+        communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), f"/ws/chat/{self.chat.id}/")
+        communicator.scope.update(user=user, url_route={"kwargs": {"chat_id": str(self.chat.id)}})
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        await communicator.receive_json_from()
+        return communicator, await communicator.receive_json_from()
+
+    async def test_messages_are_broadcast_before_they_are_written(self, enabled):
+        requester, _ = await self.connect(self.requester)
+        await requester.send_json_to({"message": "Hello"})
+        echo = await requester.receive_json_from()
+        self.assertEqual((echo["id"], echo["content"]), (1000, "Hello"))
+        self.assertFalse(await ChatMessage.objects.filter(id=echo["id"]).aexists())
+        self.assertEqual(self.buffer.pending, 1)
+
+        # Replaying history writes the queue first, so a late joiner sees the message
+        helper, history = await self.connect(self.helper)
+        self.assertEqual([message["id"] for message in history["messages"]], [echo["id"]])
+        self.assertEqual(self.buffer.pending, 0)
+
+        await requester.send_json_to({"message": "Bye"})
+        echo = await requester.receive_json_from()
+        self.assertEqual((await helper.receive_json_from())["id"], echo["id"])
+        await requester.disconnect()
+        message = await ChatMessage.objects.aget(id=echo["id"])
+        self.assertEqual((message.content, message.sender_id, message.chat_session_id), ("Bye", self.requester.id, self.chat.id))
+        await helper.disconnect()
+        self.assertEqual(self.buffer.stats()["flushed"], 2)
+
+    async def test_failed_flush_is_retried_without_duplicates(self, enabled):
+        messages = [
+            await self.buffer.add(ChatMessage(chat_session_id=self.chat.id, sender=self.requester, content=f"Message {i}"))
+            for i in range(2)
+        ]
+        with mock.patch.object(ChatWriteBuffer, "_write", side_effect=OperationalError("connection lost")):
+            self.assertEqual(await self.buffer.flush(), 0)
+        stats = self.buffer.stats()
+        self.assertEqual((stats["pending"], stats["failed_flushes"], stats["flushed"]), (2, 1, 0))
+
+        # The failed attempt may have committed part of the batch before the error surfaced
+        await ChatMessage.objects.abulk_create([messages[0]])
+        self.assertEqual(await self.buffer.flush(), 2)
+        self.assertEqual(
+            [message async for message in ChatMessage.objects.order_by("id").values_list("id", flat=True)],
+            [message.id for message in messages],
+        )
+        self.assertEqual(self.buffer.pending, 0)
+
+
+def image_bytes(image_format, size=(8, 8)):
+    output = io.BytesIO()
+    Image.new("RGB", size, "red").save(output, image_format)
+    return output.getvalue()
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+@mock.patch("projects.chat_images.MAX_IMAGE_BYTES", 4096)
+class ChatImageUploadTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.requester = CustomUser.objects.create_user(username="requester", email="requester@example.com", password="pass", is_active=True)
+        self.helper = CustomUser.objects.create_user(username="helper", email="helper@example.com", password="pass", is_active=True)
+        help_request = HelpRequest.objects.create(title="Request", description="Need help", created_by=self.requester)
+        self.chat = ChatSession.objects.create(help_request=help_request, requester=self.requester, helper=self.helper)
+
+    async def connect(self):
+        communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), f"/ws/chat/{self.chat.id}/")
+        communicator.scope.update(user=self.requester, url_route={"kwargs": {"chat_id": str(self.chat.id)}})
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        await communicator.receive_json_from()
+        await communicator.receive_json_from()
+        return communicator
+
+    async def upload(self, communicator, data, size=None, chunk_size=1000):
+        await communicator.send_json_to({"type": "image_start", "size": len(data) if size is None else size})
+        for start in range(0, len(data), chunk_size):
+            await communicator.send_to(bytes_data=data[start:start + chunk_size])
+        await communicator.send_json_to({"type": "image_end"})
+        return await communicator.receive_json_from()
+
+    async def test_binary_upload_is_stored_under_its_sniffed_format(self):
+        communicator = await self.connect()
+        data = image_bytes("PNG", (40, 40))
+        frame = await self.upload(communicator, data, chunk_size=100)
+        await communicator.disconnect()
+
+        message = await ChatMessage.objects.aget(id=frame["id"])
+        self.assertTrue(message.image.name.endswith(".png"))
+        self.assertTrue(frame["image_url"].endswith(".png"))
+        with open(message.image.path, "rb") as f:
+            self.assertEqual(f.read(), data)
+
+    async def test_oversized_and_malformed_uploads_are_rejected(self):
+        communicator = await self.connect()
+        # Refused from the announced size, before any data is buffered
+        await communicator.send_json_to({"type": "image_start", "size": 4097})
+        self.assertIn("limited", (await communicator.receive_json_from())["error"])
+
+        # More data than announced
+        data = image_bytes("PNG")
+        await communicator.send_json_to({"type": "image_start", "size": len(data) - 1})
+        await communicator.send_to(bytes_data=data)
+        self.assertIn("declared size", (await communicator.receive_json_from())["error"])
+
+        frame = await self.upload(communicator, data, size=len(data) + 1)
+        self.assertIn("incomplete", frame["error"])
+
+        frame = await self.upload(communicator, b"not an image at all")
+        self.assertIn("not a readable image", frame["error"])
+
+        frame = await self.upload(communicator, image_bytes("BMP"))
+        self.assertIn("Unsupported image format", frame["error"])
+
+        await communicator.send_to(bytes_data=data)
+        self.assertIn("image_start", (await communicator.receive_json_from())["error"])
+
+        # Legacy base64 frames go through the same cap and sniffing
+        await communicator.send_json_to({"image": base64.b64encode(b"x" * 6000).decode()})
+        self.assertIn("limited", (await communicator.receive_json_from())["error"])
+        await communicator.send_json_to({"image": base64.b64encode(image_bytes("BMP")).decode()})
+        self.assertIn("Unsupported image format", (await communicator.receive_json_from())["error"])
+        await communicator.disconnect()
+
+        self.assertFalse(await ChatMessage.objects.aexists())
+
+    @mock.patch.object(dispatcher, "group_send")
+    def test_open_chat_is_told_when_renditions_are_ready(self, group_send):
+        message = ChatMessage(chat_session=self.chat, sender=self.requester)
+        message.image.save("photo.png", ContentFile(image_bytes("PNG", (2000, 1000))))
+        group_send.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Worker().run_burst()
+        message.refresh_from_db()
+        group, event = group_send.call_args.args
+        self.assertEqual(group, f"chat_{self.chat.id}")
+        self.assertEqual(event["type"], "chat_image_processed")
+        self.assertEqual(event["message"]["id"], message.id)
+        self.assertTrue(event["message"]["image_renditions"]["display"].endswith(message.image_renditions["display"]))
+        with Image.open(message.image.storage.path(message.image_renditions["display"])) as display:
+            self.assertEqual(display.size, (1280, 640))
+
+
+@mock.patch.object(dispatcher, "group_send")
+class SessionSweepTests(TestCase):
+    def setUp(self):
+        self.requester = CustomUser.objects.create_user(username="requester", email="requester@example.com", password="pass", is_active=True)
+        self.helper = CustomUser.objects.create_user(username="helper", email="helper@example.com", password="pass", is_active=True)
+        Credit.objects.create(user=self.requester, balance=10)
+        Credit.objects.create(user=self.helper, balance=0)
+        self.help_request = HelpRequest.objects.create(
+            title="Request", description="Need help", created_by=self.requester, credit_offer_chat=6, credit_offer_video=4
+        )
+
+    def balances(self):
+        return dict(Credit.objects.values_list("user__username", "balance"))
+
+    def ended_groups(self, group_send, prefix):
+        return sorted(call.args[0] for call in group_send.call_args_list if call.args[0].startswith(prefix))
+
+    def test_idle_chats_are_closed_and_settled(self, group_send):
+        self.assertIn("projects.tasks.close_idle_chats", PERIODIC)
+        long_ago = timezone.now() - CHAT_IDLE_TIMEOUT - timezone.timedelta(hours=1)
+        idle, unpaid, talking, fresh = [
+            ChatSession.objects.create(help_request=self.help_request, requester=self.requester, helper=self.helper)
+            for _ in range(4)
+        ]
+        ChatSession.objects.filter(pk__in=[idle.pk, unpaid.pk, talking.pk]).update(created_at=long_ago)
+        ChatMessage.objects.create(chat_session=talking, sender=self.helper, content="Still here")
+
+        # The second idle chat finds the requester unable to pay and closes unpaid
+        self.assertEqual(close_idle_chats(), 2)
+        active = dict(ChatSession.objects.values_list("id", "is_active"))
+        self.assertEqual(
+            [active[session.id] for session in (idle, unpaid, talking, fresh)], [False, False, True, True]
+        )
+        self.assertEqual(self.balances(), {"requester": 4, "helper": 6})
+        self.assertEqual(self.ended_groups(group_send, "chat_"), sorted([f"chat_{idle.id}", f"chat_{unpaid.id}"]))
+        self.assertEqual(
+            sorted(Notification.objects.filter(user=self.requester).values_list("message", flat=True)),
+            [
+                f"Your chat for 'Request' was closed after {CHAT_IDLE_TIMEOUT.total_seconds() / 3600:.0f} hours of inactivity. You spent {amount} credits."
+                for amount in (0, 6)
+            ],
+        )
+        self.assertEqual(close_idle_chats(), 0)
+
+    def test_stale_calls_are_ended_and_help_calls_settled(self, group_send):
+        self.assertIn("projects.tasks.end_stale_video_calls", PERIODIC)
+        category = Category.objects.create(name="Programming")
+        skill = SkillProfile.objects.create(user=self.helper, skill="Python", category=category, proficiency="expert", is_mentor=True)
+        mentorship = Mentorship.objects.create(learner=self.requester, mentor=self.helper, skill=skill, status="active")
+        help_call = VideoCall.objects.create(help_request=self.help_request, requester=self.requester, helper=self.helper)
+        mentorship_call = VideoCall.objects.create(mentorship=mentorship, requester=self.requester, helper=self.helper)
+        fresh = VideoCall.objects.create(help_request=self.help_request, requester=self.requester, helper=self.helper)
+        VideoCall.objects.filter(pk__in=[help_call.pk, mentorship_call.pk]).update(
+            started_at=timezone.now() - VIDEO_CALL_MAX_DURATION - timezone.timedelta(minutes=1)
+        )
+
+        self.assertEqual(end_stale_video_calls(), 2)
+        calls = {call.id: call for call in VideoCall.objects.all()}
+        self.assertFalse(calls[help_call.id].is_active)
+        self.assertIsNotNone(calls[help_call.id].ended_at)
+        self.assertFalse(calls[mentorship_call.id].is_active)
+        self.assertTrue(calls[fresh.id].is_active)
+        # Only the help-request call is paid for
+        self.assertEqual(self.balances(), {"requester": 6, "helper": 4})
+        self.assertEqual(
+            self.ended_groups(group_send, "video_call_"),
+            sorted([f"video_call_{help_call.id}", f"video_call_{mentorship_call.id}"]),
+        )
+        self.assertTrue(Notification.objects.filter(user=self.helper, message="Video call for mentorship 'Python' has ended.").exists())
+        self.assertEqual(end_stale_video_calls(), 0)
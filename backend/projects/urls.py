@@ -2,7 +2,7 @@ from django.urls import path
 from .views import (
     HelpRequestListCreateView, HelpRequestDetailView,
     HelpCommentListCreateView, HelpCommentDetailView,
-    toggle_upvote, CategoryListView, start_chat, end_chat, active_chats,
+    toggle_upvote, start_chat, end_chat, active_chats, chat_write_buffer_stats,
     StartVideoCall, EndVideoCall,
     StartMentorshipVideoCall, EndMentorshipVideoCall,
     NotificationViewSet
@@ -14,7 +14,6 @@ router.register(r'notifications', NotificationViewSet, basename='notification')
 
 urlpatterns = [
     path('active-chats/', active_chats, name='active-chats'),
-    path('categories/', CategoryListView.as_view(), name='category_list'),
     path('help-requests/', HelpRequestListCreateView.as_view(), name='help-request-list'),
     path('help-requests/<int:pk>/', HelpRequestDetailView.as_view(), name='help-request-detail'),
     path('help-requests/<int:request_id>/comments/', HelpCommentListCreateView.as_view(), name='help-comment-list'),
@@ -22,6 +21,7 @@ urlpatterns = [
     path('help-requests/<int:request_id>/comments/<int:comment_id>/toggle-upvote/', toggle_upvote, name='toggle-upvote'),
     path('help-requests/<int:request_id>/start-chat/', start_chat, name='start-chat'),
     path('chat/<int:chat_id>/end/', end_chat, name='end-chat'),
+    path('chat/write-buffer/', chat_write_buffer_stats, name='chat-write-buffer-stats'),
     path('start-video/<int:request_id>/', StartVideoCall.as_view(), name='start-video-call'),
     path('end-video/<int:call_id>/', EndVideoCall.as_view(), name='end-video-call'),
     path('mentorship-start-video/<int:mentorship_id>/', StartMentorshipVideoCall.as_view(), name='mentorship-start-video-call'),
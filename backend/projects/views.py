@@ -1,15 +1,16 @@
 from rest_framework import generics, permissions, status, viewsets
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated, IsAdminUser
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from search.filters import FullTextSearchFilter
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.db.models import Q, Count, Exists, OuterRef, Prefetch, Value, BooleanField
 from django.conf import settings
 from django.utils import timezone
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from django.db import transaction
+from django.http import Http404
 from .models import (
     HelpRequest,
     HelpComment,
@@ -20,14 +21,16 @@ from .models import (
 )
 from .serializers import (
     HelpRequestSerializer,
+    HelpRequestSummarySerializer,
     HelpCommentSerializer,
     ChatSessionSerializer,
-    NotificationSerializer,
-    CategorySerializer
+    NotificationSerializer
 )
-from api.models import Category
+from .notifications import dispatcher, notify, create_notifications
+from .chat_buffer import chat_buffer
 from api.serializers import UserSerializer
-from credits.models import CreditTransaction
+from api.votes import toggle_vote
+from credits.ledger import transfer, InsufficientCredits
 from skills.models import Mentorship
 
 import logging
@@ -35,22 +38,39 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-class CategoryListView(generics.ListAPIView):
-    queryset = Category.objects.all()
-    serializer_class = CategorySerializer
-    permission_classes = [IsAuthenticatedOrReadOnly]
+def annotate_comment_upvotes(queryset, user):
+    """Annotate `user_has_upvoted` on a HelpComment queryset with an EXISTS subquery."""
+    if not user.is_authenticated:
+        return queryset.annotate(user_has_upvoted=Value(False, output_field=BooleanField()))
+    return queryset.annotate(
+        user_has_upvoted=Exists(
+            HelpCommentUpvote.objects.filter(comment=OuterRef("pk"), user=user)
+        )
+    )
 
 
 class HelpRequestListCreateView(generics.ListCreateAPIView):
+    """
+    List help requests as compact summaries (no embedded comments) or create one.
+    Listing costs a single keyset-paginated SELECT joining the author and
+    category with an annotated comment count.
+    """
     serializer_class = HelpRequestSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [SearchFilter, OrderingFilter]
-    search_fields = ["title", "description"]
+    filter_backends = [OrderingFilter, FullTextSearchFilter]
+    search_kind = "help_request"
     ordering_fields = ["created_at"]
     ordering = ["-created_at"]
 
+    def get_serializer_class(self):
+        if self.request.method == "GET":
+            return HelpRequestSummarySerializer
+        return HelpRequestSerializer
+
     def get_queryset(self):
-        queryset = HelpRequest.objects.all()
+        queryset = HelpRequest.objects.select_related("created_by", "category").annotate(
+            comments_count=Count("comments")
+        )
         category_id = self.request.query_params.get("category")
         if category_id:
             queryset = queryset.filter(category__id=category_id)
@@ -61,10 +81,17 @@ class HelpRequestListCreateView(generics.ListCreateAPIView):
 
 
 class HelpRequestDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = HelpRequest.objects.all()
     serializer_class = HelpRequestSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    def get_queryset(self):
+        comments = annotate_comment_upvotes(
+            HelpComment.objects.select_related("user"), self.request.user
+        )
+        return HelpRequest.objects.select_related("created_by", "category").prefetch_related(
+            Prefetch("comments", queryset=comments)
+        )
+
 
 class HelpCommentListCreateView(generics.ListCreateAPIView):
     serializer_class = HelpCommentSerializer
@@ -72,9 +99,8 @@ class HelpCommentListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         request_id = self.kwargs.get("request_id")
-        return HelpComment.objects.filter(help_request_id=request_id).order_by(
-            "-created_at"
-        )
+        queryset = HelpComment.objects.filter(help_request_id=request_id).select_related("user")
+        return annotate_comment_upvotes(queryset, self.request.user).order_by("-created_at")
 
     def perform_create(self, serializer):
         request_id = self.kwargs.get("request_id")
@@ -91,16 +117,13 @@ class HelpCommentDetailView(generics.RetrieveUpdateDestroyAPIView):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def toggle_upvote(request, request_id, comment_id):
-    comment = get_object_or_404(HelpComment, help_request_id=request_id, id=comment_id)
-    upvote, created = HelpCommentUpvote.objects.get_or_create(
-        user=request.user, comment=comment
-    )
-    if not created:
-        upvote.delete()
-        comment.upvotes -= 1
-        comment.save(update_fields=["upvotes"])
-        return Response({"detail": "Upvote removed"}, status=status.HTTP_200_OK)
-    return Response({"detail": "Upvote added"}, status=status.HTTP_201_CREATED)
+    try:
+        added, upvotes = toggle_vote("help_comment", request.user, comment_id, help_request_id=request_id)
+    except HelpComment.DoesNotExist:
+        raise Http404
+    if not added:
+        return Response({"detail": "Upvote removed", "upvotes": upvotes}, status=status.HTTP_200_OK)
+    return Response({"detail": "Upvote added", "upvotes": upvotes}, status=status.HTTP_201_CREATED)
 
 
 @api_view(["POST"])
@@ -126,48 +149,63 @@ def start_chat(request, request_id):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def end_chat(request, chat_id):
-    chat_session = get_object_or_404(ChatSession, id=chat_id, is_active=True)
+    chat_session = get_object_or_404(
+        ChatSession.objects.select_related("requester", "helper", "help_request"),
+        id=chat_id,
+        is_active=True,
+    )
     if request.user not in [chat_session.requester, chat_session.helper]:
         return Response({"detail": "Unauthorized"}, status=status.HTTP_403_FORBIDDEN)
-    chat_session.is_active = False
-    chat_session.save()
-
-    credits = chat_session.help_request.credit_offer_chat  # Use help_request field
-    CreditTransaction.objects.create(
-        user=chat_session.requester,
-        amount=-credits,
-        description=f"Chat help for {chat_session.help_request.title}",
-    )
-    CreditTransaction.objects.create(
-        user=chat_session.helper,
-        amount=credits,
-        description=f"Earned from chat help on {chat_session.help_request.title}",
-    )
 
-    # Notify all participants via WebSocket
-    channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
-        f"chat_{chat_id}",
-        {
-            'type': 'chat_ended',
-            'message': {'status': 'chat_ended'}
-        }
-    )
+    credits_transferred = True
+    with transaction.atomic():
+        # Conditional update so only one of several concurrent "end" requests settles credits
+        if not ChatSession.objects.filter(id=chat_id, is_active=True).update(is_active=False):
+            return Response({"detail": "Chat already ended"}, status=status.HTTP_400_BAD_REQUEST)
+        chat_session.is_active = False
+
+        credits = chat_session.help_request.credit_offer_chat  # Use help_request field
+        try:
+            transfer(
+                chat_session.requester,
+                chat_session.helper,
+                credits,
+                f"Chat help for {chat_session.help_request.title}",
+                f"Earned from chat help on {chat_session.help_request.title}",
+            )
+        except InsufficientCredits:
+            logger.warning(f"Chat {chat_id} ended without payment: requester {chat_session.requester.username} has insufficient credits")
+            credits_transferred = False
+
+        # Notify all participants via WebSocket
+        dispatcher.group_send(
+            f"chat_{chat_id}",
+            {
+                'type': 'chat_ended',
+                'message': {'status': 'chat_ended'}
+            }
+        )
 
-    return Response({"detail": "Chat ended"}, status=status.HTTP_200_OK)
+    return Response({"detail": "Chat ended", "credits_transferred": credits_transferred}, status=status.HTTP_200_OK)
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def active_chats(request):
-    user = request.user
+    return Response(active_chat_list(request.user))
+
+
+def active_chat_list(user, limit=None):
     active_sessions = (
         ChatSession.objects.filter(is_active=True)
         .filter(Q(requester=user) | Q(helper=user))
         .select_related("requester", "helper", "help_request")
+        .order_by("-created_at")
     )
+    if limit is not None:
+        active_sessions = active_sessions[:limit]
 
-    data = [
+    return [
         {
             "id": session.id,
             "requester": UserSerializer(session.requester).data,
@@ -185,7 +223,12 @@ def active_chats(request):
         for session in active_sessions
     ]
 
-    return Response(data)
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def chat_write_buffer_stats(request):
+    """Write-behind queue depth and persistence lag of the process serving this request."""
+    return Response(chat_buffer.stats())
 
 
 class StartVideoCall(APIView):
@@ -207,11 +250,11 @@ class StartVideoCall(APIView):
 
             # Create notification for requester
             notification_message = f"{request.user.username} has started a video call for '{help_request.title}'"
-            Notification.objects.create(
-                user=help_request.created_by,
-                message=notification_message,
+            notify(
+                help_request.created_by,
+                notification_message,
                 notification_type="video_call_started",
-                link=None
+                callId=video_call.id
             )
             logger.info(f"Created Notification for user {help_request.created_by.username}")
 
@@ -227,45 +270,56 @@ class EndVideoCall(APIView):
 
     def post(self, request, call_id):
         try:
-            video_call = VideoCall.objects.get(id=call_id)
+            video_call = VideoCall.objects.select_related('requester', 'helper', 'help_request').get(id=call_id)
             if request.user not in [video_call.requester, video_call.helper]:
                 return Response({'error': 'Unauthorized'}, status=403)
             if not video_call.is_active:
                 return Response({'error': 'Call already ended'}, status=400)
             
-            # End the call
-            video_call.end_call()
-            
-            # Handle credit transactions
-            amount = video_call.help_request.credit_offer_video
-            requester_credits = video_call.requester.get_credits()
-            helper_credits = video_call.helper.get_credits()
-            requester_credits.spend_credits(amount, f"Video call completed for {video_call.help_request.title}")
-            helper_credits.add_credits(amount, f"Helped via video for {video_call.help_request.title}")
-            
-            # Create notifications for both users
-            Notification.objects.create(
-                user=video_call.requester,
-                message=f"Video call for '{video_call.help_request.title}' has ended. You spent {amount} credits.",
-                notification_type='success',
-                link=f"/help-requests/{video_call.help_request.id}"
-            )
-            Notification.objects.create(
-                user=video_call.helper,
-                message=f"Video call for '{video_call.help_request.title}' has ended. You earned {amount} credits.",
-                notification_type='success',
-                link=f"/help-requests/{video_call.help_request.id}"
-            )
-            
-            # Notify all participants via WebSocket
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                f"video_call_{call_id}",
-                {
-                    'type': 'call_ended',
-                    'message': {'status': 'call_ended'}
-                }
-            )
+            # Pushes queued inside the transaction go out together on commit
+            with transaction.atomic():
+                # End the call
+                if not video_call.end_call():
+                    return Response({'error': 'Call already ended'}, status=400)
+
+                # Handle credit transactions
+                amount = video_call.help_request.credit_offer_video
+                try:
+                    transfer(
+                        video_call.requester,
+                        video_call.helper,
+                        amount,
+                        f"Video call completed for {video_call.help_request.title}",
+                        f"Helped via video for {video_call.help_request.title}",
+                    )
+                except InsufficientCredits:
+                    logger.warning(f"Video call {call_id} ended without payment: requester {video_call.requester.username} has insufficient credits")
+                    amount = 0
+
+                # Create notifications for both users
+                create_notifications([
+                    Notification(
+                        user=video_call.requester,
+                        message=f"Video call for '{video_call.help_request.title}' has ended. You spent {amount} credits.",
+                        notification_type='success',
+                        link=f"/help-requests/{video_call.help_request.id}"
+                    ),
+                    Notification(
+                        user=video_call.helper,
+                        message=f"Video call for '{video_call.help_request.title}' has ended. You earned {amount} credits.",
+                        notification_type='success',
+                        link=f"/help-requests/{video_call.help_request.id}"
+                    ),
+                ])
+
+                # Notify all participants via WebSocket
+                dispatcher.group_send(
+                    f"video_call_{call_id}",
+                    {
+                        'type': 'call_ended',
+                        'message': {'status': 'call_ended'}
+                    }
+                )
             
             return Response({'status': 'Video call ended'})
         except VideoCall.DoesNotExist:
@@ -323,11 +377,12 @@ class StartMentorshipVideoCall(APIView):
 
             # Create notification for the other party (requester)
             notification_message = f"{initiator.username} has started a video call for your mentorship session on '{mentorship.skill.skill}'"
-            Notification.objects.create(
-                user=other_party, # Notify the requester
-                message=notification_message,
+            notify(
+                other_party, # Notify the requester
+                notification_message,
                 notification_type="video_call_started",
-                link=f"/mentorships/{mentorship_id}"
+                link=f"/mentorships/{mentorship_id}",
+                callId=video_call.id
             )
             logger.info(f"Created video start Notification for user {other_party.username}")
 
@@ -364,42 +419,47 @@ class EndMentorshipVideoCall(APIView):
                 logger.warning(f"Call {call_id} is already inactive. Returning 400.") # Changed log level to WARNING
                 return Response({'error': 'Call already ended'}, status=400)
 
-            # End the call
-            logger.info(f"Call {call_id} is active. Proceeding to end call.")
-            video_call.end_call()
-            logger.info(f"Call {call_id} marked as inactive in DB.")
-
-            mentorship = video_call.mentorship
-            other_party = video_call.helper if request.user == video_call.requester else video_call.requester
-
-            # Create notifications for both users
-            notification_message_self = f"Video call for mentorship '{mentorship.skill.skill}' has ended."
-            notification_message_other = f"Video call for mentorship '{mentorship.skill.skill}' was ended by {request.user.username}."
-
-            Notification.objects.create(
-                user=request.user,
-                message=notification_message_self,
-                notification_type='info',
-                link=f"/mentorships/{mentorship.id}"
-            )
-            Notification.objects.create(
-                user=other_party,
-                message=notification_message_other,
-                notification_type='info',
-                link=f"/mentorships/{mentorship.id}"
-            )
-            logger.info(f"Created call end notifications for mentorship {mentorship.id}")
-
-            # Notify participants via WebSocket
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                f"video_call_{call_id}",
-                {
-                    'type': 'call_ended',
-                    'message': {'status': 'call_ended'}
-                }
-            )
-            logger.info(f"Sent call_ended WS message for call {call_id}")
+            # Pushes queued inside the transaction go out together on commit
+            with transaction.atomic():
+                # End the call
+                logger.info(f"Call {call_id} is active. Proceeding to end call.")
+                if not video_call.end_call():
+                    logger.warning(f"Call {call_id} was ended concurrently. Returning 400.")
+                    return Response({'error': 'Call already ended'}, status=400)
+                logger.info(f"Call {call_id} marked as inactive in DB.")
+
+                mentorship = video_call.mentorship
+                other_party = video_call.helper if request.user == video_call.requester else video_call.requester
+
+                # Create notifications for both users
+                notification_message_self = f"Video call for mentorship '{mentorship.skill.skill}' has ended."
+                notification_message_other = f"Video call for mentorship '{mentorship.skill.skill}' was ended by {request.user.username}."
+
+                create_notifications([
+                    Notification(
+                        user=request.user,
+                        message=notification_message_self,
+                        notification_type='info',
+                        link=f"/mentorships/{mentorship.id}"
+                    ),
+                    Notification(
+                        user=other_party,
+                        message=notification_message_other,
+                        notification_type='info',
+                        link=f"/mentorships/{mentorship.id}"
+                    ),
+                ])
+                logger.info(f"Created call end notifications for mentorship {mentorship.id}")
+
+                # Notify participants via WebSocket
+                dispatcher.group_send(
+                    f"video_call_{call_id}",
+                    {
+                        'type': 'call_ended',
+                        'message': {'status': 'call_ended'}
+                    }
+                )
+                logger.info(f"Queued call_ended WS message for call {call_id}")
 
             logger.info(f"Successfully ended call {call_id}. Returning 200.")
             return Response({'status': 'Video call ended'})
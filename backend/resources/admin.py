@@ -1,5 +1,12 @@
 from django.contrib import admin
-from .models import Resource
+from .models import Resource, ResourceDailyStat
 
 # Register your models here.
-admin.site.register(Resource)
\ No newline at end of file
+admin.site.register(Resource)
+
+
+@admin.register(ResourceDailyStat)
+class ResourceDailyStatAdmin(admin.ModelAdmin):
+    list_display = ('resource', 'date', 'downloads', 'views')
+    list_filter = ('date',)
+    raw_id_fields = ('resource',)
@@ -0,0 +1,190 @@
+# resources/bundles.py
+import glob
+import hashlib
+import logging
+import os
+import re
+import tempfile
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+from .zipstream import stream_zip, resource_file_entries, CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_DIR = os.path.join(settings.MEDIA_ROOT, 'resource_bundles')
+
+# Disk budget for cached bundles; least recently served bundles are evicted first
+MAX_CACHE_BYTES = getattr(settings, 'RESOURCE_BUNDLE_CACHE_MAX_BYTES', 2 * 1024 ** 3)
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def bundle_key(resource_files):
+    """
+    Hash of the resource's file set. Stored file names are unique and never
+    rewritten in place, so any upload or removal yields a new key.
+    """
+    digest = hashlib.sha256()
+    for resource_file in sorted(resource_files, key=lambda f: f.id):
+        digest.update(f"{resource_file.id}:{resource_file.file.name}\n".encode())
+    return digest.hexdigest()[:32]
+
+
+def bundle_path(resource_id, key):
+    return os.path.join(BUNDLE_DIR, f"{resource_id}-{key}.zip")
+
+
+def invalidate_bundles(resource_id):
+    """Remove every cached bundle for a resource."""
+    for path in glob.glob(os.path.join(BUNDLE_DIR, f"{resource_id}-*.zip")):
+        try:
+            os.remove(path)
+            logger.info(f"Invalidated bundle {os.path.basename(path)}")
+        except FileNotFoundError:
+            pass
+
+
+def evict_bundles(max_bytes=MAX_CACHE_BYTES):
+    """Delete least recently used bundles until the cache fits in `max_bytes`."""
+    try:
+        entries = [entry for entry in os.scandir(BUNDLE_DIR) if entry.is_file() and entry.name.endswith('.zip')]
+    except FileNotFoundError:
+        return
+    stats = sorted(((entry.stat(), entry.path) for entry in entries), key=lambda item: item[0].st_mtime)
+    total = sum(stat.st_size for stat, _ in stats)
+    for stat, path in stats:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= stat.st_size
+            logger.info(f"Evicted bundle {os.path.basename(path)} ({stat.st_size} bytes)")
+        except FileNotFoundError:
+            pass
+
+
+def stream_and_cache(resource_id, resource_files, key):
+    """
+    Yield the ZIP for `resource_files` to the client while writing it to the
+    cache, so the first download of a file set starts as soon as the first
+    chunk is compressed. The file is written under a temporary name and only
+    renamed into place once the whole archive went out; a client that
+    disconnects early (or a full disk) leaves no partial bundle behind, and
+    a cache write error never interrupts the download itself.
+    """
+    path = bundle_path(resource_id, key)
+    out = tmp_path = None
+    try:
+        os.makedirs(BUNDLE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=BUNDLE_DIR, suffix='.part')
+        out = os.fdopen(fd, 'wb')
+    except OSError as e:
+        logger.error(f"Bundle cache unavailable for resource {resource_id}, streaming only: {str(e)}")
+
+    try:
+        for chunk in stream_zip(resource_file_entries(resource_files)):
+            if out is not None:
+                try:
+                    out.write(chunk)
+                except OSError as e:
+                    logger.error(f"Failed to cache bundle for resource {resource_id}: {str(e)}")
+                    out.close()
+                    out = None
+            yield chunk
+        if out is not None:
+            out.close()
+            out = None
+            os.replace(tmp_path, path)
+            tmp_path = None
+            logger.info(f"Built bundle {os.path.basename(path)} for resource {resource_id}")
+            evict_bundles()
+    finally:
+        if out is not None:
+            out.close()
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def get_bundle(resource_id, resource_files):
+    """Return (path, key) of the cached bundle; path is None when it has not been built yet."""
+    key = bundle_key(resource_files)
+    path = bundle_path(resource_id, key)
+    try:
+        os.utime(path)  # Mark as recently used for LRU eviction
+    except FileNotFoundError:
+        return None, key
+    except OSError as e:
+        logger.error(f"Bundle cache unavailable for resource {resource_id}: {str(e)}")
+        return None, key
+    return path, key
+
+
+def not_modified(request, key):
+    """A 304 when the client already holds this file set's bundle, else None."""
+    etag = f'"{key}"'
+    if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+    return None
+
+
+def _parse_range(header, size):
+    """Return (start, end) for a single satisfiable byte range, None to ignore the header, or False if unsatisfiable."""
+    match = RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    start, end = match.groups()
+    if start:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    else:
+        start = max(size - int(end), 0)
+        end = size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+def _read_range(f, start, length):
+    with f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_bundle(request, path, key, filename):
+    """Serve a cached bundle with ETag revalidation and single-range support."""
+    etag = f'"{key}"'
+    response = not_modified(request, key)
+    if response is not None:
+        return response
+
+    size = os.path.getsize(path)
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if range_header and request.headers.get('If-Range', etag) == etag:
+        byte_range = _parse_range(range_header, size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f"bytes */{size}"
+    elif byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(_read_range(open(path, 'rb'), start, end - start + 1), status=206, content_type='application/zip')
+        response['Content-Range'] = f"bytes {start}-{end}/{size}"
+        response['Content-Length'] = end - start + 1
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+    else:
+        # FileResponse lets the server use sendfile/wsgi.file_wrapper
+        response = FileResponse(open(path, 'rb'), as_attachment=True, filename=filename, content_type='application/zip')
+    response['ETag'] = etag
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,89 @@
+# resources/events.py
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import Resource, ResourceEvent
+
+logger = logging.getLogger(__name__)
+
+# Events are inserted in batches of this size, or after FLUSH_INTERVAL seconds, whichever comes first
+FLUSH_BATCH_SIZE = getattr(settings, 'RESOURCE_EVENT_BATCH_SIZE', 200)
+FLUSH_INTERVAL = getattr(settings, 'RESOURCE_EVENT_FLUSH_INTERVAL', 2.0)
+
+
+class ResourceEventBuffer:
+    """
+    Per-process buffer that turns download and view events into batched
+    INSERTs, so recording one costs the request nothing but a list append.
+
+    A background thread flushes every FLUSH_INTERVAL seconds and a full
+    buffer is flushed by the request that filled it; an atexit hook writes
+    whatever is left on shutdown. These are analytics rows: a process that
+    is killed outright loses at most one interval of them, and a flush that
+    fails is logged and dropped rather than retried forever.
+    """
+
+    def __init__(self):
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher = None
+
+    def record(self, resource_id, kind, user=None):
+        event = ResourceEvent(
+            resource_id=resource_id,
+            user_id=user.id if user is not None and user.is_authenticated else None,
+            kind=kind,
+            created_at=timezone.now(),
+        )
+        with self._lock:
+            self._pending.append(event)
+            full = len(self._pending) >= FLUSH_BATCH_SIZE
+        if FLUSH_INTERVAL <= 0 or full:
+            self.flush()
+        else:
+            self._ensure_flusher()
+
+    def flush(self):
+        """Insert every buffered event; returns how many were written."""
+        with self._flush_lock:
+            with self._lock:
+                events, self._pending = self._pending, []
+            if not events:
+                return 0
+            try:
+                # A resource deleted meanwhile would fail the whole batch on its foreign key
+                existing = set(
+                    Resource.objects.filter(pk__in={event.resource_id for event in events}).values_list('pk', flat=True)
+                )
+                events = [event for event in events if event.resource_id in existing]
+                ResourceEvent.objects.bulk_create(events)
+            except Exception as e:
+                logger.error(f"Failed to write {len(events)} resource events: {str(e)}")
+                return 0
+            return len(events)
+
+    def _ensure_flusher(self):
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(target=self._run_flusher, name='resource-events', daemon=True)
+            self._flusher.start()
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            close_old_connections()
+            self.flush()
+
+
+resource_events = ResourceEventBuffer()
+atexit.register(resource_events.flush)
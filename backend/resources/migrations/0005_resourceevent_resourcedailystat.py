@@ -0,0 +1,74 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("resources", "0004_alter_resource_created_at_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResourceEvent",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("kind", models.CharField(choices=[("download", "Download"), ("view", "View")], max_length=10)),
+                ("created_at", models.DateTimeField()),
+                ("aggregated", models.BooleanField(default=False)),
+                (
+                    "resource",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="events",
+                        to="resources.resource",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["resource", "created_at"], name="resources_r_resourc_5ddd35_idx"),
+                    models.Index(
+                        condition=models.Q(("aggregated", False)),
+                        fields=["id"],
+                        name="resources_event_pending_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ResourceDailyStat",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("downloads", models.PositiveIntegerField(default=0)),
+                ("views", models.PositiveIntegerField(default=0)),
+                (
+                    "resource",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="resources.resource",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("resource", "date"), name="unique_resource_daily_stat"),
+                ],
+            },
+        ),
+    ]
@@ -1,9 +1,13 @@
 from django.db import models
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from credits.models import CreditTransaction
+from credits.ledger import award_once
 from api.models import Category
+from api.votes import register_vote_kind
+from api.contributions import register_contribution_source
+from .bundles import invalidate_bundles
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,6 +30,23 @@ class Resource(models.Model):
     def __str__(self):
         return self.title
 
+    def as_contribution(self):
+        return {
+            'id': self.id,
+            'type': 'resource',
+            'title': self.title,
+            'description': self.description,
+            'upvotes': self.upvotes,
+            'download_count': self.download_count,
+            'created_at': self.created_at.isoformat()
+        }
+
+register_contribution_source(
+    'resource',
+    lambda user: Resource.objects.filter(uploaded_by=user),
+    Resource.as_contribution,
+)
+
 class ResourceFile(models.Model):
     resource = models.ForeignKey(Resource, on_delete=models.CASCADE, related_name="files")
     file = models.FileField(upload_to="resources/")
@@ -56,6 +77,43 @@ class ResourceDownload(models.Model):
             models.UniqueConstraint(fields=["user", "resource"], name="unique_download"),
         ]
 
+class ResourceEvent(models.Model):
+    """
+    Append-only log of every download and detail view. Rows are written in
+    batches by resources.events and rolled into ResourceDailyStat and
+    Resource.download_count by the aggregate_resource_events sweep.
+    """
+    DOWNLOAD = 'download'
+    VIEW = 'view'
+    KIND_CHOICES = [(DOWNLOAD, 'Download'), (VIEW, 'View')]
+
+    resource = models.ForeignKey(Resource, on_delete=models.CASCADE, related_name="events")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    created_at = models.DateTimeField()
+    aggregated = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['resource', 'created_at']),  # Per-resource traffic history
+            # The aggregation sweep's work queue
+            models.Index(fields=['id'], condition=models.Q(aggregated=False), name='resources_event_pending_idx'),
+        ]
+
+class ResourceDailyStat(models.Model):
+    resource = models.ForeignKey(Resource, on_delete=models.CASCADE, related_name="daily_stats")
+    date = models.DateField()
+    downloads = models.PositiveIntegerField(default=0)
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["resource", "date"], name="unique_resource_daily_stat"),
+        ]
+
+    def __str__(self):
+        return f"{self.resource_id} on {self.date}: {self.downloads} downloads, {self.views} views"
+
 @receiver(post_save, sender=ResourceDownload)
 def award_credits_on_download(sender, instance, created, **kwargs):
     if created:
@@ -63,19 +121,11 @@ def award_credits_on_download(sender, instance, created, **kwargs):
         user = resource.uploaded_by
         logger.info(f"Processing download of resource {resource.title} by user {instance.user.username}")
 
-        has_earned_credits = CreditTransaction.objects.filter(
-            user=user,
-            description=f"Earned 5 credits for first download of {resource.title}",
-        ).exists()
+        # download_count is rolled up from ResourceEvent by resources.tasks
+        if award_once(user, 5, f"Earned 5 credits for first download of {resource.title}", 'first_download', resource):
+            logger.info(f"Awarded 5 credits to {user.username} for first download of {resource.title}")
 
-        if not has_earned_credits:
-            logger.info(f"Awarding 5 credits to {user.username} for first download of {resource.title}")
-            resource.download_count += 1
-            resource.save()
-            user.get_credits().add_credits(5, f"Earned 5 credits for first download of {resource.title}")
-        else:
-            resource.download_count += 1
-            resource.save()
+register_vote_kind('resource', 'resources.ResourceVote', 'resource')
 
 @receiver(post_save, sender=ResourceVote)
 def award_credits_on_upvote(sender, instance, created, **kwargs):
@@ -84,16 +134,18 @@ def award_credits_on_upvote(sender, instance, created, **kwargs):
         user = resource.uploaded_by
         logger.info(f"Processing upvote on resource {resource.title} by user {instance.user.username}")
 
-        has_earned_credits = CreditTransaction.objects.filter(
-            user=user,
-            description=f"Earned 1 credit for first upvote on {resource.title}"
-        ).exists()
-
-        if not has_earned_credits:
-            logger.info(f"Awarding 1 credit to {user.username} for first upvote on {resource.title}")
-            resource.upvotes += 1
-            resource.save()
-            user.get_credits().add_credits(1, f"Earned 1 credit for first upvote on {resource.title}")
-        else:
-            resource.upvotes += 1
-            resource.save()
\ No newline at end of file
+        # The upvotes counter is maintained by api.votes.toggle_vote
+        if award_once(user, 1, f"Earned 1 credit for first upvote on {resource.title}", 'first_upvote', resource):
+            logger.info(f"Awarded 1 credit to {user.username} for first upvote on {resource.title}")
+
+@receiver(post_save, sender=ResourceFile)
+@receiver(post_delete, sender=ResourceFile)
+def invalidate_resource_bundles(sender, instance, **kwargs):
+    # Cached ZIPs are keyed on the file set, so any change makes them stale
+    resource_id = instance.resource_id
+    transaction.on_commit(lambda: invalidate_bundles(resource_id))
+
+@receiver(post_delete, sender=Resource)
+def remove_resource_bundles(sender, instance, **kwargs):
+    resource_id = instance.id
+    transaction.on_commit(lambda: invalidate_bundles(resource_id))
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from .models import Resource, ResourceVote, ResourceFile
 from api.models import Category
+from api.serializers import CategoryPrimaryKeyField
+from api.images import rendition_urls
 
 
 class ResourceFileSerializer(serializers.ModelSerializer):
@@ -17,16 +19,20 @@ class ResourceCategorySerializer(serializers.ModelSerializer):
 
 class ResourceSerializer(serializers.ModelSerializer):
     uploaded_by_username = serializers.ReadOnlyField(source="uploaded_by.username")
-    uploaded_by_profile = serializers.ImageField(
-        source="uploaded_by.profile_image", read_only=True
-    )
-    category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all())
+    uploaded_by_profile = serializers.SerializerMethodField()
+    category = CategoryPrimaryKeyField()
     category_detail = ResourceCategorySerializer(source="category", read_only=True)
     has_upvoted = serializers.SerializerMethodField()
     uploaded_by = serializers.PrimaryKeyRelatedField(read_only=True)  # Make read-only
     files = ResourceFileSerializer(many=True, read_only=True)  # Add files field
 
+    def get_uploaded_by_profile(self, obj):
+        return rendition_urls(obj.uploaded_by, "profile_image", self.context.get("request"))["avatar"]
+
     def get_has_upvoted(self, obj):
+        annotated = getattr(obj, "user_has_upvoted", None)
+        if annotated is not None:
+            return annotated
         user = self.context["request"].user
         return user.is_authenticated and obj.votes.filter(user=user).exists()
 
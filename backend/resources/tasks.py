@@ -0,0 +1,79 @@
+# resources/tasks.py
+import logging
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from jobs.scheduler import periodic, run_batches
+from .models import Resource, ResourceDailyStat, ResourceEvent
+
+logger = logging.getLogger(__name__)
+
+# Aggregated events are kept this long for ad-hoc analysis, then purged
+EVENT_RETENTION = timedelta(days=getattr(settings, 'RESOURCE_EVENT_RETENTION_DAYS', 90))
+
+
+def aggregate_event_batch(batch_size):
+    """
+    Roll one batch of new events into the daily stats and download counters.
+    Events are claimed with SKIP LOCKED and marked in the same transaction,
+    so each is counted exactly once even if two sweeps overlap.
+    """
+    with transaction.atomic():
+        events = list(
+            ResourceEvent.objects.select_for_update(skip_locked=True)
+            .filter(aggregated=False)
+            .order_by('id')
+            .values_list('id', 'resource_id', 'kind', 'created_at')[:batch_size]
+        )
+        if not events:
+            return 0
+
+        daily = Counter()
+        downloads = Counter()
+        for _, resource_id, kind, created_at in events:
+            daily[(resource_id, timezone.localdate(created_at), kind)] += 1
+            if kind == ResourceEvent.DOWNLOAD:
+                downloads[resource_id] += 1
+
+        keys = {(resource_id, date) for resource_id, date, _ in daily}
+        ResourceDailyStat.objects.bulk_create(
+            [ResourceDailyStat(resource_id=resource_id, date=date) for resource_id, date in keys],
+            ignore_conflicts=True,
+        )
+        stats = {
+            (stat.resource_id, stat.date): stat
+            for stat in ResourceDailyStat.objects.select_for_update()
+            .filter(resource_id__in={resource_id for resource_id, _ in keys}, date__in={date for _, date in keys})
+            .order_by('id')
+        }
+        for (resource_id, date, kind), count in daily.items():
+            stat = stats[(resource_id, date)]
+            if kind == ResourceEvent.DOWNLOAD:
+                stat.downloads += count
+            else:
+                stat.views += count
+        ResourceDailyStat.objects.bulk_update([stats[key] for key in keys], ['downloads', 'views'])
+
+        if downloads:
+            # One UPDATE touching only download_count, whatever the number of resources
+            Resource.objects.filter(pk__in=list(downloads)).update(download_count=F('download_count') + Case(
+                *[When(pk=resource_id, then=Value(count)) for resource_id, count in downloads.items()],
+                default=Value(0),
+                output_field=IntegerField(),
+            ))
+        ResourceEvent.objects.filter(pk__in=[event[0] for event in events]).update(aggregated=True)
+    return len(events)
+
+
+@periodic(getattr(settings, 'RESOURCE_EVENT_AGGREGATION_INTERVAL', 60))
+def aggregate_resource_events():
+    processed = run_batches(aggregate_event_batch)
+    deleted, _ = ResourceEvent.objects.filter(aggregated=True, created_at__lt=timezone.now() - EVENT_RETENTION).delete()
+    if processed or deleted:
+        logger.info(f"Aggregated {processed} resource events, purged {deleted}")
+    return processed
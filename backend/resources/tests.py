@@ -1,3 +1,277 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api import votes
+from api.models import CustomUser, Category
+from credits.models import CreditTransaction
+from .events import resource_events
+from .models import Resource, ResourceEvent, ResourceFile, ResourceVote
+
+
+class ResourceListQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Programming")
+        self.author = CustomUser.objects.create_user(username="author", email="author@example.com", password="pass", is_active=True)
+        self.voter = CustomUser.objects.create_user(username="voter", email="voter@example.com", password="pass", is_active=True)
+
+    def create_resources(self, count):
+        for i in range(count):
+            resource = Resource.objects.create(
+                title=f"Notes {i}", description="Lecture notes", category=self.category, uploaded_by=self.author
+            )
+            ResourceFile.objects.create(resource=resource, file=f"resources/notes_{i}.pdf", file_type="application")
+            if i % 2:
+                ResourceVote.objects.create(user=self.voter, resource=resource)
+
+    def test_list_query_count_does_not_grow_with_rows(self):
+        self.client.force_authenticate(self.voter)
+        self.create_resources(2)
+        # The page with authors, categories and upvote flags, then its files
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("resource-list"))
+        self.assertEqual(response.status_code, 200)
+
+        self.create_resources(10)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("resource-list"))
+        results = response.data["results"]
+        self.assertEqual(len(results), 12)
+        self.assertTrue(all(len(item["files"]) == 1 for item in results))
+        self.assertEqual(
+            {item["title"] for item in results if item["has_upvoted"]},
+            set(ResourceVote.objects.values_list("resource__title", flat=True)),
+        )
+
+    def test_anonymous_list_reports_no_upvotes(self):
+        self.create_resources(2)
+        response = self.client.get(reverse("resource-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any(item["has_upvoted"] for item in response.data["results"]))
+
+
+class ResourceVoteToggleTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        category = Category.objects.create(name="Programming")
+        self.author = CustomUser.objects.create_user(username="author", email="author@example.com", password="pass", is_active=True)
+        self.voter = CustomUser.objects.create_user(username="voter", email="voter@example.com", password="pass", is_active=True)
+        self.resource = Resource.objects.create(title="Notes", description="Lecture notes", category=category, uploaded_by=self.author)
+        self.client.force_authenticate(self.voter)
+
+    def toggle(self, resource_id=None):
+        return self.client.post(reverse("toggle-vote", args=[resource_id or self.resource.id]))
+
+    def test_toggle_adds_then_removes_and_returns_count(self):
+        response = self.toggle()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["upvotes"], 1)
+        self.resource.refresh_from_db()
+        self.assertEqual(self.resource.upvotes, 1)
+
+        response = self.toggle()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["upvotes"], 0)
+        self.assertFalse(ResourceVote.objects.exists())
+        self.resource.refresh_from_db()
+        self.assertEqual(self.resource.upvotes, 0)
+
+    def test_first_upvote_reward_is_paid_once(self):
+        self.toggle()
+        self.toggle()
+        self.toggle()
+        rewards = CreditTransaction.objects.filter(user=self.author, reward_event="first_upvote")
+        self.assertEqual(rewards.count(), 1)
+
+    def test_missing_resource_is_not_found(self):
+        response = self.toggle(resource_id=self.resource.id + 1)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(ResourceVote.objects.exists())
+
+
+class FakeRedis:
+    """The few Redis commands the vote buffer uses, kept in dicts."""
+
+    def __init__(self):
+        self.data = {}
+        self.fail_delete = False
+
+    def hincrby(self, key, field, amount):
+        fields = self.data.setdefault(key, {})
+        fields[str(field).encode()] = int(fields.get(str(field).encode(), 0)) + amount
+
+    def hget(self, key, field):
+        value = self.data.get(key, {}).get(str(field).encode())
+        return str(value).encode() if value is not None else None
+
+    def hgetall(self, key):
+        return {field: str(value).encode() for field, value in self.data.get(key, {}).items()}
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def rename(self, key, new_key):
+        self.data[new_key] = self.data.pop(key)
+
+    def set(self, key, value, nx=False, **kwargs):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def delete(self, *keys):
+        if self.fail_delete:
+            raise ConnectionError("Redis went away")
+        for key in keys:
+            self.data.pop(key, None)
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def lock(self, name, timeout=None, blocking=True):
+        return FakeLock(self, name)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class FakeLock:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def acquire(self):
+        return bool(self.client.set(self.name, "token", nx=True))
+
+    def release(self):
+        self.client.data.pop(self.name, None)
+
+
+@mock.patch("api.votes.BUFFERED_KINDS", {"resource"})
+class ResourceBufferedVoteTests(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        patcher = mock.patch("api.votes._redis", return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        category = Category.objects.create(name="Programming")
+        self.author = CustomUser.objects.create_user(username="author", email="author@example.com", password="pass", is_active=True)
+        self.voters = [
+            CustomUser.objects.create_user(username=f"voter{i}", email=f"voter{i}@example.com", password="pass", is_active=True)
+            for i in range(3)
+        ]
+        self.resource = Resource.objects.create(title="Notes", description="Lecture notes", category=category, uploaded_by=self.author)
+
+    def vote(self, voter):
+        self.client.force_authenticate(voter)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("toggle-vote", args=[self.resource.id]))
+        self.assertEqual(response.status_code, 200)
+        return response.data["upvotes"]
+
+    def test_votes_are_buffered_and_flushed_in_one_update(self):
+        self.assertEqual([self.vote(voter) for voter in self.voters], [1, 2, 3])
+        self.resource.refresh_from_db()
+        self.assertEqual(self.resource.upvotes, 0)
+
+        self.assertEqual(votes.flush_vote_counter("resource"), 1)
+        self.resource.refresh_from_db()
+        self.assertEqual(self.resource.upvotes, 3)
+        self.assertEqual(self.redis.data, {})
+        self.assertEqual(votes.flush_vote_counter("resource"), 0)
+
+    def test_a_batch_applied_before_a_failed_cleanup_is_not_applied_again(self):
+        for voter in self.voters:
+            self.vote(voter)
+        self.redis.fail_delete = True
+        with self.assertRaises(ConnectionError):
+            votes.flush_vote_counter("resource")
+        self.redis.fail_delete = False
+        self.resource.refresh_from_db()
+        self.assertEqual(self.resource.upvotes, 3)
+        self.assertIn("votes:pending:resource:flushing", self.redis.data)
+
+        self.redis.data.pop("votes:pending:resource:lock", None)
+        self.assertEqual(votes.flush_vote_counter("resource"), 0)
+        self.resource.refresh_from_db()
+        self.assertEqual(self.resource.upvotes, 3)
+        self.assertEqual(self.redis.data, {})
+
+    def test_a_held_lock_skips_the_flush(self):
+        self.vote(self.voters[0])
+        self.redis.set("votes:pending:resource:lock", "other", nx=True)
+        self.assertEqual(votes.flush_vote_counter("resource"), 0)
+        self.assertEqual(self.redis.data["votes:pending:resource:lock"], b"other")
+        self.resource.refresh_from_db()
+        self.assertEqual(self.resource.upvotes, 0)
+
+class ResourceDownloadTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        bundle_dir = mock.patch('resources.bundles.BUNDLE_DIR', os.path.join(self.media_root, 'resource_bundles'))
+        bundle_dir.start()
+        self.addCleanup(bundle_dir.stop)
+
+        self.client = APIClient()
+        category = Category.objects.create(name="Programming")
+        self.author = CustomUser.objects.create_user(username="author", email="author@example.com", password="pass", is_active=True)
+        self.resource = Resource.objects.create(title="Notes", description="Lecture notes", category=category, uploaded_by=self.author)
+        resource_file = ResourceFile(resource=self.resource, file_type="text")
+        resource_file.file.save("notes.txt", ContentFile(b"lecture notes " * 1000))
+        self.client.force_authenticate(self.author)
+        self.url = reverse("download-resource", args=[self.resource.id])
+
+    def test_first_download_streams_and_caches_the_bundle(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        streamed = b"".join(response.streaming_content)
+        # Published under its final name only once the stream completed
+        cached = os.listdir(os.path.join(self.media_root, 'resource_bundles'))
+        self.assertEqual(len(cached), 1)
+        self.assertTrue(cached[0].endswith('.zip'))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), streamed)
+        etag = response["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_only_full_downloads_are_counted(self):
+        with mock.patch.object(resource_events, 'record') as record:
+            b"".join(self.client.get(self.url).streaming_content)
+            etag = self.client.get(self.url)["ETag"]
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            self.assertEqual(self.client.get(self.url, HTTP_RANGE="bytes=100-").status_code, 206)
+            self.assertEqual(self.client.get(self.url, HTTP_RANGE="bytes=0-99").status_code, 206)
+        # Streamed first download, cached full download and the range starting at byte 0
+        self.assertEqual(
+            record.call_args_list,
+            [mock.call(self.resource.id, ResourceEvent.DOWNLOAD, mock.ANY)] * 3,
+        )
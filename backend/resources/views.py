@@ -2,18 +2,31 @@ from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from search.filters import FullTextSearchFilter
+from api import votes
 from django.shortcuts import get_object_or_404
-from .models import Resource, ResourceVote, ResourceDownload, ResourceFile
+from django.db.models import Exists, OuterRef, Value, BooleanField
+from .models import Resource, ResourceVote, ResourceDownload, ResourceFile, ResourceEvent
+from .events import resource_events
 from .serializers import ResourceSerializer
+from .bundles import get_bundle, not_modified, serve_bundle, stream_and_cache
 import logging
-import zipfile
-import io
-from django.http import StreamingHttpResponse
+from django.http import Http404, StreamingHttpResponse
 from urllib.parse import quote
 
 logger = logging.getLogger(__name__)
 
+
+def annotate_resource_votes(queryset, user):
+    """Annotate `user_has_upvoted` on a Resource queryset with an EXISTS subquery."""
+    if not user.is_authenticated:
+        return queryset.annotate(user_has_upvoted=Value(False, output_field=BooleanField()))
+    return queryset.annotate(
+        user_has_upvoted=Exists(ResourceVote.objects.filter(resource=OuterRef('pk'), user=user))
+    )
+
+
 class ResourceListCreateView(generics.ListCreateAPIView):
     """
     List all resources or create a new one.
@@ -21,14 +34,17 @@ class ResourceListCreateView(generics.ListCreateAPIView):
     """
     serializer_class = ResourceSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]  # Allow read for all, write for authenticated
-    filter_backends = [SearchFilter, OrderingFilter]
-    search_fields = ['title', 'description']
+    filter_backends = [OrderingFilter, FullTextSearchFilter]
+    search_kind = 'resource'
     ordering_fields = ['created_at', 'upvotes', 'download_count']  # Fields to sort by
     ordering = ['-created_at']
 
     def get_queryset(self):
         logger.info(f"Retrieving resources with filters: category={self.request.query_params.get('category')}, file_type={self.request.query_params.get('file_type')}")
-        queryset = Resource.objects.all()
+        queryset = annotate_resource_votes(
+            Resource.objects.select_related('uploaded_by', 'category').prefetch_related('files'),
+            self.request.user
+        )
         category_id = self.request.query_params.get('category')
         if category_id:
             queryset = queryset.filter(category_id=category_id)
@@ -58,28 +74,31 @@ class ResourceDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly]  # Read for all, write for authenticated
     lookup_field = 'id'
 
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        resource_events.record(response.data['id'], ResourceEvent.VIEW, request.user)
+        return response
+
 @api_view(['POST'])
 def toggle_vote(request, resource_id):
     """
     Toggle upvote for a resource.
     """
-    resource = get_object_or_404(Resource, id=resource_id)
     logger.info(f"User {request.user.username} toggling vote on resource {resource_id}")
-    vote, created = ResourceVote.objects.get_or_create(user=request.user, resource=resource)
-    if not created:  # If upvote exists, remove it
-        vote.delete()
-        resource.upvotes -= 1
-        resource.save()
-        message = "Upvote removed"
-    else:
-        message = "Upvote added"  # Increment handled by signal
-    return Response({"message": message, "upvotes": resource.upvotes}, status=status.HTTP_200_OK)
+    try:
+        added, upvotes = votes.toggle_vote('resource', request.user, resource_id)
+    except Resource.DoesNotExist:
+        raise Http404
+    message = "Upvote added" if added else "Upvote removed"
+    return Response({"message": message, "upvotes": upvotes}, status=status.HTTP_200_OK)
 
-@api_view(['POST'])
+@api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def download_resource(request, resource_id):
     """
     Download all files of a resource as a ZIP archive and record a single download event.
+    The first download of a file set is streamed while it is written to the bundle cache;
+    later ones are served from the cache with ETag and Range support.
     """
     resource = get_object_or_404(Resource, id=resource_id)
     logger.info(f"User {request.user.username} downloading resource {resource_id}")
@@ -88,33 +107,40 @@ def download_resource(request, resource_id):
     ResourceDownload.objects.get_or_create(user=request.user, resource=resource)
     
     # Get all files for the resource
-    files = resource.files.all()
+    files = list(resource.files.all())
     
     if not files:
         logger.warning(f"No files found for resource {resource_id}")
         return Response({"error": "No files available for this resource"}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Create an in-memory ZIP file
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        for resource_file in files:
-            # Read the file content
-            file_path = resource_file.file.path
-            file_name = resource_file.file.name.split('/')[-1]  # Extract filename
-            logger.info(f"Adding file {file_name} to zip for resource {resource_id}")
-            with open(file_path, 'rb') as f:
-                zip_file.writestr(file_name, f.read())
-    
-    buffer.seek(0)
-    
-    # Create a streaming response
+    response = bundle_response(request, resource, files)
+    # Revalidations (304) and resumed ranges are the same download; only count ones that start at byte 0
+    if response.status_code == 200 or (
+        response.status_code == 206 and response['Content-Range'].startswith('bytes 0-')
+    ):
+        resource_events.record(resource.id, ResourceEvent.DOWNLOAD, request.user)
+    return response
+
+
+def bundle_response(request, resource, files):
+    zip_filename = f"{resource.title}_files.zip"
+    path, key = get_bundle(resource.id, files)
+    response = not_modified(request, key)
+    if response is not None:
+        return response
+    if path is not None:
+        try:
+            return serve_bundle(request, path, key, zip_filename)
+        except FileNotFoundError:
+            # Evicted between lookup and open; stream and cache it again
+            pass
+
+    # Compress and send the archive incrementally, caching it on the way; nothing is buffered beyond one chunk
     response = StreamingHttpResponse(
-        buffer,
+        stream_and_cache(resource.id, files, key),
         content_type='application/zip'
     )
     # Safe filename for download
-    zip_filename = quote(f"{resource.title}_files.zip")
-    response['Content-Disposition'] = f'attachment; filename="{zip_filename}"'
-    response['Content-Length'] = buffer.getbuffer().nbytes
+    response['Content-Disposition'] = f'attachment; filename="{quote(zip_filename)}"'
     
-    return response
\ No newline at end of file
+    return response
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import SearchDocument
+
+
+@admin.register(SearchDocument)
+class SearchDocumentAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'object_id', 'title', 'created_at')
+    list_filter = ('kind',)
+    search_fields = ('title',)
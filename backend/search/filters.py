@@ -0,0 +1,43 @@
+# search/filters.py
+from django.db.models import Case, FloatField, OuterRef, Subquery, Value, When
+from rest_framework.filters import BaseFilterBackend
+
+from .index import search_documents, uses_postgres
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Drop-in replacement for SearchFilter backed by the search index.
+
+    The view declares `search_kind` (a key of search.index.SOURCES). Matching
+    rows are restricted through the indexed search documents instead of
+    ILIKE scans and annotated with `search_rank`. Unless the client asks for
+    an explicit `ordering`, results are ordered by rank, so this backend must
+    come after OrderingFilter in `filter_backends`.
+    """
+    search_param = 'search'
+    ordering_param = 'ordering'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+
+        documents = search_documents(query, [view.search_kind])
+        if uses_postgres():
+            queryset = queryset.filter(pk__in=Subquery(documents.values('object_id'))).annotate(
+                search_rank=Subquery(documents.filter(object_id=OuterRef('pk')).values('rank')[:1])
+            )
+        else:
+            ranks = {document.object_id: document.rank for document in documents}
+            queryset = queryset.filter(pk__in=list(ranks)).annotate(
+                search_rank=Case(
+                    *(When(pk=object_id, then=Value(rank)) for object_id, rank in ranks.items()),
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                )
+            )
+
+        if not request.query_params.get(self.ordering_param):
+            queryset = queryset.order_by('-search_rank', '-created_at')
+        return queryset
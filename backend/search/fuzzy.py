@@ -0,0 +1,112 @@
+# search/fuzzy.py
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Upper
+
+from .index import uses_postgres
+
+# Fallback matches beyond this many are dropped; the in-process path is for tests and development
+FALLBACK_LIMIT = 1000
+
+
+def trigrams(text):
+    """Trigram set of `text`, padded per word the way pg_trgm does it."""
+    grams = set()
+    for word in text.lower().split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NgramIndex:
+    """
+    In-process trigram index used when pg_trgm is not available. Mirrors the
+    PostgreSQL path: a value matches when it contains the query or its trigram
+    similarity reaches `threshold` (pg_trgm's default is 0.3).
+    """
+
+    def __init__(self, threshold=0.3):
+        self.threshold = threshold
+        self.postings = {}  # trigram -> set of keys
+        self.values = {}
+        self.sizes = {}
+
+    def add(self, key, value):
+        value = value or ''
+        self.values[key] = value
+        grams = trigrams(value)
+        self.sizes[key] = len(grams)
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(key)
+
+    def search(self, query):
+        """Return [(key, match_rank, similarity)] best first."""
+        query = query.lower()
+        query_grams = trigrams(query)
+        shared = {}
+        for gram in query_grams:
+            for key in self.postings.get(gram, ()):
+                shared[key] = shared.get(key, 0) + 1
+        results = []
+        for key, value in self.values.items():
+            lowered = value.lower()
+            common = shared.get(key, 0)
+            union = len(query_grams) + self.sizes[key] - common
+            similarity = common / union if union else 0.0
+            if query in lowered or similarity >= self.threshold:
+                results.append((key, match_rank(lowered, query), similarity))
+        results.sort(key=lambda item: (-item[1], -item[2], self.values[item[0]].lower(), item[0]))
+        return results
+
+
+def match_rank(value, query):
+    """3 for an exact match, 2 for a prefix, 1 for a substring, 0 for a fuzzy match."""
+    if value == query:
+        return 3
+    if value.startswith(query):
+        return 2
+    if query in value:
+        return 1
+    return 0
+
+
+def fuzzy_search(queryset, field, query):
+    """
+    Filter `queryset` to rows whose `field` matches `query` approximately and
+    order them exact > prefix > substring > fuzzy, then by trigram similarity.
+
+    On PostgreSQL the match runs against UPPER(field) so a GIN index with
+    gin_trgm_ops on that expression serves both the LIKE and the `%`
+    similarity operator. Elsewhere candidates are scored with an NgramIndex
+    and the ranking is applied with a CASE expression.
+    """
+    query = query.strip()
+    if not query:
+        return queryset
+
+    if uses_postgres():
+        key = query.upper()
+        return queryset.annotate(search_key=Upper(field)).filter(
+            Q(search_key__contains=key) | Q(search_key__trigram_similar=key)
+        ).annotate(
+            match_rank=Case(
+                When(search_key=key, then=Value(3)),
+                When(search_key__startswith=key, then=Value(2)),
+                When(search_key__contains=key, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+            similarity=TrigramSimilarity('search_key', key),
+        ).order_by('-match_rank', '-similarity', field, 'pk')
+
+    index = NgramIndex()
+    for pk, value in queryset.values_list('pk', field).iterator():
+        index.add(pk, value)
+    ranked = [pk for pk, _, _ in index.search(query)[:FALLBACK_LIMIT]]
+    return queryset.filter(pk__in=ranked).annotate(
+        match_rank=Case(
+            *(When(pk=pk, then=Value(position)) for position, pk in enumerate(ranked)),
+            default=Value(len(ranked)),
+            output_field=IntegerField(),
+        )
+    ).order_by('match_rank')
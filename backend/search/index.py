@@ -0,0 +1,158 @@
+# search/index.py
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F
+
+from .models import SearchDocument
+
+logger = logging.getLogger(__name__)
+
+# Text search configuration used for both the stored vectors and the queries
+SEARCH_CONFIG = getattr(settings, 'SEARCH_CONFIG', 'english')
+
+# Title matches outrank body matches (PostgreSQL weights A and B)
+DOCUMENT_VECTOR = (
+    SearchVector('title', weight='A', config=SEARCH_CONFIG)
+    + SearchVector('body', weight='B', config=SEARCH_CONFIG)
+)
+
+# Document kind -> (app_label.Model, title attribute, body attribute)
+SOURCES = {
+    'help_request': ('projects.HelpRequest', 'title', 'description'),
+    'discussion': ('discussions.Discussion', 'title', 'description'),
+    'resource': ('resources.Resource', 'title', 'description'),
+}
+
+
+def uses_postgres():
+    return connection.vendor == 'postgresql'
+
+
+def build_document(kind, instance):
+    """Return an unsaved SearchDocument for a source object."""
+    _, title_attr, body_attr = SOURCES[kind]
+    return SearchDocument(
+        kind=kind,
+        object_id=instance.pk,
+        title=getattr(instance, title_attr) or '',
+        body=getattr(instance, body_attr) or '',
+        created_at=instance.created_at,
+    )
+
+
+def index_object(kind, instance):
+    """
+    Create or refresh the search document for `instance`. Saves that do not
+    change the indexed text (e.g. counter updates) cost a single SELECT.
+    """
+    document = build_document(kind, instance)
+    existing = SearchDocument.objects.filter(kind=kind, object_id=document.object_id).only('id', 'title', 'body').first()
+    if existing is not None and (existing.title, existing.body) == (document.title, document.body):
+        return
+    if existing is None:
+        document.save()
+    else:
+        SearchDocument.objects.filter(pk=existing.pk).update(title=document.title, body=document.body)
+    if uses_postgres():
+        SearchDocument.objects.filter(kind=kind, object_id=document.object_id).update(search_vector=DOCUMENT_VECTOR)
+
+
+def remove_object(kind, object_id):
+    SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def refresh_vectors(queryset=None):
+    """Recompute stored vectors in one UPDATE (no-op outside PostgreSQL)."""
+    if not uses_postgres():
+        return 0
+    queryset = SearchDocument.objects.all() if queryset is None else queryset
+    return queryset.update(search_vector=DOCUMENT_VECTOR)
+
+
+STOP_WORDS = frozenset(
+    'a an and are as at be by for from has have how i in is it of on or that the this to was what with'.split()
+)
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class InvertedIndex:
+    """
+    Small in-memory inverted index used when the database has no full-text
+    support (SQLite in tests and local development). Every query term must
+    match; documents are ranked by TF-IDF with title terms weighted like
+    PostgreSQL's default A/B weights.
+    """
+    TITLE_WEIGHT = 1.0
+    BODY_WEIGHT = 0.4
+
+    def __init__(self):
+        self.postings = defaultdict(dict)  # term -> {doc key: weighted term frequency}
+        self.documents = {}
+
+    def add(self, document):
+        key = (document.kind, document.object_id)
+        self.documents[key] = document
+        weights = Counter()
+        for token in tokenize(document.title):
+            weights[token] += self.TITLE_WEIGHT
+        for token in tokenize(document.body):
+            weights[token] += self.BODY_WEIGHT
+        for token, weight in weights.items():
+            self.postings[token][key] = weight
+
+    def search(self, query):
+        """Return [(document, rank)] for documents matching every term, best first."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        postings = [self.postings.get(term, {}) for term in terms]
+        if not all(postings):
+            return []
+        keys = set.intersection(*(set(posting) for posting in postings))
+        total = len(self.documents)
+        scores = {
+            key: sum(posting[key] * math.log(1 + total / len(posting)) for posting in postings)
+            for key in keys
+        }
+        ranked = sorted(keys, key=lambda key: (-scores[key], -self.documents[key].created_at.timestamp()))
+        return [(self.documents[key], scores[key]) for key in ranked]
+
+
+def search_documents(query, kinds=None):
+    """
+    Rank search documents matching `query`.
+
+    On PostgreSQL this returns a lazy queryset annotated with `rank`, matched
+    through the GIN index on `search_vector`. Elsewhere it returns a list of
+    documents (each with a `rank` attribute) from an InvertedIndex built over
+    the candidate rows; that path is linear in the number of documents and is
+    only meant for tests and development.
+    """
+    documents = SearchDocument.objects.all()
+    if kinds:
+        documents = documents.filter(kind__in=kinds)
+
+    if uses_postgres():
+        search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+        return documents.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+        ).order_by('-rank', '-created_at', '-id')
+
+    inverted = InvertedIndex()
+    for document in documents.iterator():
+        inverted.add(document)
+    results = []
+    for document, rank in inverted.search(query):
+        document.rank = rank
+        results.append(document)
+    return results
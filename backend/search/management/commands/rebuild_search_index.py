@@ -0,0 +1,36 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from search.index import SOURCES, build_document, refresh_vectors
+from search.models import SearchDocument
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search documents for help requests, discussions and resources"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=list(SOURCES), help="Only rebuild one content type")
+
+    def handle(self, *args, **options):
+        kinds = [options['kind']] if options['kind'] else list(SOURCES)
+        for kind in kinds:
+            model_label, title_attr, body_attr = SOURCES[kind]
+            model = apps.get_model(model_label)
+            with transaction.atomic():
+                SearchDocument.objects.filter(kind=kind).delete()
+                batch = []
+                count = 0
+                for instance in model.objects.only('id', title_attr, body_attr, 'created_at').iterator(chunk_size=BATCH_SIZE):
+                    batch.append(build_document(kind, instance))
+                    if len(batch) >= BATCH_SIZE:
+                        SearchDocument.objects.bulk_create(batch)
+                        count += len(batch)
+                        batch = []
+                if batch:
+                    SearchDocument.objects.bulk_create(batch)
+                    count += len(batch)
+                refresh_vectors(SearchDocument.objects.filter(kind=kind))
+            self.stdout.write(self.style.SUCCESS(f"Indexed {count} {kind} documents"))
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:05
+
+from django.db import migrations
+
+SOURCES = (
+    ("help_request", "projects", "HelpRequest"),
+    ("discussion", "discussions", "Discussion"),
+    ("resource", "resources", "Resource"),
+)
+
+
+def backfill(apps, schema_editor):
+    SearchDocument = apps.get_model("search", "SearchDocument")
+    for kind, app_label, model_name in SOURCES:
+        model = apps.get_model(app_label, model_name)
+        SearchDocument.objects.bulk_create(
+            [
+                SearchDocument(
+                    kind=kind,
+                    object_id=row["id"],
+                    title=row["title"] or "",
+                    body=row["description"] or "",
+                    created_at=row["created_at"],
+                )
+                for row in model.objects.values("id", "title", "description", "created_at").iterator()
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "UPDATE search_searchdocument SET search_vector = "
+            "setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', body), 'B')"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0001_initial"),
+        ("projects", "0011_alter_chatmessage_mentorship_chat_session_id_and_more"),
+        ("discussions", "0001_initial"),
+        ("resources", "0004_alter_resource_created_at_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    Denormalized, searchable copy of a piece of content. One row per indexed
+    object, kept in sync by the signals in search/signals.py. On PostgreSQL
+    `search_vector` holds the weighted tsvector (title A, body B) behind a GIN
+    index; other databases use the in-process inverted index instead.
+    """
+    KIND_CHOICES = (
+        ('help_request', 'Help request'),
+        ('discussion', 'Discussion'),
+        ('resource', 'Resource'),
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    created_at = models.DateTimeField(db_index=True)
+    search_vector = SearchVectorField(null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_document'),
+        ]
+        # GIN index on search_vector (search_document_vector_gin) is created by
+        # migration 0001 on PostgreSQL only; see search.operations.PostgresOnlyAddIndex
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.title}"
@@ -0,0 +1,23 @@
+# search/operations.py
+from django.db import migrations
+
+
+class PostgresOnlyAddIndex(migrations.AddIndex):
+    """
+    AddIndex for PostgreSQL-specific index types (GIN, trigram). The index is
+    only created on PostgreSQL and never enters the migration state: SQLite
+    rebuilds a table from its state whenever a later migration alters it, and
+    would choke on the GIN definition. Models therefore must not list these
+    indexes in Meta.indexes (the autodetector would try to add them again).
+    """
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
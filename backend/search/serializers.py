@@ -0,0 +1,15 @@
+from rest_framework import serializers
+from .models import SearchDocument
+
+
+class SearchResultSerializer(serializers.ModelSerializer):
+    snippet = serializers.SerializerMethodField()
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = SearchDocument
+        fields = ['kind', 'object_id', 'title', 'snippet', 'created_at', 'rank']
+
+    def get_snippet(self, obj):
+        body = obj.body or ''
+        return body if len(body) <= 200 else f"{body[:200].rstrip()}…"
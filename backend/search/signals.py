@@ -0,0 +1,22 @@
+# search/signals.py
+from django.apps import apps
+from django.db.models.signals import post_save, post_delete
+
+from .index import SOURCES, index_object, remove_object
+
+
+def _connect(kind, model, title_attr, body_attr):
+    def reindex(sender, instance, update_fields=None, **kwargs):
+        if update_fields and not set(update_fields) & {title_attr, body_attr}:
+            return
+        index_object(kind, instance)
+
+    def unindex(sender, instance, **kwargs):
+        remove_object(kind, instance.pk)
+
+    post_save.connect(reindex, sender=model, weak=False, dispatch_uid=f'search_index_{kind}')
+    post_delete.connect(unindex, sender=model, weak=False, dispatch_uid=f'search_unindex_{kind}')
+
+
+for kind, (model_label, title_attr, body_attr) in SOURCES.items():
+    _connect(kind, apps.get_model(model_label), title_attr, body_attr)
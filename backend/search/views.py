@@ -0,0 +1,33 @@
+from rest_framework import generics
+from rest_framework.pagination import PageNumberPagination
+from .index import search_documents, SOURCES
+from .models import SearchDocument
+from .serializers import SearchResultSerializer
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SearchPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class SearchView(generics.ListAPIView):
+    """
+    Ranked search across help requests, discussions and resources.
+
+    GET /api/search/?q=<terms>[&kind=help_request,discussion,resource]
+    Results are mixed across content types and ordered by relevance.
+    """
+    serializer_class = SearchResultSerializer
+    pagination_class = SearchPagination
+
+    def get_queryset(self):
+        query = self.request.query_params.get("q", "").strip()
+        if not query:
+            return SearchDocument.objects.none()
+        kinds = [kind for kind in self.request.query_params.get("kind", "").split(",") if kind in SOURCES]
+        logger.info(f"Searching for '{query}' in {kinds or 'all kinds'}")
+        return search_documents(query, kinds)
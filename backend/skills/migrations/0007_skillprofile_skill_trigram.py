@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:00
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+import django.db.models.functions.text
+
+import search.operations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_customuser_username_trigram"),
+        ("skills", "0006_alter_mentorship_chat_session_id_and_more"),
+    ]
+
+    operations = [
+        search.operations.PostgresOnlyAddIndex(
+            model_name="skillprofile",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("skill"),
+                    name="gin_trgm_ops",
+                ),
+                name="skills_profile_skill_trgm",
+            ),
+        ),
+    ]
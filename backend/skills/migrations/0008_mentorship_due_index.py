@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("skills", "0007_skillprofile_skill_trigram"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="mentorship",
+            index=models.Index(
+                condition=models.Q(("status", "active")),
+                fields=["auto_complete_date"],
+                name="skills_mentorship_due_idx",
+            ),
+        ),
+    ]
@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from api.cache import cache
 from api.models import CustomUser
 from django.conf import settings
 import uuid
@@ -19,10 +22,16 @@ class SkillProfile(models.Model):
 
     class Meta:
         unique_together = ('user', 'skill', 'category')
+        # Trigram index for fuzzy skill search (search.fuzzy), skills_profile_skill_trgm, is
+        # created by migration 0007 on PostgreSQL only; see search.operations.PostgresOnlyAddIndex
 
     def __str__(self):
         return f"{self.user.username} - {self.skill} ({self.proficiency}) - {self.category.name}"
 
+@receiver([post_save, post_delete], sender=SkillProfile)
+def invalidate_skill_profile_cache(sender, instance, **kwargs):
+    cache.invalidate_on_commit('skill_profiles')
+
 class Mentorship(models.Model):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
@@ -47,6 +56,8 @@ class Mentorship(models.Model):
         indexes = [
             models.Index(fields=['learner', 'status']),  # For learner-specific mentorships
             models.Index(fields=['mentor', 'status']),   # For mentor-specific mentorships
+            # Auto-completion sweep (skills.tasks); only active rows are indexed
+            models.Index(fields=['auto_complete_date'], condition=models.Q(status='active'), name='skills_mentorship_due_idx'),
         ]
 
     def __str__(self):
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import SkillProfile, Mentorship
 from api.models import Category # Import Category
+from api.serializers import CategoryPrimaryKeyField, ImageRenditionsField
 
 User = get_user_model()
 
@@ -15,10 +16,7 @@ class SimpleCategorySerializer(serializers.ModelSerializer):
 class SkillProfileSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
     category_details = SimpleCategorySerializer(source='category', read_only=True)
-    category = serializers.PrimaryKeyRelatedField(
-        queryset=Category.objects.all(),
-        write_only=True
-    )
+    category = CategoryPrimaryKeyField(write_only=True)
     user = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(),  # Assume User is imported from get_user_model()
         write_only=True,
@@ -40,9 +38,11 @@ class SkillProfileSerializer(serializers.ModelSerializer):
 
 class SimpleUserSerializer(serializers.ModelSerializer):
     """Serializer for basic user info."""
+    profile_image_renditions = ImageRenditionsField('profile_image')
+
     class Meta:
         model = User
-        fields = ('id', 'username', 'profile_image')
+        fields = ('id', 'username', 'profile_image', 'profile_image_renditions')
 
 class SimpleSkillProfileSerializer(serializers.ModelSerializer):
     """Serializer for basic skill profile info."""
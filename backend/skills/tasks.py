@@ -0,0 +1,48 @@
+# skills/tasks.py
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from jobs.scheduler import periodic, run_batches
+from projects.models import Notification
+from projects.notifications import create_notifications, dispatcher
+from .models import Mentorship
+
+logger = logging.getLogger(__name__)
+
+
+def complete_due_mentorship_batch(batch_size):
+    """
+    Complete one batch of active mentorships past their auto_complete_date.
+    Credits were settled when the mentorship was accepted, and the mentor's
+    rating bonus needs a learner rating, so only notifications go out.
+    """
+    with transaction.atomic():
+        mentorships = list(
+            Mentorship.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(status='active', auto_complete_date__lte=timezone.now())
+            .select_related('learner', 'mentor', 'skill')
+            .order_by('auto_complete_date')[:batch_size]
+        )
+        if not mentorships:
+            return 0
+        Mentorship.objects.filter(pk__in=[mentorship.pk for mentorship in mentorships]).update(status='completed')
+
+        notifications = []
+        for mentorship in mentorships:
+            link = f"/mentorships/{mentorship.id}"
+            notifications += [
+                Notification(user=mentorship.learner, message=f"Your mentorship in {mentorship.skill.skill} with {mentorship.mentor.username} has been completed automatically.", notification_type='mentorship_completed', link=link),
+                Notification(user=mentorship.mentor, message=f"Your mentorship in {mentorship.skill.skill} with {mentorship.learner.username} has been completed automatically.", notification_type='mentorship_completed', link=link),
+            ]
+            # Mentorship chats only accept active mentorships; close any open socket
+            dispatcher.group_send(f"chat_{mentorship.chat_session_id}", {'type': 'chat_ended', 'message': {'status': 'chat_ended'}})
+        create_notifications(notifications)
+    logger.info(f"Auto-completed {len(mentorships)} mentorships")
+    return len(mentorships)
+
+
+@periodic(seconds=15 * 60)
+def complete_due_mentorships():
+    return run_batches(complete_due_mentorship_batch)
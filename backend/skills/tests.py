@@ -1,3 +1,81 @@
+from datetime import timedelta
+from unittest import mock
+
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import Category, CustomUser
+from jobs.scheduler import PERIODIC, run_batches
+from projects.models import Notification
+from projects.notifications import dispatcher
+from .models import Mentorship, SkillProfile
+from .tasks import complete_due_mentorship_batch, complete_due_mentorships
+
+
+class UserListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Programming")
+        self.user = CustomUser.objects.create_user(username="user", email="user@example.com", password="pass", is_active=True)
+        self.mentor = CustomUser.objects.create_user(username="mentor", email="mentor@example.com", password="pass", is_active=True)
+        self.client.force_authenticate(self.user)
+
+    def test_own_lists_are_returned_in_full(self):
+        # More rows than the default page size; the profile page shows them all
+        for i in range(25):
+            SkillProfile.objects.create(user=self.user, skill=f"Skill {i}", category=self.category, proficiency="beginner")
+            skill = SkillProfile.objects.create(
+                user=self.mentor, skill=f"Mentor skill {i}", category=self.category, proficiency="expert", is_mentor=True
+            )
+            Mentorship.objects.create(learner=self.user, mentor=self.mentor, skill=skill)
+
+        response = self.client.get(reverse("user-skill-profile-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 25)
+
+        response = self.client.get("/api/user/mentorships/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 25)
+
+
+@mock.patch.object(dispatcher, "group_send")
+class MentorshipAutoCompleteTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Programming")
+        self.mentor = CustomUser.objects.create_user(username="mentor", email="mentor@example.com", password="pass", is_active=True)
+        self.learners = [
+            CustomUser.objects.create_user(username=f"learner{i}", email=f"learner{i}@example.com", password="pass", is_active=True)
+            for i in range(5)
+        ]
+        self.skill = SkillProfile.objects.create(user=self.mentor, skill="Python", category=category, proficiency="expert", is_mentor=True)
+
+    def mentorship(self, learner, status, days):
+        return Mentorship.objects.create(
+            learner=learner, mentor=self.mentor, skill=self.skill, status=status,
+            auto_complete_date=timezone.now() + timedelta(days=days),
+        )
+
+    def test_due_mentorships_are_completed_in_batches(self, group_send):
+        due = [self.mentorship(learner, "active", -1) for learner in self.learners[:3]]
+        not_due = self.mentorship(self.learners[3], "active", 1)
+        pending = self.mentorship(self.learners[4], "pending", -1)
+        self.assertIn("skills.tasks.complete_due_mentorships", PERIODIC)
+
+        # Batches of two: a full one, then a short one that ends the run
+        batch = mock.Mock(wraps=complete_due_mentorship_batch)
+        self.assertEqual(run_batches(batch, batch_size=2), 3)
+        self.assertEqual(batch.call_count, 2)
+
+        statuses = dict(Mentorship.objects.values_list("id", "status"))
+        self.assertEqual([statuses[mentorship.id] for mentorship in due], ["completed"] * 3)
+        self.assertEqual((statuses[not_due.id], statuses[pending.id]), ("active", "pending"))
+        self.assertEqual(Notification.objects.filter(notification_type="mentorship_completed").count(), 6)
+        self.assertEqual(
+            sorted(call.args[0] for call in group_send.call_args_list if call.args[0].startswith("chat_")),
+            sorted(f"chat_{mentorship.chat_session_id}" for mentorship in due),
+        )
 
-# Create your tests here.
+        # Nothing left to do on the next run
+        self.assertEqual(complete_due_mentorships(), 0)
@@ -5,7 +5,7 @@ from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from .models import SkillProfile, Mentorship
 from .serializers import SkillProfileSerializer, MentorshipSerializer
 from api.models import CustomUser
-from credits.models import Credit
+from credits.ledger import record, InsufficientCredits
 from projects.models import Notification
 from django.utils import timezone
 from datetime import timedelta
@@ -14,25 +14,34 @@ from asgiref.sync import async_to_sync
 import json
 import logging
 from rest_framework import generics, permissions
+from search.fuzzy import fuzzy_search
+from api.cache import cache_response
 from django.db.models import Q
+from django.db import transaction
 
 logger = logging.getLogger(__name__)
 
 # --- Public Skill Profile Views ---
 
 class SkillProfileListView(generics.ListCreateAPIView):
-    """List public skill profiles, filterable by skill, mentor status, category."""
+    """
+    List public skill profiles, filterable by mentor status and category.
+    `skill` is a typo-tolerant search: results are ranked exact > prefix >
+    substring > similar instead of newest first.
+    """
     serializer_class = SkillProfileSerializer
     permission_classes = [permissions.AllowAny] # Allow anyone to browse
 
+    @cache_response('skill_profiles', ttl=60)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
     def get_queryset(self):
         queryset = SkillProfile.objects.select_related('user', 'category').all()
         skill = self.request.query_params.get('skill')
         is_mentor = self.request.query_params.get('is_mentor')
         category_id = self.request.query_params.get('category_id')
 
-        if skill:
-            queryset = queryset.filter(skill__icontains=skill)
         if is_mentor is not None:
             try:
                 is_mentor_bool = json.loads(is_mentor.lower())
@@ -48,7 +57,9 @@ class SkillProfileListView(generics.ListCreateAPIView):
                 logger.warning(f"Invalid integer value for category_id: {category_id}")
                 # Potentially return empty or ignore filter based on requirements
                 queryset = queryset.none()
-        
+
+        if skill:
+            return fuzzy_search(queryset, 'skill', skill)
         return queryset.order_by('-created_at')
 
 class SkillProfileDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -64,6 +75,7 @@ class UserSkillProfileListView(generics.ListCreateAPIView):
     """List and create skill profiles for the currently authenticated user."""
     serializer_class = SkillProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None  # A user's own profiles, shown in full on their profile page
 
     def get_queryset(self):
         """Only return profiles belonging to the requesting user."""
@@ -159,35 +171,35 @@ class MentorshipAcceptView(APIView):
         try:
             mentorship = Mentorship.objects.select_related('learner', 'skill').get(id=id, mentor=request.user, status='pending')
 
-            # Check learner credits BEFORE accepting
             learner = mentorship.learner
-            learner_credits = learner.get_credits()
-            if learner_credits.balance < 15:
-                logger.warning(f"Mentor {request.user.username} attempted to accept mentorship {id}, but learner {learner.username} has insufficient credits ({learner_credits.balance})")
+            try:
+                with transaction.atomic():
+                    # Flip the status first so a concurrent accept of the same request cannot charge twice
+                    auto_complete_date = timezone.now() + timedelta(days=30)
+                    if not Mentorship.objects.filter(id=id, status='pending').update(status='active', auto_complete_date=auto_complete_date):
+                        raise Mentorship.DoesNotExist
+                    mentorship.status = 'active'
+                    mentorship.auto_complete_date = auto_complete_date
+
+                    # Charge the learner and pay the mentor (optional, or adjust amount) in one ledger entry
+                    record([
+                        (learner, -15, f"Mentorship accepted by {request.user.username} for {mentorship.skill.skill}"),
+                        (request.user, 10, f"Accepted mentorship for {mentorship.skill.skill} with {learner.username}"),
+                    ])
+                    logger.info(f"Deducted 15 credits from learner {learner.username} and awarded 10 credits to mentor {request.user.username} for mentorship {id}")
+
+                    Notification.objects.create(
+                        user=learner,
+                        message=f"{request.user.username} accepted your mentorship request in {mentorship.skill.skill}",
+                        notification_type='mentorship_accepted',
+                        link=f"/mentorships/{mentorship.id}"
+                    )
+                    logger.info(f"Created mentorship accepted notification for learner {learner.username}")
+            except InsufficientCredits as e:
+                logger.warning(f"Mentor {request.user.username} attempted to accept mentorship {id}, but learner {learner.username} has insufficient credits ({e.balance})")
                 # Optionally notify mentor/learner about insufficient funds
                 return Response({"error": "Learner does not have enough credits (15 required)."}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Deduct credits from learner
-            learner_credits.spend_credits(15, f"Mentorship accepted by {request.user.username} for {mentorship.skill.skill}")
-            logger.info(f"Deducted 15 credits from learner {learner.username} for accepted mentorship {id}")
-
-            mentorship.status = 'active'
-            mentorship.auto_complete_date = timezone.now() + timedelta(days=30)
-            mentorship.save()
-
-            # Award credits to mentor (optional, or adjust amount)
-            mentor_credits = request.user.get_credits()
-            mentor_credits.add_credits(10, f"Accepted mentorship for {mentorship.skill.skill} with {mentorship.learner.username}")
-            logger.info(f"Awarded 10 credits to mentor {request.user.username} for accepting mentorship {mentorship.id}")
-
-            Notification.objects.create(
-                user=mentorship.learner,
-                message=f"{request.user.username} accepted your mentorship request in {mentorship.skill.skill}",
-                notification_type='mentorship_accepted',
-                link=f"/mentorships/{mentorship.id}"
-            )
-            logger.info(f"Created mentorship accepted notification for learner {mentorship.learner.username}")
-
             serializer = MentorshipSerializer(mentorship)
             return Response(serializer.data)
         except Mentorship.DoesNotExist:
@@ -286,6 +298,7 @@ class UserMentorshipsListView(generics.ListAPIView):
     """List mentorships where the requesting user is either the mentor or mentee."""
     serializer_class = MentorshipSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None  # A user's own mentorships, shown in full on their profile page
 
     def get_queryset(self):
         user = self.request.user
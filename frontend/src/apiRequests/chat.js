@@ -0,0 +1,14 @@
+// Images are sent as raw binary WebSocket frames: 33% smaller than base64 JSON,
+// and the server can enforce its size cap while the upload is still arriving.
+const IMAGE_CHUNK_SIZE = 64 * 1024;
+
+export const sendChatImage = async (ws, file) => {
+    ws.send(JSON.stringify({ type: "image_start", size: file.size }));
+    for (let offset = 0; offset < file.size; offset += IMAGE_CHUNK_SIZE) {
+        const chunk = await file.slice(offset, offset + IMAGE_CHUNK_SIZE).arrayBuffer();
+        if (ws.readyState !== WebSocket.OPEN) return false;
+        ws.send(chunk);
+    }
+    ws.send(JSON.stringify({ type: "image_end" }));
+    return true;
+};
@@ -1,4 +1,5 @@
 import api from "./api";
+import { getAllPages } from "./pagination";
 
 export const getCreditBalance = async (config = {}) => {
     try {
@@ -12,8 +13,8 @@ export const getCreditBalance = async (config = {}) => {
 
 export const getCreditTransactions = async (config = {}) => {
     try {
-        const response = await api.get("/api/credits/transactions/", config);
-        return response.data;
+        // The full history, following the cursor pages
+        return await getAllPages("/api/credits/transactions/?page_size=100", config);
     } catch (error) {
         console.error("Error fetching credit transactions:", error);
         return [];
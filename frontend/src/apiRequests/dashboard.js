@@ -0,0 +1,15 @@
+import api from "./api";
+
+// One round trip for several profile sections; see /api/me/dashboard/ for the section names
+export const getDashboard = async (include, config = {}) => {
+  try {
+    const response = await api.get("/api/me/dashboard/", {
+      ...config,
+      params: { include: include.join(",") },
+    });
+    return response.data;
+  } catch (error) {
+    console.error("Error fetching dashboard:", error);
+    throw error;
+  }
+};
@@ -1,4 +1,5 @@
 import api from "./api";
+import { getPage } from "./pagination";
 
 export const createDiscussion = async (title, description, categoryId) => {
   try {
@@ -12,22 +13,26 @@ export const createDiscussion = async (title, description, categoryId) => {
   }
 };
 
+// One page of discussions; pass the returned `next` as `url` for the following page
 export const getDiscussions = async (url = "/api/discussions/") => {
   try {
     console.log("Fetching discussions from:", url);
-    const response = await api.get(url);
-    console.log("Response received:", response.data);
-    return response.data.map((discussion) => ({
-      ...discussion,
-      posts_count: discussion.posts_count,
-      created_by: {
-        username: discussion.created_by_username,
-        profile: discussion.created_by_profile,
-      },
-    }));
+    const page = await getPage(url);
+    console.log("Response received:", page.results);
+    return {
+      next: page.next,
+      results: page.results.map((discussion) => ({
+        ...discussion,
+        posts_count: discussion.posts_count,
+        created_by: {
+          username: discussion.created_by_username,
+          profile: discussion.created_by_profile,
+        },
+      })),
+    };
   } catch (error) {
     console.error("Error fetching discussions:", error);
-    return [];
+    return { results: [], next: null };
   }
 };
 
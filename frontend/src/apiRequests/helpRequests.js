@@ -1,4 +1,5 @@
 import api from "./api";  // Assuming this is your axios instance from apiRequests/api.js
+import { getPage } from "./pagination";
 
 export const createHelpRequest = async (title, description, categoryId, creditOfferChat, creditOfferVideo) => {
     try {
@@ -18,21 +19,25 @@ export const createHelpRequest = async (title, description, categoryId, creditOf
     }
 };
 
+// One page of help requests; pass the returned `next` as `url` for the following page
 export const getHelpRequests = async (url = "/api/help-requests/") => {
     try {
         console.log("Fetching help requests from:", url);
-        const response = await api.get(url);
-        console.log("Response received:", response.data);
-        return response.data.map((request) => ({
-            ...request,
-            created_by: {
-                username: request.created_by.username,
-                profile: request.created_by.profile_image
-            },
-        }));
+        const page = await getPage(url);
+        console.log("Response received:", page.results);
+        return {
+            next: page.next,
+            results: page.results.map((request) => ({
+                ...request,
+                created_by: {
+                    username: request.created_by.username,
+                    profile: request.created_by.profile_image_renditions?.avatar ?? request.created_by.profile_image
+                },
+            })),
+        };
     } catch (error) {
         console.error("Error fetching help requests:", error.response?.data || error.message);
-        return [];
+        return { results: [], next: null };
     }
 };
 
@@ -45,7 +50,7 @@ export const getHelpRequestDetails = async (requestId) => {
             ...response.data,
             created_by: {
                 username: response.data.created_by.username,
-                profile: response.data.created_by.profile_image
+                profile: response.data.created_by.profile_image_renditions?.avatar ?? response.data.created_by.profile_image
             },
         };
     } catch (error) {
@@ -6,3 +6,5 @@ export * from "./contributions";
 export * from "./helpRequests";
 export * from "./mentorships";
 export * from './skills';
+export * from "./chat";
+export * from "./dashboard";
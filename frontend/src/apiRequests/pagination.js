@@ -0,0 +1,27 @@
+import api from "./api";
+
+// List endpoints are keyset-paginated: { next, previous, results }. Only the query
+// string of "next" (the cursor) is reused, so requests keep going through the API base URL.
+export const nextPageUrl = (url, next) =>
+  next ? `${url.split("?")[0]}${new URL(next).search}` : null;
+
+// One page of a list endpoint: its rows and the URL of the following page (or null)
+export const getPage = async (url, config = {}) => {
+  const response = await api.get(url, config);
+  if (Array.isArray(response.data)) {
+    return { results: response.data, next: null };
+  }
+  return { results: response.data.results, next: nextPageUrl(url, response.data.next) };
+};
+
+// Every row of a list endpoint, following "next" until the last page
+export const getAllPages = async (url, config = {}) => {
+  const rows = [];
+  let pageUrl = url;
+  while (pageUrl) {
+    const page = await getPage(pageUrl, config);
+    rows.push(...page.results);
+    pageUrl = page.next;
+  }
+  return rows;
+};
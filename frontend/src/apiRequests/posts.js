@@ -1,4 +1,5 @@
 import api from "./api";
+import { getPage } from "./pagination";
 
 export const createDiscussionPost = async (discussionId, content) => {
   try {
@@ -23,20 +24,24 @@ export const toggleUpvote = async (postId) => {
   }
 };
 
-export const getDiscussionPosts = async (discussionId) => {
+// One page of a thread's posts, newest first; pass the returned `next` to load older ones
+export const getDiscussionPosts = async (discussionId, url = `/api/discussions/${discussionId}/posts/`) => {
   try {
     console.log("Fetching discussion posts for discussion:", discussionId);
-    const response = await api.get(`/api/discussions/${discussionId}/posts/`);
-    console.log("Response received:", response.data);
-    return response.data.map((post) => ({
-      ...post,
-      user: {
-        username: post.user_username,
-        profile: post.user_profile
-          ? `${post.user_profile}`
-          : "https://avatar.iran.liara.run/public/4",
-      },
-    }));
+    const page = await getPage(url);
+    console.log("Response received:", page.results);
+    return {
+      next: page.next,
+      results: page.results.map((post) => ({
+        ...post,
+        user: {
+          username: post.user_username,
+          profile: post.user_profile
+            ? `${post.user_profile}`
+            : "https://avatar.iran.liara.run/public/4",
+        },
+      })),
+    };
   } catch (error) {
     console.error("Error fetching discussion posts:", error);
   }
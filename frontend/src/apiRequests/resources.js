@@ -1,23 +1,28 @@
 import api from "./api";
+import { getPage } from "./pagination";
 
 // Resources API calls (aligned with discussions)
+// One page of resources; pass the returned `next` as `url` for the following page
 export const getResources = async (url = "/api/resources/") => {
   try {
     console.log("Fetching resources from:", url);
-    const response = await api.get(url);
-    console.log("Response received:", response.data);
-    return response.data.map((resource) => ({
-      ...resource,
-      uploaded_by: {
-        username: resource.uploaded_by_username,
-        profile: resource.uploaded_by_profile
-          ? `${import.meta.env.VITE_API_URL}${resource.uploaded_by_profile}`
-          : "https://avatar.iran.liara.run/public/4",
-      },
-    }));
+    const page = await getPage(url);
+    console.log("Response received:", page.results);
+    return {
+      next: page.next,
+      results: page.results.map((resource) => ({
+        ...resource,
+        uploaded_by: {
+          username: resource.uploaded_by_username,
+          profile: resource.uploaded_by_profile
+            ? `${import.meta.env.VITE_API_URL}${resource.uploaded_by_profile}`
+            : "https://avatar.iran.liara.run/public/4",
+        },
+      })),
+    };
   } catch (error) {
     console.error("Error fetching resources:", error);
-    return [];
+    return { results: [], next: null };
   }
 };
 
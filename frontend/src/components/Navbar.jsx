@@ -3,7 +3,7 @@ import { Link, useNavigate, NavLink } from 'react-router-dom';
 import { useSelector, useDispatch } from 'react-redux';
 import { FaComments, FaFolderOpen, FaHandsHelping, FaBell, FaUserCircle, FaSignOutAlt, FaBook } from 'react-icons/fa';
 import { logoutUser } from '../redux/authSlice';
-import { addNotification, fetchNotifications, markNotificationAsRead, markAllAsRead, clearNotifications } from '../redux/notificationSlice';
+import { addNotification, mergeNotifications, fetchNotifications, fetchMoreNotifications, markNotificationAsRead, markAllAsRead } from '../redux/notificationSlice';
 import { Button, Badge, Dropdown, Spinner } from 'react-bootstrap';
 import VideoCall from './VideoCall';
 import { ACCESS_TOKEN } from '../constants';
@@ -11,10 +11,11 @@ import './Navbar.css';
 
 const Navbar = () => {
   const { user, isAuthenticated } = useSelector((state) => state.auth);
-  const { notifications = [], status } = useSelector((state) => state.notifications);
+  const { notifications = [], next, status } = useSelector((state) => state.notifications);
   const dispatch = useDispatch();
   const navigate = useNavigate();
   const wsRef = useRef(null);
+  const lastSeenIdRef = useRef(null);
   const [pendingCallId, setPendingCallId] = useState(null);
   const [activeCallId, setActiveCallId] = useState(null);
   const [showUnreadOnly, setShowUnreadOnly] = useState(true);
@@ -45,18 +46,39 @@ const Navbar = () => {
           return;
         }
 
-        const websocket = new WebSocket(`wss://elevatehub-proxy.mijuzz007.workers.dev/api/ws/notifications/?token=${encodeURIComponent(token)}`);
+        let wsUrl = `wss://elevatehub-proxy.mijuzz007.workers.dev/api/ws/notifications/?token=${encodeURIComponent(token)}`;
+        if (lastSeenIdRef.current) {
+          wsUrl += `&since=${lastSeenIdRef.current}`;
+        }
+        const websocket = new WebSocket(wsUrl);
 
         websocket.onopen = () => {
           console.log("Notification WebSocket connected");
-          dispatch(clearNotifications());
         };
 
         websocket.onmessage = (e) => {
           try {
             console.log("Received WebSocket message:", e.data);
             const data = JSON.parse(e.data);
-            if (data.type === 'notification') {
+            if (data.type === 'notification_backlog') {
+              dispatch(mergeNotifications(data.notifications));
+              const ids = data.notifications.map((n) => n.id);
+              if (ids.length) {
+                lastSeenIdRef.current = Math.max(lastSeenIdRef.current || 0, ...ids);
+              }
+              if (data.has_more) {
+                // More was missed than one delta carries; reload the newest page over REST
+                dispatch(fetchNotifications()).unwrap().then((page) => {
+                  const pageIds = page.results.map((n) => n.id);
+                  if (pageIds.length) {
+                    lastSeenIdRef.current = Math.max(lastSeenIdRef.current || 0, ...pageIds);
+                  }
+                }).catch(() => {});
+              }
+            } else if (data.type === 'notification') {
+              if (data.notification.id) {
+                lastSeenIdRef.current = Math.max(lastSeenIdRef.current || 0, data.notification.id);
+              }
               console.log("Processing notification:", data.notification);
               dispatch(addNotification(data.notification));
               if (data.notification.notification_type === 'video_call_started') {
@@ -281,6 +303,21 @@ const Navbar = () => {
                         No {showUnreadOnly ? 'unread' : ''} notifications
                       </div>
                     )}
+                    {status !== 'loading' && next && (
+                      <div className="text-center mt-2">
+                        <Button
+                          variant="link"
+                          size="sm"
+                          onClick={(e) => {
+                            e.stopPropagation();
+                            dispatch(fetchMoreNotifications());
+                          }}
+                          className="text-decoration-none"
+                        >
+                          Load older notifications
+                        </Button>
+                      </div>
+                    )}
                   </Dropdown.Menu>
                 </Dropdown>
               </li>
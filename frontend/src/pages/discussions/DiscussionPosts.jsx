@@ -9,6 +9,8 @@ function DiscussionPosts() {
   const { discussionId } = useParams();
   const [discussion, setDiscussion] = useState(null);
   const [posts, setPosts] = useState([]);
+  const [postsNext, setPostsNext] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
   const dispatch = useDispatch();
@@ -24,7 +26,8 @@ function DiscussionPosts() {
           getDiscussionPosts(discussionId),
         ]);
         setDiscussion(discussionData);
-        setPosts(postsData);
+        setPosts(postsData?.results ?? []);
+        setPostsNext(postsData?.next ?? null);
       } catch (err) {
         setError("Failed to load discussion or posts. Please try again.");
       } finally {
@@ -34,6 +37,19 @@ function DiscussionPosts() {
     fetchData();
   }, [discussionId]);
 
+  const loadOlderPosts = async () => {
+    if (!postsNext) return;
+    setLoadingMore(true);
+    const page = await getDiscussionPosts(discussionId, postsNext);
+    if (page) {
+      setPosts((current) => [...current, ...page.results]);
+      setPostsNext(page.next);
+    } else {
+      setError("Failed to load older posts. Please try again.");
+    }
+    setLoadingMore(false);
+  };
+
   const handleUpvoteToggle = async (postId) => {
     try {
       const updatedPost = await toggleUpvote(postId);
@@ -181,6 +197,17 @@ function DiscussionPosts() {
                 </div>
               </div>
             ))}
+            {postsNext && (
+              <div className="col-12 text-center">
+                <button
+                  onClick={loadOlderPosts}
+                  className="btn btn-outline-primary rounded-3"
+                  disabled={loadingMore}
+                >
+                  {loadingMore ? "Loading..." : "Load older posts"}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -8,6 +8,8 @@ import { FaCommentAlt } from "react-icons/fa";
 
 function Discussions() {
   const [discussions, setDiscussions] = useState([]);
+  const [next, setNext] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [filter, setFilter] = useState({ search: "", sort: "-created_at" });
   const [selectedCategory, setSelectedCategory] = useState("");
   const user = useSelector((state) => state.auth.user);
@@ -24,17 +26,28 @@ function Discussions() {
       if (params.toString()) url += `?${params.toString()}`;
 
       try {
-        const response = await getDiscussions(url);  // Pass custom URL
-        setDiscussions(response || []);
+        const page = await getDiscussions(url);  // Pass custom URL
+        setDiscussions(page.results);
+        setNext(page.next);
       } catch (error) {
         console.error("Error fetching filtered discussions:", error);
         setDiscussions([]);
+        setNext(null);
       }
     };
 
     fetchDiscussions();
   }, [selectedCategory, filter.search, filter.sort]);
 
+  const loadMore = async () => {
+    if (!next) return;
+    setLoadingMore(true);
+    const page = await getDiscussions(next);
+    setDiscussions((current) => [...current, ...page.results]);
+    setNext(page.next);
+    setLoadingMore(false);
+  };
+
   return (
     <>
       <Navbar />
@@ -64,7 +77,7 @@ function Discussions() {
             >
               <option value="-created_at">Newest First</option>
               <option value="created_at">Oldest First</option>
-              <option value="posts">Most Active (Posts)</option>
+              <option value="-posts">Most Active (Posts)</option>
             </select>
           </div>
           <div className="col-md-3 text-md-end mb-3">
@@ -122,6 +135,14 @@ function Discussions() {
             </div>
           ))}
         </div>
+
+        {next && (
+          <div className="text-center mb-4">
+            <button className="btn btn-outline-primary" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? "Loading..." : "Load more"}
+            </button>
+          </div>
+        )}
       </div>
     </>
   );
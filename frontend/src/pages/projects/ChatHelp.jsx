@@ -2,6 +2,7 @@ import React, { useState, useEffect, useRef } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import { useSelector } from "react-redux";
 import { endChat } from "../../apiRequests/helpRequests";
+import { sendChatImage } from "../../apiRequests/chat";
 import Navbar from "../../components/Navbar";
 import { Alert, Button } from "react-bootstrap";
 
@@ -15,6 +16,7 @@ const ChatHelp = () => {
   const [isConnecting, setIsConnecting] = useState(true);
   const [error, setError] = useState(null);
   const [isChatEnded, setIsChatEnded] = useState(false);
+  const [historyCursor, setHistoryCursor] = useState(null);
   const navigate = useNavigate();
   const messagesEndRef = useRef(null);
 
@@ -45,6 +47,20 @@ const ChatHelp = () => {
           setIsChatEnded(true);
           return;
         }
+        if (data.type === 'chat_history') {
+          setMessages((prev) => {
+            const older = data.messages.filter((msg) => !prev.some((m) => m.id === msg.id));
+            return [...older, ...prev];
+          });
+          setHistoryCursor(data.has_more ? data.before : null);
+          return;
+        }
+        if (data.type === "image_processed") {
+          setMessages((prev) => prev.map((msg) => (
+            msg.id === data.id ? { ...msg, image_renditions: data.image_renditions } : msg
+          )));
+          return;
+        }
         if (data.content || data.image_url) {
           setMessages((prev) => {
             if (prev.some((msg) => msg.id === data.id)) return prev;
@@ -73,6 +89,7 @@ const ChatHelp = () => {
     setIsConnecting(true);
     setError(null);
     setMessages([]);
+    setHistoryCursor(null);
     setIsChatEnded(false);
     
     const websocket = connectWebSocket();
@@ -92,15 +109,16 @@ const ChatHelp = () => {
     }
   };
 
-  const sendImage = () => {
+  const loadOlderMessages = () => {
+    if (ws && ws.readyState === WebSocket.OPEN && historyCursor) {
+      ws.send(JSON.stringify({ type: "load_history", before: historyCursor }));
+    }
+  };
+
+  const sendImage = async () => {
     if (ws && ws.readyState === WebSocket.OPEN && image) {
-      const reader = new FileReader();
-      reader.onload = () => {
-        const base64Image = reader.result.split(",")[1];
-        ws.send(JSON.stringify({ image: base64Image }));
-        setImage(null);
-      };
-      reader.readAsDataURL(image);
+      await sendChatImage(ws, image);
+      setImage(null);
     }
   };
 
@@ -179,6 +197,13 @@ const ChatHelp = () => {
               style={{ height: "500px", overflowY: "auto" }}
             >
               <div className="card-body p-4">
+                {historyCursor && (
+                  <div className="text-center mb-3">
+                    <Button variant="link" size="sm" onClick={loadOlderMessages}>
+                      Load older messages
+                    </Button>
+                  </div>
+                )}
                 {messages.length === 0 ? (
                   <p className="text-muted text-center fs-5">No messages yet.</p>
                 ) : (
@@ -202,7 +227,7 @@ const ChatHelp = () => {
                         {msg.content && <p className="mb-1">{msg.content}</p>}
                         {msg.image_url && (
                           <img
-                            src={msg.image_url}
+                            src={msg.image_renditions?.display ?? msg.image_url}
                             alt="Chat image"
                             className="chat-image mt-2 d-block"
                           />
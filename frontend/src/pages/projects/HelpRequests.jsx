@@ -12,6 +12,8 @@ import "react-toastify/dist/ReactToastify.css";
 const HelpRequests = () => {
   const { user, isAuthenticated } = useSelector((state) => state.auth);
   const [requests, setRequests] = useState([]);
+  const [next, setNext] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [categories, setCategories] = useState([]);
   const [formData, setFormData] = useState({
     title: "",
@@ -36,13 +38,23 @@ const HelpRequests = () => {
         getHelpRequests(url),
         fetchCategories(),
       ]);
-      setRequests(requestsData);
+      setRequests(requestsData.results);
+      setNext(requestsData.next);
       setCategories(categoriesData);
       setLoading(false);
     };
     fetchData();
   }, [selectedCategory]);
 
+  const loadMore = async () => {
+    if (!next) return;
+    setLoadingMore(true);
+    const page = await getHelpRequests(next);
+    setRequests((current) => [...current, ...page.results]);
+    setNext(page.next);
+    setLoadingMore(false);
+  };
+
   const fetchCategories = async () => {
     try {
       const response = await fetch(
@@ -306,6 +318,14 @@ const HelpRequests = () => {
             ))}
           </div>
         )}
+
+        {!loading && next && (
+          <div className="text-center mb-4">
+            <button className="btn btn-outline-primary" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? "Loading..." : "Load more"}
+            </button>
+          </div>
+        )}
       </div>
     </>
   );
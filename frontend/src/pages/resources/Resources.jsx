@@ -13,6 +13,8 @@ import CategoryFilter from "../../components/CategoryFilter";
 
 function Resources() {
   const [resources, setResources] = useState([]);
+  const [next, setNext] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selectedCategory, setSelectedCategory] = useState("");
   const [filter, setFilter] = useState({
     search: "",
@@ -22,10 +24,6 @@ function Resources() {
   const user = useSelector((state) => state.auth.user);
   const dispatch = useDispatch();
 
-  useEffect(() => {
-    getResources().then(setResources);
-  }, []);
-
   useEffect(() => {
     const fetchResources = async () => {
       let url = "/api/resources/";
@@ -39,17 +37,28 @@ function Resources() {
       if (params.toString()) url += `?${params.toString()}`;
 
       try {
-        const response = await getResources(url);
-        setResources(response);
+        const page = await getResources(url);
+        setResources(page.results);
+        setNext(page.next);
       } catch (error) {
         console.error("Error fetching filtered resources:", error);
         setResources([]);
+        setNext(null);
       }
     };
 
     fetchResources();
   }, [selectedCategory, filter.search, filter.fileType, filter.sort]);
 
+  const loadMore = async () => {
+    if (!next) return;
+    setLoadingMore(true);
+    const page = await getResources(next);
+    setResources((current) => [...current, ...page.results]);
+    setNext(page.next);
+    setLoadingMore(false);
+  };
+
   const handleVote = async (resourceId) => {
     const updated = await toggleVote(resourceId);
     setResources(
@@ -64,9 +73,8 @@ function Resources() {
   };
 
   const handleDownload = async (resourceId) => {
+    // Download counts are aggregated in the background, so the loaded pages are kept as they are
     await downloadResource(resourceId);
-    const updatedResources = await getResources();
-    setResources(updatedResources);
     const newBalance = await getCreditBalance();
     dispatch(updateCredits(newBalance));
   };
@@ -222,6 +230,14 @@ function Resources() {
             </div>
           ))}
         </div>
+
+        {next && (
+          <div className="text-center mb-4">
+            <button className="btn btn-outline-primary" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? "Loading..." : "Load more"}
+            </button>
+          </div>
+        )}
       </div>
     </>
   );
@@ -3,6 +3,7 @@ import { useSelector } from 'react-redux';
 import { useParams, useNavigate } from 'react-router-dom';
 import { Button, Form, Alert, Spinner, Card, Container, Row, Col, InputGroup, Modal } from 'react-bootstrap';
 import api from '../../apiRequests/api';
+import { sendChatImage } from '../../apiRequests/chat';
 import VideoCall from '../../components/VideoCall';
 import Navbar from '../../components/Navbar';
 import { ACCESS_TOKEN } from '../../constants';
@@ -15,6 +16,7 @@ const MentorshipDetails = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [messages, setMessages] = useState([]);
+  const [historyCursor, setHistoryCursor] = useState(null);
   const [message, setMessage] = useState('');
   const [image, setImage] = useState(null);
   const [ws, setWs] = useState(null);
@@ -81,6 +83,20 @@ const MentorshipDetails = () => {
     websocket.onmessage = (e) => {
       const data = JSON.parse(e.data);
       if (data.message === 'Connected to chat') return;
+      if (data.type === 'chat_history') {
+        setMessages((prev) => {
+          const older = data.messages.filter((msg) => !prev.some((m) => m.id === msg.id));
+          return [...older, ...prev];
+        });
+        setHistoryCursor(data.has_more ? data.before : null);
+        return;
+      }
+      if (data.type === 'image_processed') {
+        setMessages((prev) => prev.map((msg) => (
+          msg.id === data.id ? { ...msg, image_renditions: data.image_renditions } : msg
+        )));
+        return;
+      }
       if (data.content || data.image_url) {
         setMessages((prev) => {
           if (prev.some((msg) => msg.id === data.id)) return prev;
@@ -88,6 +104,7 @@ const MentorshipDetails = () => {
             id: data.id,
             content: data.content,
             image_url: data.image_url,
+            image_renditions: data.image_renditions,
             sender: data.sender,
             timestamp: data.timestamp
           }];
@@ -122,15 +139,16 @@ const MentorshipDetails = () => {
     }
   };
 
-  const sendImage = () => {
+  const loadOlderMessages = () => {
+    if (ws && ws.readyState === WebSocket.OPEN && historyCursor) {
+      ws.send(JSON.stringify({ type: 'load_history', before: historyCursor }));
+    }
+  };
+
+  const sendImage = async () => {
     if (ws && ws.readyState === WebSocket.OPEN && image) {
-      const reader = new FileReader();
-      reader.onload = () => {
-        const base64Image = reader.result.split(',')[1];
-        ws.send(JSON.stringify({ image: base64Image }));
-        setImage(null);
-      };
-      reader.readAsDataURL(image);
+      await sendChatImage(ws, image);
+      setImage(null);
     }
   };
 
@@ -392,6 +410,13 @@ const MentorshipDetails = () => {
                     <h5 className="mb-0 fw-semibold">Chat Room</h5>
                   </Card.Header>
                   <Card.Body className="p-4 bg-light flex-grow-1" style={{ height: '450px', overflowY: 'auto' }}>
+                    {historyCursor && (
+                      <div className="text-center mb-3">
+                        <Button variant="link" size="sm" onClick={loadOlderMessages}>
+                          Load older messages
+                        </Button>
+                      </div>
+                    )}
                     {messages.length === 0 ? (
                       <p className="text-muted text-center mb-0 fst-italic">Start the conversation...</p>
                     ) : (
@@ -422,7 +447,7 @@ const MentorshipDetails = () => {
                             {msg.content && <p className="mb-1">{msg.content}</p>}
                             {msg.image_url && (
                               <img
-                                src={msg.image_url}
+                                src={msg.image_renditions?.thumbnail ?? msg.image_url}
                                 alt="Chat image"
                                 className="img-fluid rounded-3 mt-2"
                                 style={{ maxHeight: '200px', objectFit: 'cover' }}
@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useSelector } from 'react-redux';
 import { useNavigate } from 'react-router-dom';
 import { Button, Form, Card, Spinner, Alert, Container, Row, Col } from 'react-bootstrap';
-import api from '../../apiRequests/api';
+import { getPage } from '../../apiRequests/pagination';
 import Navbar from '../../components/Navbar';
 import CategoryFilter from '../../components/CategoryFilter';
 
@@ -10,6 +10,8 @@ const SkillsLanding = () => {
   const { isAuthenticated } = useSelector((state) => state.auth);
   const navigate = useNavigate();
   const [profiles, setProfiles] = useState([]);
+  const [next, setNext] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [search, setSearch] = useState('');
   const [isMentorFilter, setIsMentorFilter] = useState(true);
   const [selectedCategory, setSelectedCategory] = useState('');
@@ -32,17 +34,34 @@ const SkillsLanding = () => {
       if (search) params.append('skill', search);
       params.append('is_mentor', isMentorFilter);
       if (selectedCategory) params.append('category_id', selectedCategory);
-      const response = await api.get(`/api/skill-profiles/?${params.toString()}`);
-      setProfiles(response.data);
+      const page = await getPage(`/api/skill-profiles/?${params.toString()}`);
+      setProfiles(page.results);
+      setNext(page.next);
     } catch (err) {
       setError('Failed to fetch skill profiles. Please try again later.');
       console.error('Error fetching profiles:', err);
       setProfiles([]); // Clear profiles on error
+      setNext(null);
     } finally {
       setLoading(false);
     }
   };
 
+  const loadMore = async () => {
+    if (!next) return;
+    setLoadingMore(true);
+    try {
+      const page = await getPage(next);
+      setProfiles((current) => [...current, ...page.results]);
+      setNext(page.next);
+    } catch (err) {
+      setError('Failed to fetch more skill profiles. Please try again later.');
+      console.error('Error fetching profiles:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleRequestMentorship = (profileId) => {
     navigate(`/mentorships/request?profileId=${profileId}`);
   };
@@ -190,6 +209,14 @@ const SkillsLanding = () => {
             )}
           </Row>
         )}
+
+        {!loading && !error && next && (
+          <div className="text-center my-4">
+            <Button variant="outline-primary" className="rounded-pill px-4" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </Button>
+          </div>
+        )}
       </Container>
     </>
   );
@@ -15,8 +15,7 @@ import {
   deleteUserSkillProfile
 } from "../../apiRequests/skills";
 import {
-  getCreditBalance,
-  getCreditTransactions,
+  getDashboard,
   editContribution,
   deleteContribution,
   getUserHelpRequests,
@@ -62,6 +61,9 @@ const Profile = () => {
   const [contributions, setContributions] = useState([]);
   const [contributionsLoading, setContributionsLoading] = useState(true);
   const [contributionsError, setContributionsError] = useState(null);
+  const [contributionsNext, setContributionsNext] = useState(null);
+  const [loadingMoreContributions, setLoadingMoreContributions] =
+    useState(false);
   const dispatch = useDispatch();
   const navigate = useNavigate();
   const [activeTab, setActiveTab] = useState("profile");
@@ -148,60 +150,64 @@ const Profile = () => {
     return { headers: { Authorization: `Bearer ${accessToken}` }, withCredentials: true };
   }, [refreshToken]);
 
-  // Fetch user data
+  // Fetch user data, credits, active chats and the first page of contributions in one request
   const fetchUserData = useCallback(async () => {
     if (!isAuthenticated || !user) return;
 
     try {
       setLoading(true);
+      setContributionsLoading(true);
       setError(null);
+      setContributionsError(null);
       const config = await getAuthConfig();
 
-      const [statusResponse, balance, txs, chats] = await Promise.all([
-        api.get("/api/auth/status/", config),
-        getCreditBalance(config),
-        getCreditTransactions(config),
-        api.get("api/active-chats/", config),
-      ]);
+      const dashboard = await getDashboard(
+        ["user", "credits", "active_chats", "contributions"],
+        config
+      );
 
-      if (statusResponse.data.is_authenticated) {
-        const updatedUser = { ...user, ...statusResponse.data.user };
-        localStorage.setItem("user", JSON.stringify(updatedUser));
-      }
+      const updatedUser = { ...user, ...dashboard.user };
+      localStorage.setItem("user", JSON.stringify(updatedUser));
 
-      if (balance !== user.credits) {
-        dispatch(updateCredits(balance));
+      if (dashboard.credits.balance !== user.credits) {
+        dispatch(updateCredits(dashboard.credits.balance));
       }
-      setTransactions(txs);
-      setActiveChats(chats.data);
+      setTransactions(dashboard.credits.transactions);
+      setActiveChats(dashboard.active_chats);
+      setContributions(dashboard.contributions.results);
+      setContributionsNext(dashboard.contributions.next);
     } catch (error) {
       console.error("Error fetching profile data:", error);
       setError("Failed to load profile data. Please try again.");
+      setContributionsError("Failed to load contributions. Please try again.");
       toast.error("Failed to load profile data");
     } finally {
       setLoading(false);
+      setContributionsLoading(false);
     }
   }, [isAuthenticated, user, dispatch, getAuthConfig]);
 
-  // Fetch user contributions
-  const fetchContributions = useCallback(async () => {
-    if (!isAuthenticated || !user) return;
+  // Contributions are paginated; only the query string of "next" (the cursor) is reused,
+  // so requests keep going through the API base URL
+  const loadMoreContributions = async () => {
+    if (!contributionsNext) return;
 
     try {
-      setContributionsLoading(true);
-      setContributionsError(null);
+      setLoadingMoreContributions(true);
       const config = await getAuthConfig();
-
-      const response = await api.get("/api/user/contributions/", config);
-      setContributions(response.data);
+      const response = await api.get(
+        `/api/user/contributions/${new URL(contributionsNext).search}`,
+        config
+      );
+      setContributions((current) => [...current, ...response.data.results]);
+      setContributionsNext(response.data.next);
     } catch (error) {
       console.error("Error fetching contributions:", error);
-      setContributionsError("Failed to load contributions. Please try again.");
-      toast.error("Failed to load contributions");
+      toast.error("Failed to load more contributions");
     } finally {
-      setContributionsLoading(false);
+      setLoadingMoreContributions(false);
     }
-  }, [isAuthenticated, user, getAuthConfig]);
+  };
 
   const fetchHelpRequests = useCallback(async () => {
     if (!isAuthenticated || !user) return;
@@ -278,7 +284,6 @@ const Profile = () => {
   useEffect(() => {
     if (isAuthenticated && user) {
       fetchUserData();
-      fetchContributions();
       fetchHelpRequests();
       fetchMentorships();
       fetchSkillProfiles();
@@ -288,7 +293,6 @@ const Profile = () => {
     isAuthenticated,
     user?.id,
     fetchUserData,
-    fetchContributions,
     fetchHelpRequests,
     fetchMentorships,
     fetchSkillProfiles,
@@ -693,7 +697,7 @@ const Profile = () => {
   }
 
   const profileImageUrl = user?.profile_image
-    ? user.profile_image
+    ? user.profile_image_renditions?.avatar ?? user.profile_image
     : null;
 
   return (
@@ -1296,6 +1300,17 @@ const Profile = () => {
                                   )}
                                 </div>
                               ))}
+                              {contributionsNext && (
+                                <button
+                                  className="btn btn-outline-primary align-self-center"
+                                  onClick={loadMoreContributions}
+                                  disabled={loadingMoreContributions}
+                                >
+                                  {loadingMoreContributions
+                                    ? "Loading..."
+                                    : "Load more"}
+                                </button>
+                              )}
                             </div>
                           )}
                         </div>
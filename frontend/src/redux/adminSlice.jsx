@@ -1,15 +1,16 @@
 import { createSlice, createAsyncThunk } from "@reduxjs/toolkit";
 import api from "../apiRequests/api";
+import { getAllPages } from "../apiRequests/pagination";
 import { ACCESS_TOKEN } from "../constants";
 
 export const fetchUsers = createAsyncThunk("admin/fetchUsers", async (query = "") => {
     const token = localStorage.getItem(ACCESS_TOKEN);
-    const response = await api.get(`/api/users/?q=${query}`, {
+    // Admin tables list every row, so walk all the pages
+    return getAllPages(`/api/users/?q=${query}&page_size=100`, {
         headers: {
             Authorization: `Bearer ${token}`
         }
     })
-    return response.data;
 })
 
 export const createUser = createAsyncThunk("admin/createUser", async (userData) => {
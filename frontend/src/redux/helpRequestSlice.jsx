@@ -1,15 +1,16 @@
 import { createSlice, createAsyncThunk } from "@reduxjs/toolkit";
 import api from "../apiRequests/api";
+import { getAllPages } from "../apiRequests/pagination";
 import { ACCESS_TOKEN } from "../constants";
 
 export const fetchHelpRequests = createAsyncThunk("admin/fetchHelpRequests", async () => {
     const token = localStorage.getItem(ACCESS_TOKEN);
-    const response = await api.get("/api/help-requests/", {
+    // Admin tables list every row, so walk all the pages
+    return getAllPages("/api/help-requests/?page_size=100", {
         headers: {
             Authorization: `Bearer ${token}`
         }
     });
-    return response.data;
 });
 
 export const createHelpRequest = createAsyncThunk("admin/createHelpRequest", async (helpRequestData) => {
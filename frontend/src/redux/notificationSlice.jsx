@@ -1,13 +1,17 @@
 // redux/notificationSlice.js
 import { createSlice, createAsyncThunk } from "@reduxjs/toolkit";
 import api from "../apiRequests/api";
+import { getPage } from "../apiRequests/pagination";
 
 export const fetchNotifications = createAsyncThunk(
     "notifications/fetchNotifications",
-    async () => {
-        const response = await api.get('/api/notifications/');
-        return response.data;
-    }
+    async () => getPage('/api/notifications/')
+);
+
+// The next page of older notifications, from the cursor of the last page loaded
+export const fetchMoreNotifications = createAsyncThunk(
+    "notifications/fetchMoreNotifications",
+    async (_, { getState }) => getPage(getState().notifications.next)
 );
 
 export const markNotificationAsRead = createAsyncThunk(
@@ -29,6 +33,7 @@ const notificationSlice = createSlice({
     name: "notifications",
     initialState: {
         notifications: [],
+        next: null,
         status: "idle",
         error: null,
     },
@@ -39,8 +44,17 @@ const notificationSlice = createSlice({
             }
             state.notifications.unshift(action.payload);
         },
+        mergeNotifications: (state, action) => {
+            if (!Array.isArray(state.notifications)) {
+                state.notifications = [];
+            }
+            const known = new Set(state.notifications.map((n) => n.id));
+            const incoming = action.payload.filter((n) => !known.has(n.id));
+            state.notifications = [...incoming, ...state.notifications];
+        },
         clearNotifications: (state) => {
             state.notifications = [];
+            state.next = null;
         },
     },
     extraReducers: (builder) => {
@@ -50,12 +64,20 @@ const notificationSlice = createSlice({
             })
             .addCase(fetchNotifications.fulfilled, (state, action) => {
                 state.status = "succeeded";
-                state.notifications = Array.isArray(action.payload) ? action.payload : [];
+                state.notifications = action.payload.results;
+                state.next = action.payload.next;
             })
             .addCase(fetchNotifications.rejected, (state, action) => {
                 state.status = "failed";
                 state.error = action.error.message;
                 state.notifications = [];
+                state.next = null;
+            })
+            .addCase(fetchMoreNotifications.fulfilled, (state, action) => {
+                const known = new Set(state.notifications.map((n) => n.id));
+                const older = action.payload.results.filter((n) => !known.has(n.id));
+                state.notifications = [...state.notifications, ...older];
+                state.next = action.payload.next;
             })
             .addCase(markNotificationAsRead.fulfilled, (state, action) => {
                 if (Array.isArray(state.notifications)) {
@@ -77,5 +99,5 @@ const notificationSlice = createSlice({
     },
 });
 
-export const { addNotification, clearNotifications } = notificationSlice.actions;
+export const { addNotification, mergeNotifications, clearNotifications } = notificationSlice.actions;
 export default notificationSlice.reducer;
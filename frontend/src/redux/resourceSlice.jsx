@@ -1,14 +1,15 @@
 import { createSlice, createAsyncThunk } from "@reduxjs/toolkit";
 import api from "../apiRequests/api";
+import { getAllPages } from "../apiRequests/pagination";
 import { ACCESS_TOKEN } from "../constants";
 
 export const fetchResources = createAsyncThunk("admin/fetchResources", async (_, { rejectWithValue }) => {
   try {
     const token = localStorage.getItem(ACCESS_TOKEN);
-    const response = await api.get("/api/resources/", {
+    // Admin tables list every row, so walk all the pages
+    return await getAllPages("/api/resources/?page_size=100", {
       headers: { Authorization: `Bearer ${token}` },
     });
-    return response.data;
   } catch (error) {
     return rejectWithValue(error.response?.data || "Error fetching resources");
   }
@@ -1,15 +1,16 @@
 import { createSlice, createAsyncThunk } from "@reduxjs/toolkit";
 import api from "../apiRequests/api";
+import { getAllPages } from "../apiRequests/pagination";
 import { ACCESS_TOKEN } from "../constants";
 
 export const fetchSkillProfiles = createAsyncThunk("admin/fetchSkillProfiles", async () => {
     const token = localStorage.getItem(ACCESS_TOKEN);
-    const response = await api.get("/api/skill-profiles/", {
+    // Admin tables list every row, so walk all the pages
+    return getAllPages("/api/skill-profiles/?page_size=100", {
         headers: {
             Authorization: `Bearer ${token}`
         }
     });
-    return response.data;
 });
 
 export const createSkillProfile = createAsyncThunk("admin/createSkillProfile", async (skillProfileData) => {